@@ -75,4 +75,6 @@ alias uv-run-collectstatic='uv run python manage.py collectstatic --noinput' # C
 alias uv-run-pytest-run='uv run pytest' # Run pytest on project.
 alias uv-run-pipeline='uv-run-mypy-run && uv-run-ruff-check && uv-run-ruff-format-check && uv-run-migrations-verify && uv-run-pytest-run' # Run all checks in pipeline.
 alias uv-run-seed='uv run python manage.py seed' # Apply seed of database.
-alias uv-run-regenerate-image-variants='uv run python manage.py generate_image_variants --force --workers 4' # Regenerate small/medium/large image variants
+alias uv-run-sync-billig-once='uv run python manage.py sync_billig --once' # Copy events, tickets and prices from billig into the snapshot served by the API.
+alias uv-run-workers-restart='./workers.sh' # (Re)start the background workers, see workers.sh.
+alias uv-run-regenerate-image-variants='uv run python manage.py generate_image_variants --once --force --workers 4' # Regenerate small/medium/large image variants
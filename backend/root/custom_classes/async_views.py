@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import Any
+
+from rest_framework.exceptions import APIException
+
+from django.conf import settings
+from django.http import Http404, HttpRequest, JsonResponse
+from django.views import View
+
+from root.custom_classes.permission_classes import FeatureEnabled
+
+
+class AsyncReadOnlyView(View):
+    """
+    Public, read only JSON endpoint which runs as a coroutine under ASGI, so a slow client does not tie up a thread.
+
+    DRF views are sync only, so this is a plain Django view answering like a DRF view with AllowAny would: JSON,
+    and errors as {'detail': ...}. Kept for the anonymous endpoints hit on every page load. Subclasses implement
+    `data()`, which is checked when the subclass is defined. Use the async ORM and cache APIs there, and sync_to_async for anything else, like serializers
+    which may query lazily.
+    """
+
+    http_method_names = ['get', 'head', 'options']
+    # Like FeatureEnabled
+    feature_key: str | None = None
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if cls.data is AsyncReadOnlyView.data:
+            raise TypeError(f'{cls.__name__} must implement data()')
+
+    async def get(self, request: HttpRequest, **kwargs: Any) -> JsonResponse:
+        if self.feature_key is not None and self.feature_key not in getattr(settings, 'CP_ENABLED', set()):
+            return JsonResponse({'detail': FeatureEnabled.message}, status=403)
+        try:
+            data = await self.data(request, **kwargs)
+        except Http404:
+            return JsonResponse({'detail': 'Not found.'}, status=404)
+        except APIException as e:
+            # E.g. an invalid page from a DRF paginator
+            return JsonResponse({'detail': e.detail}, status=e.status_code)
+        return JsonResponse(data, safe=False, json_dumps_params={'ensure_ascii': False})
+
+    async def data(self, request: HttpRequest, **kwargs: Any) -> Any:
+        raise NotImplementedError
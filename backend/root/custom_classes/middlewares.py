@@ -2,11 +2,16 @@ from __future__ import annotations
 
 import logging
 import secrets
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
+from asgiref.sync import sync_to_async, iscoroutinefunction, markcoroutinefunction
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from django.conf import settings
 from django.http import HttpRequest, HttpResponse
 from django.contrib.auth import login
 from django.middleware.csrf import get_token
+from django.utils.decorators import sync_and_async_middleware
 
 from root.constants import (
     REQUESTED_IMPERSONATE_USER,
@@ -16,25 +21,33 @@ from root.constants import (
 
 from samfundet.models import User
 
+if TYPE_CHECKING:
+    from contextvars import Token
+    from collections.abc import Awaitable
+
 LOG = logging.getLogger('root.middlewares')
 
 
+@sync_and_async_middleware
 class RequestLogMiddleware:
-    """Request Logging Middleware."""
+    """
+    Request Logging Middleware.
+
+    Runs as a coroutine when the rest of the stack does, so ASGI requests are not handed to a thread here.
+    """
 
     def __init__(self, get_response: Any) -> None:
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
-    def __call__(self, request: HttpRequest) -> HttpResponse:
+    def __call__(self, request: HttpRequest) -> HttpResponse | Awaitable[HttpResponse]:
         """Log request/response context before and after processing."""
+        if self.async_mode:
+            return self.__acall__(request)
 
-        request.request_id = request.headers.get('X-Request-ID', f'local-{secrets.token_hex(16)}')
-
-        # Add request to context.
-        # Make the current request available in a ContextVar.
-        # This ContextVar is used by `RequestContextFilter` to attach request information to all log messages.
-        request_token = request_contextvar.set(request)
-
+        request_token = self._start(request)
         try:
             # Request passes on to controller.
             LOG.info('Processing HTTP request')
@@ -46,30 +59,75 @@ class RequestLogMiddleware:
 
         return response
 
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        # Every ASGI request runs in its own task, with its own copy of the context,
+        # so concurrent requests never see each other in the ContextVar.
+        request_token = self._start(request)
+        try:
+            LOG.info('Processing HTTP request')
+            response: HttpResponse = await self.get_response(request)
+            LOG.info('Processing HTTP request complete', extra={'status_code': response.status_code})
+        finally:
+            request_contextvar.reset(request_token)
+
+        return response
+
+    def _start(self, request: HttpRequest) -> Token[HttpRequest]:
+        request.request_id = request.headers.get('X-Request-ID', f'local-{secrets.token_hex(16)}')
+
+        # Add request to context.
+        # Make the current request available in a ContextVar.
+        # This ContextVar is used by `RequestContextFilter` to attach request information to all log messages.
+        return request_contextvar.set(request)
+
     def process_exception(self, request: HttpRequest, exception: Exception) -> None:
         """Log unhandled exceptions."""
 
         LOG.error('Unhandled exception while processing request', exc_info=exception)
 
 
+@sync_and_async_middleware
 class ImpersonateUserMiddleware:
-    def __init__(self, get_response: HttpResponse) -> None:
+    def __init__(self, get_response: Any) -> None:
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse | Awaitable[HttpResponse]:
+        if self.async_mode:
+            return self.__acall__(request)
 
-    def __call__(self, request: HttpRequest) -> HttpResponse:
         ### Handle impersonation before response ###
         impersonate = request.get_signed_cookie(COOKIE_IMPERSONATED_USER_ID, default=None)
         if impersonate is not None:
-            impersonated_user = User.objects.get(id=int(impersonate))
-            request.user = impersonated_user
-            request._force_auth_user = impersonated_user
-            request._force_auth_token = get_token(request)
-            LOG.info(f"EYOO DUDE YOUR'E NOT YOURSELF '{impersonated_user.username}'")
-        ### End: Handle impersonation after response ###
+            self._impersonate(request, User.objects.get(id=int(impersonate)))
 
         # Handle response.
         response: HttpResponse = self.get_response(request)
 
+        self._remember_impersonation(response)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        impersonate = request.get_signed_cookie(COOKIE_IMPERSONATED_USER_ID, default=None)
+        if impersonate is not None:
+            self._impersonate(request, await User.objects.aget(id=int(impersonate)))
+
+        response: HttpResponse = await self.get_response(request)
+
+        self._remember_impersonation(response)
+        return response
+
+    @staticmethod
+    def _impersonate(request: HttpRequest, impersonated_user: User) -> None:
+        request.user = impersonated_user
+        request._force_auth_user = impersonated_user
+        request._force_auth_token = get_token(request)
+        LOG.info(f"EYOO DUDE YOUR'E NOT YOURSELF '{impersonated_user.username}'")
+
+    @staticmethod
+    def _remember_impersonation(response: HttpResponse) -> None:
         ### Handle impersonation after response ###
         if hasattr(response, REQUESTED_IMPERSONATE_USER):
             impersonate_user_id = getattr(response, REQUESTED_IMPERSONATE_USER)
@@ -80,7 +138,30 @@ class ImpersonateUserMiddleware:
                 response.delete_cookie(COOKIE_IMPERSONATED_USER_ID)
         ### End: Handle impersonation after response ###
 
-        return response
+
+@sync_and_async_middleware
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise is sync only, which under ASGI would put every request below it in the stack on a thread.
+    Finding the file is a dict lookup, so only serving a static file is handed to a thread.
+    """
+
+    def __init__(self, get_response: Any = None, settings: Any = settings) -> None:
+        super().__init__(get_response, settings=settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse | Awaitable[HttpResponse]:
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        static_file = self.find_file(request.path_info) if self.autorefresh else self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
 
 
 class ImpersonateUserMiddleware2:
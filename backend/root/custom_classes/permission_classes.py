@@ -2,12 +2,15 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
 
+from guardian.shortcuts import get_objects_for_user
+
 from rest_framework.permissions import SAFE_METHODS, BasePermission, DjangoModelPermissions, DjangoObjectPermissions
 
 from django.conf import settings
 from django.http import Http404
+from django.db.models import Q
 
-from samfundet.models.role import UserOrgRole, UserGangRole, UserGangSectionRole
+from samfundet.roles import role_permission_q, get_role_permission_map
 
 if TYPE_CHECKING:
     from rest_framework.views import APIView
@@ -81,17 +84,9 @@ def has_required_permissions(request: Request, perms: list[str]) -> bool:
     if not request.user or not request.user.is_authenticated:
         return False
 
-    role_models = [UserOrgRole, UserGangRole, UserGangSectionRole]
-    for role_model in role_models:
-        user_roles = role_model.objects.filter(user=request.user)
-        for user_role in user_roles:
-            # Get permissions with app label
-            role_perms = user_role.role.permissions.values_list('content_type__app_label', 'codename')
-            # Construct full permission strings
-            role_perms = [f'{app_label}.{codename}' for app_label, codename in role_perms]
-            if any(perm in role_perms for perm in perms):
-                return True
-    return False
+    wanted = set(perms)
+    role_map = get_role_permission_map(user=request.user)
+    return any(granted & wanted for granted_by_owner in (role_map.orgs, role_map.gangs, role_map.sections) for granted in granted_by_owner.values())
 
 
 class FullyProtectedRolePermissions(CustomDjangoModelPermissions):
@@ -192,6 +187,9 @@ def filter_queryset_by_permissions(queryset: QuerySet, user: User, permission: s
     """
     Filters a queryset based on user's permissions.
 
+    Models declaring `owner_paths` are filtered in the database, by the user's roles and object permissions.
+    Anything else falls back to checking every object.
+
     :param primary_key_field: The primary key field of the model, typically 'id' or 'slug'
     :param queryset: The original queryset to filter
     :param user: The user to check permissions for
@@ -206,12 +204,25 @@ def filter_queryset_by_permissions(queryset: QuerySet, user: User, permission: s
     if user.has_perm(permission):
         return queryset
 
+    if hasattr(queryset.model, 'owner_paths'):
+        return _filter_in_database(queryset=queryset, user=user, permission=permission)
+
     # If no model-level permission, filter by object-level permissions
     permitted_ids = [getattr(obj, primary_key_field) for obj in queryset if user.has_perm(permission, obj)]
 
     return queryset.filter(**{f'{primary_key_field}__in': permitted_ids})
 
 
+def _filter_in_database(*, queryset: QuerySet, user: User, permission: str) -> QuerySet:
+    """The same objects `user.has_perm(permission, obj)` allows, as one query no matter how many rows there are."""
+    if not user.is_active:
+        return queryset.none()
+    # Permissions granted on a single object sit outside the role hierarchy. accept_global_perms is
+    # off since the model level permission is already handled.
+    directly_permitted = get_objects_for_user(user, permission, klass=queryset.model, accept_global_perms=False)
+    return queryset.filter(role_permission_q(user=user, model=queryset.model, permission=permission) | Q(pk__in=directly_permitted.values('pk')))
+
+
 class FeatureEnabled(BasePermission):
     feature_key = None
     message = 'This feature is not available yet.'
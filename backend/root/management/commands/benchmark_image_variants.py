@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+import itertools
+import statistics
+from typing import TYPE_CHECKING, Any
+from pathlib import Path
+from dataclasses import asdict, replace
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image as PilImage
+from PIL import UnidentifiedImageError
+
+from django.core.management.base import BaseCommand, CommandError
+
+from samfundet.models.general import Image
+from samfundet.images.benchmark import Profile, Measurement, measure
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+RESAMPLING = {name.lower(): member for name, member in PilImage.Resampling.__members__.items()}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark encoding of the image variants: encode time per megapixel, peak memory, output size and an SSIM quality score. '
+        'Compares Image.VARIANTS ("current") with the settings given.'
+    )
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument('paths', nargs='*', help='Image files, or directories searched for images, to use as the corpus.')
+        parser.add_argument('--stored', type=int, default=0, help='Also use this many of the most recently uploaded originals.')
+        parser.add_argument('--quality', type=int, nargs='+', default=[], help='Qualities to try for every variant.')
+        parser.add_argument('--method', type=int, nargs='+', default=[], help='WebP encoder efforts (0-6) to try for every variant.')
+        parser.add_argument('--resample', nargs='+', default=[], choices=sorted(RESAMPLING), help='Resampling filters to try.')
+        parser.add_argument('--repeat', type=int, default=3, help='Encodes per image and profile, the fastest is reported (default 3).')
+        parser.add_argument('--json', action='store_true', help='Print every measurement as JSON instead of a summary, e.g. to compare Pillow versions.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        corpus = self._corpus(paths=options['paths'], stored=options['stored'])
+        if not corpus:
+            raise CommandError('No images to benchmark, give some paths or --stored.')
+        profiles = self._profiles(qualities=options['quality'], methods=options['method'], resamplers=options['resample'])
+
+        measurements = []
+        # One process per measurement, so each peak memory is its own. One at a time, so they do not slow each other down.
+        with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+            for (name, data), profile in itertools.product(corpus, profiles):
+                measurements.append(executor.submit(measure, image=name, data=data, profile=profile, repeat=options['repeat']).result())
+
+        if options['json']:
+            self.stdout.write(json.dumps({'pillow': PilImage.__version__, 'measurements': [asdict(m) for m in measurements]}, indent=2))
+        else:
+            self._summarize(profiles=profiles, measurements=measurements, images=len(corpus))
+
+    @classmethod
+    def _corpus(cls, *, paths: list[str], stored: int) -> list[tuple[str, bytes]]:
+        corpus = [(str(file), file.read_bytes()) for path in paths for file in cls._image_files(Path(path))]
+        # Small originals get no variants, so there is nothing to measure for them
+        latest = Image.objects.order_by('-id')[:stored]
+        corpus.extend((image.image.name, image.read_original()) for image in latest if image.image.size > Image.VARIANT_SIZE_THRESHOLD)
+        return corpus
+
+    @staticmethod
+    def _image_files(path: Path) -> Iterator[Path]:
+        files = sorted(p for p in path.rglob('*') if p.is_file()) if path.is_dir() else [path]
+        for file in files:
+            try:
+                with PilImage.open(file) as pil:
+                    pil.verify()
+            except UnidentifiedImageError:
+                continue
+            yield file
+
+    @staticmethod
+    def _profiles(*, qualities: list[int], methods: list[int], resamplers: list[str]) -> list[Profile]:
+        profiles = [Profile(name='current', variants=Image.VARIANTS, resample=PilImage.Resampling.LANCZOS)]
+        for quality, method, resampler in itertools.product(qualities or [None], methods or [None], resamplers or ['lanczos']):
+            changes = {'quality': quality, 'method': method}
+            changes = {field: value for field, value in changes.items() if value is not None}
+            name = ' '.join([*(f'{field}={value}' for field, value in changes.items()), resampler])
+            if name == 'lanczos':
+                # Same as current
+                continue
+            variants = {variant: replace(spec, **changes) for variant, spec in Image.VARIANTS.items()}
+            profiles.append(Profile(name=name, variants=variants, resample=RESAMPLING[resampler]))
+        return profiles
+
+    def _summarize(self, *, profiles: list[Profile], measurements: list[Measurement], images: int) -> None:
+        self.stdout.write(f'{images} image(s), Pillow {PilImage.__version__}\n')
+        self.stdout.write(f'{"profile":<32} {"ms/MP":>8} {"peak MB":>8}  {"variant":<8} {"avg KB":>8} {"avg SSIM":>9} {"min SSIM":>9}')
+        for profile in profiles:
+            runs = [m for m in measurements if m.profile == profile.name]
+            ms_per_megapixel = statistics.median(m.ms_per_megapixel for m in runs)
+            peak_megabytes = max(m.peak_bytes for m in runs) / 1_000_000
+            first = True
+            for variant in profile.variants:
+                results = [result for m in runs for result in m.variants if result.name == variant]
+                if not results:
+                    # Only animated images
+                    continue
+                columns = f'{profile.name:<32} {ms_per_megapixel:>8.1f} {peak_megabytes:>8.0f}' if first else ' ' * 50
+                kilobytes = statistics.mean(result.bytes for result in results) / 1000
+                scores = [result.ssim for result in results]
+                self.stdout.write(f'{columns}  {variant:<8} {kilobytes:>8.1f} {statistics.mean(scores):>9.4f} {min(scores):>9.4f}')
+                first = False
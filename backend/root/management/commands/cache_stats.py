@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from samfundet.caching import HIT, MISS, REGIONS
+
+
+class Command(BaseCommand):
+    help = 'Show hits and misses for every cached region since the counters were last reset.'
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument('--reset', action='store_true', help='Start counting from zero again after showing the counters.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        for region in REGIONS:
+            stats = region.stats()
+            lookups = stats[HIT] + stats[MISS]
+            hit_rate = f'{stats[HIT] / lookups:.0%}' if lookups else '-'
+            self.stdout.write(f'{region.name:<16} hits={stats[HIT]:<8} misses={stats[MISS]:<8} hit rate={hit_rate}')
+            if options['reset']:
+                region.reset_stats()
@@ -5,6 +5,7 @@ import csv
 import sys
 import urllib
 from urllib.request import urlopen
+from concurrent.futures import ThreadPoolExecutor
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
@@ -12,6 +13,7 @@ from django.core.management.base import BaseCommand
 from root.constants import Environment
 
 BASE_IMAGE_PATH = 'https://www.samfundet.no/upload/images/image_files'
+DOWNLOAD_WORKERS = 8
 
 
 # Samf3 uses /class/partition/id urls for images
@@ -51,10 +53,15 @@ def download_image(*, image_dict, save_path) -> bool:
         return False
 
 
+def fetch_image(*, image_dict, save_root_path) -> bool:
+    save_path = os.path.join(save_root_path, image_to_fname(image_dict))
+    return os.path.exists(save_path) or download_image(image_dict=image_dict, save_path=save_path)
+
+
 class Command(BaseCommand):
     help = 'Download samf3 images to seed folder before seeding.'
 
-    def handle(self, *args, **options):  # noqa: C901
+    def handle(self, *args, **options):
         print('Running samf3 download images script...')
 
         # Avoid running seed in production.
@@ -80,17 +87,17 @@ class Command(BaseCommand):
             events = list(csv.DictReader(event_csv))
             images = list(csv.DictReader(image_csv))
 
-            images_to_download = [event['image_id'] for event in events]
+            images_to_download = {event['image_id'] for event in events}
+            to_download = [image for image in reversed(images) if image['id'] in images_to_download]
 
-            print(f'Now downloading {len(images_to_download)} images.')
+            print(f'Now downloading {len(to_download)} images.')
 
-            for i, image in enumerate(reversed(images)):
-                if image['id'] in images_to_download:
-                    save_path = os.path.join(save_root_path, image_to_fname(image))
-                    if os.path.exists(save_path) or download_image(image_dict=image, save_path=save_path):
-                        downloaded += 1
-                if i % 10 == 0:
-                    print(f' {downloaded}/{len(images_to_download)}')
+            # Downloads are I/O bound, so a few threads cut the time accordingly
+            with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+                for i, ok in enumerate(executor.map(lambda image: fetch_image(image_dict=image, save_root_path=save_root_path), to_download)):
+                    downloaded += ok
+                    if i % 10 == 0:
+                        print(f' {downloaded}/{len(to_download)}')
 
         # Done
         print('\nDownload complete.')
@@ -1,52 +1,39 @@
 from __future__ import annotations
 
+import os
+import time
 from typing import Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
 
+from django.db import close_old_connections
 from django.core.management.base import BaseCommand
 
-from samfundet.models.general import Image
+from samfundet.images.pipeline import queue_all, generate_pending_variants
 
 
 class Command(BaseCommand):
-    help = 'Generate size variants for images missing them. Useful after changing Image.VARIANTS.'
+    help = 'Generate size variants for uploaded images, encoding them on a process pool. Runs as a worker loop unless --once is given.'
 
     def add_arguments(self, parser: Any) -> None:
-        parser.add_argument('--force', action='store_true', help='Regenerate variants even if they already exist.')
-        parser.add_argument('--workers', type=int, default=1, help='Number of images to process in parallel (default 1).')
+        parser.add_argument('--once', action='store_true', help='Generate what is queued now and exit.')
+        parser.add_argument('--force', action='store_true', help='Queue every image for regeneration first. Useful after changing Image.VARIANTS.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Number of processes encoding in parallel (default: CPU count).')
+        parser.add_argument('--interval', type=float, default=2, help='Seconds between each check for queued images (default 2).')
 
     def handle(self, *args: Any, **options: Any) -> None:
-        candidates = [image for image in Image.objects.all() if options['force'] or self._needs_variants(image)]
-        total = len(candidates)
-        processed = 0
-        failed = 0
-        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
-            futures = {executor.submit(self._regenerate, image): image for image in candidates}
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                    processed += 1
-                except (OSError, ValueError) as error:
-                    failed += 1
-                    image = futures[future]
-                    self.stderr.write(f'Failed to process image {image.pk} ({image.image.name}): {error}')
-                if (processed + failed) % 50 == 0:
-                    # print progress every 50 images
-                    self.stdout.write(f'{processed + failed}/{total}...')
-        self.stdout.write(self.style.SUCCESS(f'Processed {processed} of {total} candidate images ({failed} failed).'))
-
-    @staticmethod
-    def _needs_variants(image: Image) -> bool:
-        # Small originals are correct without variants
-        if image.image.size <= Image.VARIANT_SIZE_THRESHOLD:
-            return False
-        return not all(getattr(image, f'image_{name}') for name in Image.VARIANTS)
-
-    def _regenerate(self, image: Image) -> None:
-        storage = Image._meta.get_field('image').storage
-        for name in Image.VARIANTS:
-            variant_file = getattr(image, f'image_{name}')
-            if variant_file:
-                storage.delete(variant_file.name)
-        image.generate_variants()
-        image.save()
+        if options['force']:
+            self.stdout.write(f'Queued {queue_all()} image(s).')
+        workers = options['workers']
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while True:
+                # Enough per batch to keep every process busy, few enough to keep the originals in memory small
+                stored = generate_pending_variants(executor=executor, batch_size=workers * 2)
+                if stored:
+                    # Go straight on while there is a backlog
+                    self.stdout.write(f'Generated variants for {stored} image(s).')
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+                # Django only reconnects by itself per request. Drops connections which broke, e.g. when the database restarted.
+                close_old_connections()
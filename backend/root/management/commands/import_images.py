@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from samfundet.images.bulk_import import ImportResult, import_images, sources_from_manifest, sources_from_directory
+
+
+class Command(BaseCommand):
+    help = (
+        'Import image files in bulk, skipping files already imported. '
+        'Give a directory (titles from the file names) or a CSV manifest with path, title and tags columns.'
+    )
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument('source', type=Path, help='Directory to import every file below, or a CSV manifest.')
+        parser.add_argument('--tag', nargs='+', default=[], help='Tags to add to every imported image.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Number of processes preparing images in parallel (default: CPU count).')
+        parser.add_argument('--io-workers', type=int, default=8, help='Number of files read and stored in parallel (default 8).')
+        parser.add_argument('--batch-size', type=int, default=50, help='Images inserted per query (default 50).')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        source: Path = options['source']
+        tags = tuple(options['tag'])
+        if source.is_dir():
+            sources = sources_from_directory(source, tags=tags)
+        elif source.is_file():
+            sources = sources_from_manifest(source, tags=tags)
+        else:
+            raise CommandError(f'{source} does not exist.')
+
+        self.stdout.write(f'Importing {len(sources)} file(s)...')
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            result = import_images(sources, executor=executor, io_workers=options['io_workers'], batch_size=options['batch_size'], progress=self._progress)
+        self.stdout.write(self.style.SUCCESS(f'Imported {result.imported} image(s), skipped {result.duplicates} duplicate(s), {result.failed} failed.'))
+
+    def _progress(self, result: ImportResult) -> None:
+        self.stdout.write(f'{result.imported + result.duplicates + result.failed}...')
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import time
+import logging
+import datetime
+from typing import Any
+
+from django.db import DatabaseError, close_old_connections
+from django.core.management.base import BaseCommand
+
+from samfundet.recruitment.statistics import REFRESH_DELAY, refresh_stale_statistics
+
+LOG = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Recount recruitment statistics marked stale by new or changed applications. Runs as a worker loop unless --once is given.'
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument('--once', action='store_true', help='Refresh what is stale now and exit.')
+        parser.add_argument('--interval', type=float, default=10, help='Seconds between each check for stale statistics (default 10).')
+        parser.add_argument(
+            '--delay',
+            type=float,
+            default=REFRESH_DELAY.total_seconds(),
+            help=f'Seconds a mark is left to settle before recounting, so bursts are recounted once (default {REFRESH_DELAY.total_seconds():g}).',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        delay = datetime.timedelta(seconds=options['delay'])
+        if options['once']:
+            self.refresh(delay=delay)
+            return
+        while True:
+            # Django only reconnects by itself per request. Drops connections which broke, e.g. when the database restarted.
+            close_old_connections()
+            try:
+                self.refresh(delay=delay)
+            except DatabaseError:
+                # The last counts are served meanwhile, and the marks are kept for the next try
+                LOG.exception('Could not recount recruitment statistics, trying again in %s seconds', options['interval'])
+                close_old_connections()
+            time.sleep(options['interval'])
+
+    def refresh(self, *, delay: datetime.timedelta) -> None:
+        refreshed = refresh_stale_statistics(delay=delay)
+        if refreshed:
+            self.stdout.write(f'Recounted statistics for {refreshed} recruitment(s).')
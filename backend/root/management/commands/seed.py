@@ -12,6 +12,8 @@ from root.constants import Environment
 # Import list of all seed scripts.
 from root.management.commands.seed_scripts import SEED_SCRIPTS, OPTIONAL_SEED_SCRIPTS
 
+from samfundet.search import rebuild_search_vectors
+
 BAR = '█'
 BAR_LENGTH = 20
 
@@ -123,5 +125,8 @@ class Command(BaseCommand):
                 print('\nIf you added a new seed script, remember to register it in /seed_scripts/__init__.py!')
                 return
 
+        # Some seed scripts use bulk_create, which skips the signals building search vectors
+        rebuild_search_vectors()
+
         # Done
         print('\nSeeding complete.')
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import time
+import logging
+from typing import Any
+
+from django.db import DatabaseError, close_old_connections
+from django.core.management.base import BaseCommand
+
+from samfundet.billig import snapshot
+
+LOG = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Copy relevant billig events with their ticket and price groups into the local snapshot served by the API. Loops unless --once is given.'
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument('--once', action='store_true', help='Sync once and exit.')
+        parser.add_argument('--interval', type=float, default=30, help='Seconds between each sync (default 30).')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options['once']:
+            self.sync()
+            return
+        while True:
+            # Django only reconnects by itself per request. Drops connections which broke, e.g. when billig restarted.
+            close_old_connections()
+            try:
+                self.sync()
+            except DatabaseError:
+                # The last snapshot is served meanwhile
+                LOG.exception('Could not sync from billig, trying again in %s seconds', options['interval'])
+                close_old_connections()
+            time.sleep(options['interval'])
+
+    def sync(self) -> None:
+        changed = snapshot.sync()
+        if changed:
+            self.stdout.write(f'Synced {changed} billig event(s).')
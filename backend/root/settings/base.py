@@ -59,6 +59,10 @@ WHITENOISE_ROOT = BASE_DIR / REACT_BUILD_DIR
 MEDIA_ROOT = BASE_DIR / 'uploads'
 MEDIA_URL = '/uploads/'
 
+# Most pixels the image variant worker decodes for one image (about 3 bytes each), bounding its memory use.
+# JPEGs are decoded at a reduced scale when that still covers the largest variant, so this mostly limits other formats.
+IMAGE_VARIANT_MAX_PIXELS = int(os.getenv('IMAGE_VARIANT_MAX_PIXELS', '50000000'))
+
 # Before 3.13, mimetypes only knows webp as a non-strict type, which Django's static serving ignores
 # TODO: Remove after cirkus updates to >=3.13
 mimetypes.add_type('image/webp', '.webp')
@@ -88,10 +92,31 @@ DATE_INPUT_FORMATS = [
 ]
 
 SESSION_COOKIE_NAME = 'sessionid'
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Sessions are read from the cache, and written through to the database
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
 SESSION_COOKIE_AGE = 24 * 60 * 60 * 7
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 
+# Shared cache for all processes, e.g. 'redis://cache:6379/0'. Without it every process caches in its own memory,
+# which is only correct with a single process. Production requires it, see prod.py.
+# The cached regions are listed in samfundet/caching.py.
+CACHE_URL = os.environ.get('CACHE_URL')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'sm4',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'sm4',
+        },
+    }
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -99,6 +124,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # Imported apps.
     'django_extensions',
     'corsheaders',
@@ -110,7 +136,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'root.custom_classes.middlewares.RequestLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'root.custom_classes.middlewares.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,3 +54,13 @@ DATABASES = {
         'PORT': os.environ['MDB_DB_PORT'],
     },
 }
+
+# Required in production. Sessions are cached, and the cached regions in samfundet/caching.py are invalidated
+# by bumping a generation in the cache. Both are only coherent when every worker process shares one cache.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['CACHE_URL'],
+        'KEY_PREFIX': 'sm4',
+    },
+}
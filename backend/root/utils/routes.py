@@ -339,6 +339,7 @@ samfundet__user = 'samfundet:user'
 samfundet__groups = 'samfundet:groups'
 samfundet__users = 'samfundet:users'
 samfundet__users_search_paginated = 'samfundet:users_search_paginated'
+samfundet__users_autocomplete = 'samfundet:users_autocomplete'
 samfundet__impersonate = 'samfundet:impersonate'
 samfundet__eventsperday = 'samfundet:eventsperday'
 samfundet__eventsupcomming = 'samfundet:eventsupcomming'
@@ -349,6 +350,7 @@ samfundet__webhook = 'samfundet:webhook'
 samfundet__gangsorganized = 'samfundet:gangsorganized'
 samfundet__check_reservation = 'samfundet:check_reservation'
 samfundet__reservation_create = 'samfundet:reservation-create'
+samfundet__reservation_availability = 'samfundet:reservation_availability'
 samfundet__mdb_connect = 'samfundet:mdb_connect'
 samfundet__active_recruitments = 'samfundet:active_recruitments'
 samfundet__recruitment_positions = 'samfundet:recruitment_positions'
@@ -361,6 +363,7 @@ samfundet__recruitment_application_states_choices = 'samfundet:recruitment_appli
 samfundet__recruitment_application_update_state_gang = 'samfundet:recruitment_application_update_state_gang'
 samfundet__recruitment_position_organized_applications = 'samfundet:recruitment_position_organized_applications'
 samfundet__recruitment_application_update_state_position = 'samfundet:recruitment_application_update_state_position'
+samfundet__recruitment_application_bulk_update_state = 'samfundet:recruitment_application_bulk_update_state'
 samfundet__recruitment_applications_recruiter = 'samfundet:recruitment_applications_recruiter'
 samfundet__recruitment_application_interview_notes = 'samfundet:recruitment_application_interview_notes'
 samfundet__recruitment_withdraw_application = 'samfundet:recruitment_withdraw_application'
@@ -743,7 +743,7 @@ def update_stats(modeladmin: CustomBaseAdmin, request: HttpRequest, queryset: Qu
 
 @register_if_feature_enabled(WebFeatures.RECRUITMENT, RecruitmentStatistics)
 class RecruitmentStatisticsAdmin(CustomGuardedModelAdmin):
-    list_display = ['recruitment', 'total_applicants', 'total_applications']
+    list_display = ['recruitment', 'total_applicants', 'total_applications', 'refreshed_at', 'stale_since']
     search_fields = ['recruitment']
     actions = [update_stats]
 
@@ -3,35 +3,47 @@ from __future__ import annotations
 from typing import Any
 
 from django.contrib.auth.backends import BaseBackend
+from django.contrib.contenttypes.models import ContentType
 
-from samfundet.utils import get_perm
+from samfundet.roles import RolePermissionMap, get_role_permission_map
 from samfundet.models import User
-from samfundet.models.role import UserOrgRole, UserGangRole, UserGangSectionRole
 
 
 class RoleAuthBackend(BaseBackend):
-    def has_perm(self, user_obj: User, perm: str, obj: Any = None) -> bool:  # noqa: C901
+    def has_perm(self, user_obj: User, perm: str, obj: Any = None) -> bool:
+        """
+        Whether one of the user's roles on the organization, gang or section the object resolves to
+        grants the permission. The roles are loaded once per user object, so checking every object
+        in a list costs no more queries than checking one.
+        """
         if not user_obj.is_active or obj is None:
             return False
 
         if user_obj.is_superuser:
             return True
 
-        permission = get_perm(perm=perm, model=obj)
+        roles = get_role_permission_map(user=user_obj)
+        if not roles:
+            # Skip resolving the owners, which may query
+            return False
 
-        if hasattr(obj, 'resolve_org'):
-            org_id = obj.resolve_org(return_id=True)
-            if org_id is not None and UserOrgRole.objects.filter(user=user_obj, obj__id=org_id, role__permissions=permission).exists():
-                return True
+        # The permission is always checked on the object's own model, whatever app label it was given with
+        content_type = ContentType.objects.get_for_model(obj)
+        permission = f'{content_type.app_label}.{perm.rsplit(".", maxsplit=1)[-1]}'
 
-        if hasattr(obj, 'resolve_gang'):
-            gang_id = obj.resolve_gang(return_id=True)
-            if gang_id is not None and UserGangRole.objects.filter(user=user_obj, obj__id=gang_id, role__permissions=permission).exists():
-                return True
+        return _granted_through_owner(obj=obj, permission=permission, roles=roles)
 
-        if hasattr(obj, 'resolve_section'):
-            section_id = obj.resolve_section(return_id=True)
-            if section_id is not None and UserGangSectionRole.objects.filter(user=user_obj, obj__id=section_id, role__permissions=permission).exists():
-                return True
 
-        return False
+def _granted_through_owner(*, obj: Any, permission: str, roles: RolePermissionMap) -> bool:
+    owners = (
+        ('resolve_org', roles.orgs),
+        ('resolve_gang', roles.gangs),
+        ('resolve_section', roles.sections),
+    )
+    for resolver, granted_by_owner in owners:
+        if not granted_by_owner or not hasattr(obj, resolver):
+            continue
+        owner_id = getattr(obj, resolver)(return_id=True)
+        if owner_id is not None and permission in granted_by_owner.get(owner_id, ()):
+            return True
+    return False
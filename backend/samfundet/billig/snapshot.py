@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Prefetch
+
+from samfundet.caching import HOMEPAGE
+from samfundet.serializers import BilligEventSerializer
+from samfundet.models.event import BilligEventSnapshot
+from samfundet.models.billig import BilligEvent, BilligTicketGroup
+
+
+def sync() -> int:
+    """
+    Replaces the snapshot with every relevant billig event, with ticket groups and price groups, in three queries to billig.
+    Sold out states are computed here once instead of on every request. Returns how many snapshots changed.
+    """
+    billig_events = BilligEvent.get_relevant().prefetch_related(
+        Prefetch('ticket_groups', queryset=BilligTicketGroup.objects.prefetch_related('price_groups')),
+    )
+    data = {billig['id']: billig for billig in BilligEventSerializer(billig_events, many=True).data}
+
+    stored = dict(BilligEventSnapshot.objects.values_list('billig_id', 'data'))
+    changed = [billig_id for billig_id, billig in data.items() if stored.get(billig_id) != billig]
+    removed = stored.keys() - data.keys()
+    if not changed and not removed:
+        return 0
+
+    synced_at = timezone.now()
+    with transaction.atomic():
+        BilligEventSnapshot.objects.bulk_create(
+            [BilligEventSnapshot(billig_id=billig_id, data=data[billig_id], synced_at=synced_at) for billig_id in changed],
+            update_conflicts=True,
+            unique_fields=['billig_id'],
+            update_fields=['data', 'synced_at'],
+        )
+        BilligEventSnapshot.objects.filter(billig_id__in=removed).delete()
+    # Bulk writes send no signals
+    transaction.on_commit(HOMEPAGE.invalidate)
+    return len(changed) + len(removed)
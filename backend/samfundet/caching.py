@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.viewsets import ReadOnlyModelViewSet
+
+from django.core.cache import cache
+
+from samfundet.models.event import Event, EventCustomTicket
+from samfundet.models.general import Image, Venue, KeyValue, TextItem, ClosedPeriod
+from samfundet.infopages.models import InformationPage, InformationPageRevision
+from samfundet.models.recruitment import Recruitment, RecruitmentPosition
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from django.db.models import Model
+
+# Counters live next to the cached values, so every process reports into the same numbers
+STATS_PREFIX = 'cache-stats'
+HIT = 'hits'
+MISS = 'misses'
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class CacheRegion:
+    """
+    A named group of cached values which expire together.
+
+    Values are stored under the region's current generation. Saving or deleting any of the `tags` models moves
+    the region to a new generation, so every value cached before the change is ignored from then on and expires
+    on its own after `timeout` seconds.
+    """
+
+    name: str
+    timeout: int
+    tags: tuple[type[Model], ...]
+
+    def get_or_set(self, *parts: Any, default: Callable[[], Any], timeout_for: Callable[[Any], float | None] | None = None) -> Any:
+        """
+        Cached value for `parts` within the region, computing and storing it with `default` on a miss.
+        `timeout_for` may cut the timeout short for values which go stale at a known time, or return 0 to
+        leave the value uncached.
+        """
+        key = self._key(parts=parts)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            self._count(outcome=HIT)
+            return value
+
+        self._count(outcome=MISS)
+        value = default()
+        timeout = self._timeout(value=value, timeout_for=timeout_for)
+        if timeout:
+            cache.set(key, value, timeout=timeout)
+        return value
+
+    async def aget_or_set(self, *parts: Any, default: Callable[[], Any], timeout_for: Callable[[Any], float | None] | None = None) -> Any:
+        """get_or_set for async views. `default` is sync, and runs in a thread on a miss."""
+        key = await self._akey(parts=parts)
+        value = await cache.aget(key, _MISSING)
+        if value is not _MISSING:
+            await self._acount(outcome=HIT)
+            return value
+
+        await self._acount(outcome=MISS)
+        value = await sync_to_async(default)()
+        timeout = self._timeout(value=value, timeout_for=timeout_for)
+        if timeout:
+            await cache.aset(key, value, timeout=timeout)
+        return value
+
+    def invalidate(self) -> None:
+        try:
+            cache.incr(self._generation_key)
+        except ValueError:
+            # Nothing was cached since the generation was evicted, any fresh start will do
+            cache.set(self._generation_key, 1, timeout=None)
+
+    def stats(self) -> dict[str, int]:
+        counters = cache.get_many([self._stats_key(outcome=outcome) for outcome in (HIT, MISS)])
+        return {outcome: counters.get(self._stats_key(outcome=outcome), 0) for outcome in (HIT, MISS)}
+
+    def reset_stats(self) -> None:
+        cache.delete_many([self._stats_key(outcome=outcome) for outcome in (HIT, MISS)])
+
+    def _timeout(self, *, value: Any, timeout_for: Callable[[Any], float | None] | None) -> float:
+        limit = timeout_for(value) if timeout_for else None
+        return self.timeout if limit is None else max(0, min(limit, self.timeout))
+
+    @property
+    def _generation_key(self) -> str:
+        return f'{self.name}:generation'
+
+    def _key(self, *, parts: tuple[Any, ...]) -> str:
+        generation = cache.get_or_set(self._generation_key, 0, timeout=None)
+        return f'{self.name}:{generation}:{json.dumps(parts, default=str)}'
+
+    async def _akey(self, *, parts: tuple[Any, ...]) -> str:
+        generation = await cache.aget_or_set(self._generation_key, 0, timeout=None)
+        return f'{self.name}:{generation}:{json.dumps(parts, default=str)}'
+
+    def _stats_key(self, *, outcome: str) -> str:
+        return f'{STATS_PREFIX}:{self.name}:{outcome}'
+
+    def _count(self, *, outcome: str) -> None:
+        key = self._stats_key(outcome=outcome)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, timeout=None)
+
+    async def _acount(self, *, outcome: str) -> None:
+        key = self._stats_key(outcome=outcome)
+        try:
+            await cache.aincr(key)
+        except ValueError:
+            await cache.aadd(key, 1, timeout=None)
+
+
+# =============================== #
+#            Regions              #
+# =============================== #
+
+# Also invalidated by samfundet.billig.snapshot.sync when ticket status changes
+HOMEPAGE = CacheRegion(name='homepage', timeout=60 * 60, tags=(Event, EventCustomTicket, Image))
+# Relative to the time of day as well, so kept short
+IS_CLOSED = CacheRegion(name='is-closed', timeout=60, tags=(ClosedPeriod,))
+OPEN_VENUES = CacheRegion(name='open-venues', timeout=10 * 60, tags=(Venue,))
+TEXT_ITEMS = CacheRegion(name='text-items', timeout=60 * 60, tags=(TextItem,))
+KEY_VALUES = CacheRegion(name='key-values', timeout=60 * 60, tags=(KeyValue,))
+# Frontend pages with metadata rendered in, served to bots, see samfundet.routing.views.metadata_view
+EVENT_PAGES = CacheRegion(name='event-pages', timeout=60 * 60, tags=(Event, Image))
+INFORMATION_PAGES = CacheRegion(name='information-pages', timeout=60 * 60, tags=(InformationPage, InformationPageRevision))
+# Positions become visible at a set time, so kept short
+RECRUITMENT_POSITION_PAGES = CacheRegion(name='recruitment-position-pages', timeout=10 * 60, tags=(Recruitment, RecruitmentPosition))
+
+REGIONS = (HOMEPAGE, IS_CLOSED, OPEN_VENUES, TEXT_ITEMS, KEY_VALUES, EVENT_PAGES, INFORMATION_PAGES, RECRUITMENT_POSITION_PAGES)
+
+
+class CachedReadOnlyModelViewSet(ReadOnlyModelViewSet):
+    """Serves list and retrieve from `cache_region`. Lists requested with query parameters are not cached."""
+
+    cache_region: CacheRegion
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        if request.query_params:
+            # The parameters may filter or page the list, and keying on them would let any client add cache entries
+            return super().list(request, *args, **kwargs)
+        data = self.cache_region.get_or_set('list', default=lambda: super(CachedReadOnlyModelViewSet, self).list(request, *args, **kwargs).data)
+        return Response(data)
+
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        data = self.cache_region.get_or_set('retrieve', kwargs, default=lambda: super(CachedReadOnlyModelViewSet, self).retrieve(request, *args, **kwargs).data)
+        return Response(data)
+
+
+def regions_tagged_with(model: type[Model]) -> list[CacheRegion]:
+    return [region for region in REGIONS if model in region.tags]
+
+
+def tagged_models() -> set[type[Model]]:
+    return {model for region in REGIONS for model in region.tags}
@@ -10,6 +10,7 @@ from rest_framework.test import APIClient
 
 from django.test import Client, TestCase
 from django.utils import timezone
+from django.core.cache import cache
 from django.core.files.images import ImageFile
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
@@ -73,6 +74,13 @@ def fixture_db(db: Any) -> Any:
     yield db
 
 
+@pytest.fixture(autouse=True)
+def fixture_clear_cache() -> Iterator[None]:
+    """Every test starts without cached responses, see samfundet/caching.py."""
+    cache.clear()
+    yield None
+
+
 @pytest.fixture(autouse=True)
 def fixture_db_billig() -> Iterator[None]:
     billig_seed.create_db()
@@ -492,6 +500,26 @@ def fixture_recruitment_application2(
     application2.delete()
 
 
+def apply_to_position(*, user: User, position: RecruitmentPosition, count: int = 1) -> list[RecruitmentApplication]:
+    """
+    `count` applications from `user`, ranked in creation order. The first is to `position`, the others to copies of
+    it, as an applicant applies to a position only once. Not a fixture, import it.
+    """
+    applications = []
+    for i in range(count):
+        applied_to = position
+        if i:
+            applied_to = RecruitmentPosition.objects.get(pk=position.pk)
+            applied_to.pk = None
+            applied_to.name_nb = f'{position.name_nb} {i}'
+            applied_to.save()
+        application = RecruitmentApplication.objects.create(
+            user=user, recruitment_position=applied_to, recruitment=position.recruitment, application_text='I have applied'
+        )
+        applications.append(application)
+    return applications
+
+
 @pytest.fixture
 def fixture_venue() -> Iterator[Venue]:
     venue = Venue.objects.create(
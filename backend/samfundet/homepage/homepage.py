@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import contextlib
+import datetime
 from typing import Any
 from dataclasses import dataclass
 
 from django.utils import timezone
 
+from samfundet.caching import HOMEPAGE
 from samfundet.serializers import EventSerializer
 from samfundet.models.event import Event
 from samfundet.models.model_choices import EventStatus, EventCategory
@@ -16,12 +17,20 @@ class ElementType:
     LARGE_CARD = 'large-card'
 
 
+# Events stay on the home page this long after they start
+UPCOMING_GRACE = timezone.timedelta(hours=6)
+
+SPLASH_COUNT = 3
+UPCOMING_COUNT = 9
+DEBATE_COUNT = 10
+
+
 @dataclass
 class HomePageElement:
     variation: str
     title_nb: str
     title_en: str
-    events: list[Event]
+    events: list[dict[str, Any]]
     description_nb: str | None = None
     description_en: str | None = None
 
@@ -30,24 +39,37 @@ class HomePageElement:
             'variation': self.variation,
             'title_nb': self.title_nb,
             'title_en': self.title_en,
-            'events': EventSerializer(self.events, many=True).data,
+            'events': self.events,
             'description_nb': self.description_nb,
             'description_en': self.description_en,
         }
 
 
-def large_card(event: Event) -> HomePageElement:
+@dataclass
+class HomePage:
+    """The serialized home page, and when it must be rebuilt because an event has dropped out of it."""
+
+    payload: dict[str, Any]
+    expires_at: datetime.datetime | None
+
+    def seconds_left(self) -> float | None:
+        if self.expires_at is None:
+            return None
+        return (self.expires_at - timezone.now()).total_seconds()
+
+
+def large_card(event: dict[str, Any]) -> HomePageElement:
     return HomePageElement(
         variation=ElementType.LARGE_CARD,
-        title_nb=event.title_nb,
-        title_en=event.title_en,
-        description_nb=event.description_short_nb,
-        description_en=event.description_short_en,
+        title_nb=event['title_nb'],
+        title_en=event['title_en'],
+        description_nb=event['description_short_nb'],
+        description_en=event['description_short_en'],
         events=[event],
     )
 
 
-def carousel(*, title_nb: str, title_en: str, events: list[Event]) -> HomePageElement:
+def carousel(*, title_nb: str, title_en: str, events: list[dict[str, Any]]) -> HomePageElement:
     return HomePageElement(
         variation=ElementType.CAROUSEL,
         title_nb=title_nb,
@@ -56,58 +78,52 @@ def carousel(*, title_nb: str, title_en: str, events: list[Event]) -> HomePageEl
     )
 
 
-def generate() -> dict[str, Any]:
-    elements: list[HomePageElement] = []
+def cached() -> dict[str, Any]:
+    """The home page as last built, until an event, ticket or image changes or an event drops out of it."""
+    return HOMEPAGE.get_or_set(default=build, timeout_for=HomePage.seconds_left).payload
+
+
+async def acached() -> dict[str, Any]:
+    """cached() for async views."""
+    page = await HOMEPAGE.aget_or_set(default=build, timeout_for=HomePage.seconds_left)
+    return page.payload
+
 
+def build() -> HomePage:
+    """Fetches and serializes every upcoming event once, and lays the page out from those."""
     # TODO: apply custom weighting
-    upcoming_events = Event.objects.filter(start_dt__gt=timezone.now() - timezone.timedelta(hours=6), status=EventStatus.PUBLIC).order_by('start_dt')
+    upcoming_events = list(
+        Event.objects.filter(start_dt__gt=timezone.now() - UPCOMING_GRACE, status=EventStatus.PUBLIC)
+        .order_by('start_dt')
+        .select_related('image')
+        .prefetch_related('custom_tickets', 'editors', 'image__tags')
+    )
+    # Reads the billig snapshots of all of them at once
+    serialized = EventSerializer(upcoming_events, many=True).data
+    expires_at = upcoming_events[0].start_dt + UPCOMING_GRACE if upcoming_events else None
+    return HomePage(payload=generate(events=serialized), expires_at=expires_at)
+
 
-    # Optimize DB queries by:
-    # - select_related (FK and OTO) to perform an SQL JOIN, fetching related 'image' data in the same query.
-    # - prefetch_related (MTM and reverse FK) to fetch related objects in separate queries and join in Python.
-    # Reduces the number of DB queries.
-    prefetch = ['custom_tickets', 'editors']
-    select = ['image']
-    upcoming_events = upcoming_events.select_related(*select).prefetch_related(*prefetch)
+def generate(*, events: list[dict[str, Any]]) -> dict[str, Any]:
+    """Lays out the home page from the serialized upcoming events, in order."""
+    elements: list[HomePageElement] = []
 
     # Splash events
     # TODO we should make a datamodel for this
-    try:
-        splash_events = list(upcoming_events[0 : min(3, len(upcoming_events))])
-        splash = EventSerializer(splash_events, many=True).data
-    except IndexError:
-        splash = []
-        pass
+    splash = events[:SPLASH_COUNT]
 
     # Upcoming events
-    with contextlib.suppress(IndexError):
-        elements.append(
-            carousel(
-                title_nb='Kommende arrangementer',
-                title_en='Upcoming events',
-                events=list(upcoming_events[:9]),
-            )
-        )
+    elements.append(carousel(title_nb='Kommende arrangementer', title_en='Upcoming events', events=events[:UPCOMING_COUNT]))
 
     # TODO: fetch info boxes
 
     # Another highlight
     # TODO we should make a datamodel for this
-    try:
-        splash_event2: Event = upcoming_events.last()
-        if splash_event2:
-            elements.append(large_card(splash_event2))
-    except IndexError:
-        pass
+    if events:
+        elements.append(large_card(events[-1]))
 
     # Debates
-    with contextlib.suppress(IndexError):
-        elements.append(
-            carousel(
-                title_nb='Debatter',
-                title_en='Debates',
-                events=list(upcoming_events.filter(category=EventCategory.DEBATE)[:10]),
-            )
-        )
+    debates = [event for event in events if event['category'] == EventCategory.DEBATE]
+    elements.append(carousel(title_nb='Debatter', title_en='Debates', events=debates[:DEBATE_COUNT]))
 
     return {'splash': splash, 'elements': [el.to_dict() for el in elements]}
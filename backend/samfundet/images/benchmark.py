@@ -0,0 +1,119 @@
+"""
+Measures what a set of variant settings costs and gives, see the benchmark_image_variants command.
+
+Like samfundet.images.variants this only depends on Pillow, since each measurement runs in a fresh process
+so that its peak memory is not hidden by an earlier one.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import resource
+from io import BytesIO
+from typing import TYPE_CHECKING
+from dataclasses import dataclass
+
+from PIL import Image as PilImage
+from PIL import ImageOps, ImageMath
+
+from samfundet.images.variants import ImageVariant, crop_box, encode_variants
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+# SSIM is computed over non-overlapping blocks of this many pixels square, on the luma channel
+SSIM_BLOCK = 8
+_C1 = (0.01 * 255) ** 2
+_C2 = (0.03 * 255) ** 2
+
+
+@dataclass(frozen=True)
+class Profile:
+    name: str
+    variants: Mapping[str, ImageVariant]
+    resample: PilImage.Resampling
+
+
+@dataclass(frozen=True)
+class VariantResult:
+    name: str
+    size: tuple[int, int]
+    bytes: int
+    ssim: float
+
+
+@dataclass(frozen=True)
+class Measurement:
+    image: str
+    profile: str
+    megapixels: float
+    # Fastest of the repeats, for every variant together
+    seconds: float
+    # Growth of the peak resident memory while encoding
+    peak_bytes: int
+    variants: tuple[VariantResult, ...]
+
+    @property
+    def ms_per_megapixel(self) -> float:
+        return self.seconds * 1000 / self.megapixels
+
+
+def measure(*, image: str, data: bytes, profile: Profile, repeat: int) -> Measurement:
+    """Encodes the variants of one image `repeat` times with the settings of `profile`. Meant to run in a fresh process."""
+    baseline = _peak_rss()
+    seconds = float('inf')
+    encoded: dict[str, bytes] | None = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encoded = encode_variants(data, profile.variants, resample=profile.resample)
+        seconds = min(seconds, time.perf_counter() - start)
+    peak_bytes = _peak_rss() - baseline
+
+    with PilImage.open(BytesIO(data)) as source:
+        megapixels = source.width * source.height / 1_000_000
+        results = () if encoded is None else tuple(_score(source, profile.variants[name], name, content) for name, content in encoded.items())
+    return Measurement(image=image, profile=profile.name, megapixels=megapixels, seconds=seconds, peak_bytes=peak_bytes, variants=results)
+
+
+def _score(source: PilImage.Image, variant: ImageVariant, name: str, content: bytes) -> VariantResult:
+    with PilImage.open(BytesIO(content)) as encoded:
+        encoded.load()
+        # The reference is resized straight from the fully decoded original, so losses from decoding at a
+        # smaller scale and resizing in steps count as well
+        original = (ImageOps.exif_transpose(source) or source).convert(encoded.mode)
+        reference = original.resize(encoded.size, PilImage.Resampling.LANCZOS, box=crop_box(original.size, variant.max_aspect))
+        return VariantResult(name=name, size=encoded.size, bytes=len(content), ssim=ssim(reference, encoded))
+
+
+def ssim(a: PilImage.Image, b: PilImage.Image) -> float:
+    """Mean structural similarity of the luma of two images of the same size, 1 meaning identical."""
+    x = a.convert('L').convert('F')
+    y = b.convert('L').convert('F')
+    blocks = (max(1, x.width // SSIM_BLOCK), max(1, x.height // SSIM_BLOCK))
+
+    def block_mean(image: PilImage.Image) -> PilImage.Image:
+        return image.resize(blocks, PilImage.Resampling.BOX)
+
+    stats = {
+        'mx': block_mean(x),
+        'my': block_mean(y),
+        'xx': block_mean(ImageMath.lambda_eval(lambda args: args['x'] * args['x'], x=x)),
+        'yy': block_mean(ImageMath.lambda_eval(lambda args: args['y'] * args['y'], y=y)),
+        'xy': block_mean(ImageMath.lambda_eval(lambda args: args['x'] * args['y'], x=x, y=y)),
+    }
+    similarity = ImageMath.lambda_eval(_block_ssim, **stats)
+    return similarity.resize((1, 1), PilImage.Resampling.BOX).getpixel((0, 0))
+
+
+def _block_ssim(args: dict) -> PilImage.Image:
+    mx, my = args['mx'], args['my']
+    covariance = args['xy'] - mx * my
+    variances = args['xx'] - mx * mx + args['yy'] - my * my
+    return ((2 * mx * my + _C1) * (2 * covariance + _C2)) / ((mx * mx + my * my + _C1) * (variances + _C2))
+
+
+def _peak_rss() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
@@ -0,0 +1,193 @@
+"""
+Bulk import of image files, e.g. when migrating an archive. See the import_images command.
+
+Instead of saving one Image at a time, files are read and stored with concurrent I/O, prepared
+(checked, stripped of metadata, variants encoded) on a process pool, and inserted in batches with
+bulk_create. Files whose content hash matches an image already imported are skipped.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import logging
+from typing import TYPE_CHECKING
+from pathlib import Path
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import transaction
+from django.conf import settings
+from django.utils import timezone
+from django.core.files.base import ContentFile
+
+from samfundet.search import update_search_vectors
+from samfundet.caching import regions_tagged_with
+from samfundet.models.general import Tag, Image, image_upload_path
+from samfundet.images.pipeline import ENCODING_ERRORS
+from samfundet.images.originals import PreparedImage, prepare
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from concurrent.futures import Executor
+
+LOG = logging.getLogger(__name__)
+
+TITLE_MAX_LENGTH = Image._meta.get_field('title').max_length
+
+
+@dataclass(frozen=True)
+class ImportSource:
+    path: Path
+    title: str
+    tags: tuple[str, ...] = ()
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    duplicates: int = 0
+    failed: int = 0
+
+
+def sources_from_directory(directory: Path, *, tags: tuple[str, ...] = ()) -> list[ImportSource]:
+    """Every file below `directory`, titled by its name. Files which are not images fail when imported."""
+    return [ImportSource(path=path, title=path.stem, tags=tags) for path in sorted(directory.rglob('*')) if path.is_file()]
+
+
+def sources_from_manifest(manifest: Path, *, tags: tuple[str, ...] = ()) -> list[ImportSource]:
+    """
+    A CSV file with a `path` column, relative to the manifest or absolute, and optionally `title` and
+    `tags` (comma separated) columns.
+    """
+    with open(manifest, newline='') as file:
+        rows = list(csv.DictReader(file))
+    return [
+        ImportSource(
+            path=manifest.parent / row['path'],
+            title=row.get('title') or Path(row['path']).stem,
+            tags=tags + tuple(tag.strip() for tag in (row.get('tags') or '').split(',') if tag.strip()),
+        )
+        for row in rows
+    ]
+
+
+def import_images(
+    sources: Iterable[ImportSource],
+    *,
+    executor: Executor,
+    io_workers: int,
+    batch_size: int,
+    progress: Callable[[ImportResult], None] | None = None,
+) -> ImportResult:
+    """Imports `sources` in batches of `batch_size`, preparing the images on `executor`. Only one batch is held in memory at a time."""
+    result = ImportResult()
+    importer = _Importer(executor=executor, result=result)
+    with ThreadPoolExecutor(max_workers=io_workers) as io:
+        for batch in _batched(list(sources), batch_size):
+            importer.import_batch(batch, io=io)
+            if progress:
+                progress(result)
+    # bulk_create sends no signals, the search vectors are built by _insert
+    for region in regions_tagged_with(Image):
+        region.invalidate()
+    return result
+
+
+class _Importer:
+    def __init__(self, *, executor: Executor, result: ImportResult) -> None:
+        self.executor = executor
+        self.result = result
+        # Content hashes imported by earlier batches, so duplicates within the import are skipped too
+        self.seen: set[str] = set()
+        self.tags: dict[str, Tag] = {}
+
+    def import_batch(self, batch: list[ImportSource], *, io: ThreadPoolExecutor) -> None:
+        read = [item for item in io.map(_read, batch) if item is not None]
+        self.result.failed += len(batch) - len(read)
+        unseen = self._skip_duplicates(read)
+        futures = [
+            self.executor.submit(
+                prepare,
+                data,
+                variants=Image.VARIANTS,
+                variant_size_threshold=Image.VARIANT_SIZE_THRESHOLD,
+                max_pixels=settings.IMAGE_VARIANT_MAX_PIXELS,
+            )
+            for _, _, data in unseen
+        ]
+        prepared = []
+        for (source, digest, _), future in zip(unseen, futures, strict=True):
+            try:
+                prepared.append((source, digest, future.result()))
+            except ENCODING_ERRORS:
+                LOG.exception('Could not import %s', source.path)
+                self.result.failed += 1
+        images = list(io.map(lambda args: _store(*args), prepared))
+        self._insert(images, tags=[source.tags for source, _, _ in prepared])
+
+    def _skip_duplicates(self, read: list[tuple[ImportSource, str, bytes]]) -> list[tuple[ImportSource, str, bytes]]:
+        stored = set(Image.objects.filter(content_hash__in=[digest for _, digest, _ in read]).values_list('content_hash', flat=True))
+        unseen = []
+        for source, digest, data in read:
+            if digest in stored or digest in self.seen:
+                self.result.duplicates += 1
+                continue
+            self.seen.add(digest)
+            unseen.append((source, digest, data))
+        return unseen
+
+    def _insert(self, images: list[Image], *, tags: list[tuple[str, ...]]) -> None:
+        try:
+            with transaction.atomic():
+                Image.objects.bulk_create(images)
+                Image.tags.through.objects.bulk_create(
+                    Image.tags.through(image_id=image.id, tag_id=tag.id) for image, names in zip(images, tags, strict=True) for tag in self._tags(names)
+                )
+                update_search_vectors(Image, pks=[image.pk for image in images])
+        except Exception:
+            # The rows were never inserted, so nothing refers to the stored files
+            for image in images:
+                Image.schedule_file_cleanup(tuple(getattr(image, field).name for field in Image.FILE_FIELDS))
+            raise
+        self.result.imported += len(images)
+
+    def _tags(self, names: tuple[str, ...]) -> set[Tag]:
+        for name in names:
+            if name.lower() not in self.tags:
+                self.tags[name.lower()] = Tag.find_or_create(name)
+        return {self.tags[name.lower()] for name in names}
+
+
+def _read(source: ImportSource) -> tuple[ImportSource, str, bytes] | None:
+    try:
+        data = source.path.read_bytes()
+    except OSError:
+        LOG.exception('Could not read %s', source.path)
+        return None
+    return source, hashlib.sha256(data).hexdigest(), data
+
+
+def _store(source: ImportSource, digest: str, prepared: PreparedImage) -> Image:
+    """Writes the files of a prepared image to storage, and returns its unsaved row."""
+    storage = Image._meta.get_field('image').storage
+    name = Image.random_file_name(prepared.extension)
+    now = timezone.now()
+    image = Image(
+        title=source.title[:TITLE_MAX_LENGTH],
+        content_hash=digest,
+        image=storage.save(image_upload_path(None, name), ContentFile(prepared.original)),
+        # As set by CustomBaseModel.save
+        version=1,
+        created_at=now,
+        updated_at=now,
+    )
+    stem = Path(name).stem
+    for variant, content in (prepared.variants or {}).items():
+        setattr(image, f'image_{variant}', storage.save(image_upload_path(None, f'{stem}_{variant}.webp'), ContentFile(content)))
+    return image
+
+
+def _batched(items: list[ImportSource], size: int) -> Iterator[list[ImportSource]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
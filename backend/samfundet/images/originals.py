@@ -0,0 +1,94 @@
+"""
+Checking and cleaning of uploaded originals.
+
+Like samfundet.images.variants this only depends on Pillow, so bulk imports can prepare images in worker processes.
+"""
+
+from __future__ import annotations
+
+from io import BytesIO
+from typing import TYPE_CHECKING, Any
+from dataclasses import dataclass
+
+from PIL import Image as PilImage
+from PIL import ImageOps, JpegImagePlugin
+
+from samfundet.images.variants import ORIENTATION_EXIF_TAG, encode_variants
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from samfundet.images.variants import ImageVariant
+
+# Accepted upload formats (PIL format names)
+ALLOWED_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP', 'TIFF')
+
+
+class UnsupportedFormatError(ValueError):
+    pass
+
+
+def file_extension(pil: PilImage.Image) -> str:
+    """The file extension for the actual format of the image. Raises UnsupportedFormatError for formats not allowed."""
+    image_format = pil.format or ''
+    if image_format not in ALLOWED_FORMATS:
+        raise UnsupportedFormatError(f'Unsupported image format: {image_format or "<unknown>"}')
+    # normalize both JPG/JPEG to use .jpg
+    return {'JPEG': '.jpg'}.get(image_format, f'.{image_format.lower()}')
+
+
+def strip_metadata(pil: PilImage.Image) -> bytes | None:
+    """The image re-encoded without metadata, so e.g. GPS EXIF from phone photos is never leaked. None if there is nothing to strip.
+
+    - Only strips JPEG/PNG
+    - Orientation is baked into the pixels, the ICC color profile is kept
+    """
+    exif = pil.getexif()
+    has_metadata = exif or pil.info.get('exif') or pil.info.get('xmp')
+    strippable = pil.format in ('JPEG', 'PNG') and not getattr(pil, 'is_animated', False)
+    if not (strippable and has_metadata):
+        return None
+
+    options: dict[str, Any] = {'exif': b'', 'xmp': b'', 'icc_profile': pil.info.get('icc_profile')}
+
+    # 1 means "no rotation needed"
+    needs_rotation = exif.get(ORIENTATION_EXIF_TAG, 1) != 1
+    stripped = (ImageOps.exif_transpose(pil) or pil) if needs_rotation else pil
+
+    if isinstance(pil, JpegImagePlugin.JpegImageFile):
+        # Inherit the source's compression instead of picking a new quality
+        if needs_rotation:
+            options |= {'qtables': pil.quantization, 'subsampling': JpegImagePlugin.get_sampling(pil)}
+        else:
+            options |= {'quality': 'keep', 'subsampling': 'keep'}
+
+    buffer = BytesIO()
+    stripped.save(buffer, format=pil.format, **options)
+    return buffer.getvalue()
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    extension: str
+    # Without metadata
+    original: bytes
+    # None if the original is served as-is
+    variants: dict[str, bytes] | None
+
+
+def prepare(data: bytes, *, variants: Mapping[str, ImageVariant], variant_size_threshold: int, max_pixels: int | None) -> PreparedImage:
+    """
+    Everything an upload goes through, in one go: format check, metadata stripping and variants.
+    Raises UnsupportedFormatError, or OSError if the data is not a readable image.
+    """
+    with PilImage.open(BytesIO(data)) as pil:
+        extension = file_extension(pil)
+        original = strip_metadata(pil) or data
+    if len(original) <= variant_size_threshold:
+        return PreparedImage(extension=extension, original=original, variants=None)
+    try:
+        encoded = encode_variants(original, variants, max_pixels=max_pixels)
+    except PilImage.DecompressionBombError:
+        # Like the variant worker, serve the original
+        encoded = None
+    return PreparedImage(extension=extension, original=original, variants=encoded)
@@ -0,0 +1,78 @@
+"""
+Generation of queued image variants, off the request.
+
+Uploads only store the original and set Image.variants_pending_since. The generate_image_variants worker
+reads the pending originals, encodes them on an executor (a process pool, as encoding is CPU bound) and
+stores the results.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+from concurrent.futures import as_completed
+
+from PIL import Image as PilImage
+
+from django.db import transaction
+from django.conf import settings
+from django.utils import timezone
+
+from samfundet.models.general import Image
+from samfundet.images.variants import encode_variants
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from concurrent.futures import Executor
+
+LOG = logging.getLogger(__name__)
+
+# Errors from a broken or unreadable original, or one too large to decode. Its variants are skipped so it is not retried forever.
+ENCODING_ERRORS = (OSError, ValueError, PilImage.DecompressionBombError)
+
+
+def queue_all() -> int:
+    """Queue every image with variants for regeneration, e.g. after changing Image.VARIANTS. Returns how many were queued."""
+    # Small originals never get variants, but only the storage knows their size
+    large = [image.pk for image in Image.objects.only('image') if image.image.size > Image.VARIANT_SIZE_THRESHOLD]
+    return Image.objects.filter(pk__in=large).update(variants_pending_since=timezone.now())
+
+
+def generate_pending_variants(*, executor: Executor, batch_size: int) -> int:
+    """Encodes the variants of up to `batch_size` queued images on `executor` and stores them. Returns how many were stored."""
+    pending = Image.objects.filter(variants_pending_since__isnull=False).order_by('variants_pending_since')[:batch_size]
+    futures = {}
+    stored = 0
+    for image in pending:
+        try:
+            original = image.read_original()
+        except ENCODING_ERRORS:
+            stored += _skip(image)
+            continue
+        futures[executor.submit(encode_variants, original, Image.VARIANTS, max_pixels=settings.IMAGE_VARIANT_MAX_PIXELS)] = image
+    for future in as_completed(futures):
+        image = futures[future]
+        try:
+            encoded = future.result()
+        except ENCODING_ERRORS:
+            stored += _skip(image)
+            continue
+        stored += _store(image=image, pending_since=image.variants_pending_since, encoded=encoded)
+    return stored
+
+
+def _skip(image: Image) -> bool:
+    LOG.exception('Could not generate variants for image %s (%s), serving the original', image.pk, image.image.name)
+    return _store(image=image, pending_since=image.variants_pending_since, encoded=None)
+
+
+def _store(*, image: Image, pending_since: datetime | None, encoded: dict[str, bytes] | None) -> bool:
+    with transaction.atomic():
+        # The lock keeps a concurrent upload from being overwritten by variants of the previous file.
+        # If the image was replaced or queued again meanwhile, the new queue entry is processed instead.
+        current = Image.objects.select_for_update().filter(pk=image.pk, image=image.image.name, variants_pending_since=pending_since).first()
+        if current is None:
+            return False
+        current.store_variants(encoded)
+        current.save()
+    return True
@@ -0,0 +1,122 @@
+"""
+Encoding of the downscaled WebP variants of an uploaded image.
+
+Only depends on Pillow, so it can run in worker processes without Django set up. Data goes in and out as
+bytes, reading and storing the files is left to the caller (see samfundet.images.pipeline).
+"""
+
+from __future__ import annotations
+
+import math
+from io import BytesIO
+from typing import TYPE_CHECKING
+from dataclasses import dataclass
+
+from PIL import Image as PilImage
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+ORIENTATION_EXIF_TAG = 0x0112
+# EXIF orientation to the transpose which undoes it, like ImageOps.exif_transpose
+_ORIENTATION_TRANSPOSE = {
+    2: PilImage.Transpose.FLIP_LEFT_RIGHT,
+    3: PilImage.Transpose.ROTATE_180,
+    4: PilImage.Transpose.FLIP_TOP_BOTTOM,
+    5: PilImage.Transpose.TRANSPOSE,
+    6: PilImage.Transpose.ROTATE_270,
+    7: PilImage.Transpose.TRANSVERSE,
+    8: PilImage.Transpose.ROTATE_90,
+}
+# Like Image.thumbnail: shrink by an integer factor first, as long as at least twice the target size is left
+REDUCING_GAP = 2.0
+
+
+@dataclass(frozen=True, kw_only=True)
+class ImageVariant:
+    # longest side (px), never upscaled
+    max_size: int
+    # If lossy: WebP quality.
+    # If lossless: compression effort.
+    quality: int
+    # Images more elongated than this ratio (long side / short side) are
+    # center-cropped down to it before downscaling
+    max_aspect: float
+    lossless: bool
+    # WebP encoder effort, 0 (fastest) to 6 (smallest files)
+    method: int = 4
+
+
+def encode_variants(
+    data: bytes,
+    variants: Mapping[str, ImageVariant],
+    *,
+    resample: PilImage.Resampling = PilImage.Resampling.LANCZOS,
+    max_pixels: int | None = None,
+) -> dict[str, bytes] | None:
+    """
+    Encoded WebP bytes for each variant, or None for animated images, which are served as the original.
+
+    Raises DecompressionBombError if decoding would take more than `max_pixels`. JPEGs are decoded at the
+    smallest scale still covering the largest variant. The variants are then resized largest first, each
+    from the pixels of the next larger one, cropping as part of the resize so the source is never copied.
+    """
+    with PilImage.open(BytesIO(data)) as source:
+        if getattr(source, 'is_animated', False):
+            # Resizing would drop animation frames
+            return None
+        ordered = sorted(variants.items(), key=lambda item: item[1].max_size, reverse=True)
+        # From the full size, so the outcome does not depend on the scale JPEG decoding picks
+        largest_size = variant_size(source.size, ordered[0][1])
+        left, _, right, _ = crop_box(source.size, ordered[0][1].max_aspect)
+        pil = decode(source, scale=largest_size[0] / (right - left), max_pixels=max_pixels)
+        # Undoes the orientation of the source, the variants are encoded without EXIF
+        transpose = _ORIENTATION_TRANSPOSE.get(source.getexif().get(ORIENTATION_EXIF_TAG, 1))
+
+        encoded: dict[str, bytes] = {}
+        for name, variant in ordered:
+            size = variant_size(pil.size, variant) if encoded else largest_size
+            pil = pil.resize(size, resample, box=crop_box(pil.size, variant.max_aspect), reducing_gap=REDUCING_GAP)
+            if not encoded and transpose is not None:
+                # Cheaper on the downscaled pixels. The crop is centered, so it is the same whether rotated before or after.
+                pil = pil.transpose(transpose)
+            buffer = BytesIO()
+            pil.save(buffer, format='WEBP', lossless=variant.lossless, quality=variant.quality, method=variant.method)
+            encoded[name] = buffer.getvalue()
+        return encoded
+
+
+def decode(source: PilImage.Image, *, scale: float, max_pixels: int | None) -> PilImage.Image:
+    """
+    The pixels of `source` in a mode WebP can encode, at no less than `scale` times its size. Only JPEG
+    can decode at a smaller scale (1/2, 1/4 or 1/8), everything else is decoded at full size.
+    """
+    source.draft(None, (math.ceil(source.width * scale), math.ceil(source.height * scale)))
+    if max_pixels is not None and source.width * source.height > max_pixels:
+        raise PilImage.DecompressionBombError(f'Decoding {source.width}x{source.height} pixels exceeds the limit of {max_pixels}')
+    if source.mode in ('RGB', 'RGBA'):
+        return source
+    # Palette images may carry transparency, so they keep an alpha channel
+    return source.convert('RGBA' if source.mode == 'P' or 'A' in source.getbands() else 'RGB')
+
+
+def crop_box(size: tuple[int, int], max_aspect: float) -> tuple[int, int, int, int]:
+    """The centered box of an image of `size` in which no side exceeds max_aspect times the other."""
+    width, height = size
+    if width > height * max_aspect:
+        crop_width = round(height * max_aspect)
+        left = (width - crop_width) // 2
+        return left, 0, left + crop_width, height
+    if height > width * max_aspect:
+        crop_height = round(width * max_aspect)
+        top = (height - crop_height) // 2
+        return 0, top, width, top + crop_height
+    return 0, 0, width, height
+
+
+def variant_size(size: tuple[int, int], variant: ImageVariant) -> tuple[int, int]:
+    """Size of the variant of an image of `size`: cropped, then fit within max_size."""
+    left, top, right, bottom = crop_box(size, variant.max_aspect)
+    width, height = right - left, bottom - top
+    scale = min(1.0, variant.max_size / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
@@ -4,6 +4,8 @@ from typing import TYPE_CHECKING, Any
 
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.contrib.postgres.search import SearchVectorField
+from django.contrib.postgres.indexes import GinIndex
 
 from root.utils.mixins import CustomBaseModel, FullCleanSaveMixin
 
@@ -54,6 +56,9 @@ class InformationPage(CustomBaseModel):
         editable=False,
     )
 
+    # Slug and the current revision's content, maintained by samfundet.search
+    search_vector = SearchVectorField(null=True, editable=False)
+
     def clean(self) -> None:
         super().clean()
 
@@ -73,6 +78,13 @@ class InformationPage(CustomBaseModel):
 
     # the `resolve_*` functions are from role system, see docs/technical/rolesystem.md
 
+    # A page has either a gang or a section, so whichever of the two paths is set is the owner
+    owner_paths = {
+        'org': ('gang__organization', 'section__gang__organization'),
+        'gang': ('gang', 'section__gang'),
+        'section': 'section',
+    }
+
     def resolve_org(self, *, return_id: bool = False) -> Organization | int | None:
         gang = self.owner_gang()
         if gang is None:
@@ -94,6 +106,7 @@ class InformationPage(CustomBaseModel):
     class Meta:
         verbose_name = 'InformationPage'
         verbose_name_plural = 'InformationPages'
+        indexes = [GinIndex(fields=['search_vector'], name='informationpage_search_vector')]
 
         # This constraint ensures that ONLY gang or section is set, not both
         constraints = [
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING
 from django.db import transaction
 from django.db.models import Max
 
+from samfundet.search import update_search_vectors
 from samfundet.infopages.models import InformationPage, InformationPageRevision
 
 if TYPE_CHECKING:
@@ -65,5 +66,7 @@ def _write_revision(*, page: InformationPage, content: Content, user: User | Non
     # single edit
     InformationPage.objects.filter(pk=page.pk).update(current_revision=revision)
     page.current_revision = revision
+    # The update sends no post_save, which would have rebuilt it
+    update_search_vectors(InformationPage, pks=[page.pk])
 
     return revision
@@ -14,6 +14,7 @@ from django.shortcuts import get_object_or_404
 from root.constants import WebFeatures
 from root.custom_classes.permission_classes import FeatureEnabled
 
+from samfundet.search import full_text_search
 from samfundet.infopages.models import InformationPage
 from samfundet.infopages.selectors import owner_options_for
 from samfundet.infopages.permissions import CanAdministerInformationPage
@@ -47,7 +48,12 @@ class AdminInformationPageViewSet(ModelViewSet):
         return AdminInformationPageReadSerializer
 
     def get_queryset(self) -> QuerySet[InformationPage]:
-        return InformationPage.objects.administered_by(self.request.user).with_owner()
+        """When listing, ?search=<text> returns the pages matching on slug, title or text, best match first."""
+        pages = InformationPage.objects.administered_by(self.request.user).with_owner()
+        search = self.request.query_params.get('search')
+        if self.action == 'list' and search:
+            pages = full_text_search(pages, search)
+        return pages
 
     def create(self, request: Request, *args: object, **kwargs: object) -> Response:
         return self._write(request, status_code=status.HTTP_201_CREATED)
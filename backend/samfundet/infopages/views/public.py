@@ -1,27 +1,26 @@
 from __future__ import annotations
 
-from rest_framework.mixins import RetrieveModelMixin
-from rest_framework.viewsets import GenericViewSet
-from rest_framework.permissions import AllowAny
+from typing import Any
 
-from django.db.models import QuerySet
+from asgiref.sync import sync_to_async
+
+from django.http import HttpRequest
+from django.shortcuts import aget_object_or_404
+
+from root.custom_classes.async_views import AsyncReadOnlyView
 
 from samfundet.infopages.models import InformationPage
 from samfundet.infopages.serializers.public import PublicInformationPageSerializer
 
 
-class PublicInformationPageViewSet(RetrieveModelMixin, GenericViewSet):
+class PublicInformationPageView(AsyncReadOnlyView):
     """
     A single information page, as the public sees it.
 
     Retrieve only, on purpose. There is deliberately no public way to enumerate every info page.
     """
 
-    permission_classes = [AllowAny]
-    serializer_class = PublicInformationPageSerializer
-    lookup_field = 'slug_field'
-
-    def get_queryset(self) -> QuerySet[InformationPage]:
-        # TODO: consider with_owner(), or adjusting the public serializer so that ownership is included for those with
-        #  permission, in order to let us display the "edit" button to non-superusers who have edit rights to the page
-        return InformationPage.objects.visible().select_related('current_revision')
+    async def data(self, request: HttpRequest, **kwargs: Any) -> dict[str, Any]:
+        page = await aget_object_or_404(InformationPage.objects.visible().select_related('current_revision'), slug_field=kwargs['slug_field'])
+        # Rendering image directives looks the images up
+        return await sync_to_async(lambda: PublicInformationPageSerializer(page).data)()
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('samfundet', '0016_event_general_link_event_lastfm_link_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recruitmentstatistics',
+            name='refreshed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Last recounted'),
+        ),
+        migrations.AddField(
+            model_name='recruitmentstatistics',
+            name='stale_since',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Stale since'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('samfundet', '0017_recruitmentstatistics_stale_since'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BilligEventSnapshot',
+            fields=[
+                ('billig_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('data', models.JSONField()),
+                ('synced_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'BilligEventSnapshot',
+                'verbose_name_plural': 'BilligEventSnapshots',
+            },
+        ),
+    ]
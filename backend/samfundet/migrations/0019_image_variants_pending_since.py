@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('samfundet', '0018_billigeventsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='variants_pending_since',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
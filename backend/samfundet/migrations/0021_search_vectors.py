@@ -0,0 +1,111 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:39
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+# The vectors as samfundet.search built them when this migration was written. Frozen here, so later changes to
+# the search do not change what this migration does.
+
+
+def event_vector(apps):
+    group_name = Subquery(apps.get_model('samfundet', 'EventGroup').objects.filter(pk=OuterRef('event_group')).values('name'))
+    return (
+        SearchVector('title_nb', config='norwegian', weight='A')
+        + SearchVector('title_en', config='english', weight='A')
+        + SearchVector('description_short_nb', config='norwegian', weight='B')
+        + SearchVector('description_short_en', config='english', weight='B')
+        + SearchVector(group_name, config='simple', weight='B')
+        + SearchVector('description_long_nb', config='norwegian', weight='C')
+        + SearchVector('description_long_en', config='english', weight='C')
+        + SearchVector('location', config='simple', weight='D')
+    )
+
+
+def image_vector(apps):
+    through = apps.get_model('samfundet', 'Image').tags.through
+    tag_names = Subquery(through.objects.filter(image=OuterRef('pk')).values('image').annotate(names=StringAgg('tag__name', ' ')).values('names'))
+    return SearchVector('title', config='simple', weight='A') + SearchVector(tag_names, config='simple', weight='B')
+
+
+def information_page_vector(apps):
+    revisions = apps.get_model('samfundet', 'InformationPageRevision').objects.filter(pk=OuterRef('current_revision'))
+
+    def revision(field):
+        return Subquery(revisions.values(field))
+
+    return (
+        SearchVector(revision('title_nb'), config='norwegian', weight='A')
+        + SearchVector(revision('title_en'), config='english', weight='A')
+        + SearchVector('slug_field', config='simple', weight='B')
+        + SearchVector(revision('text_nb'), config='norwegian', weight='C')
+        + SearchVector(revision('text_en'), config='english', weight='C')
+    )
+
+
+def user_vector(apps):
+    return SearchVector('username', 'first_name', 'last_name', config='simple', weight='A')
+
+
+VECTORS = {
+    'Event': event_vector,
+    'Image': image_vector,
+    'InformationPage': information_page_vector,
+    'User': user_vector,
+}
+
+
+def build_search_vectors(apps, schema_editor):
+    for model_name, vector in VECTORS.items():
+        apps.get_model('samfundet', model_name).objects.update(search_vector=vector(apps))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('samfundet', '0020_image_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='informationpage',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='event_search_vector'),
+        ),
+        migrations.AddIndex(
+            model_name='image',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='image_search_vector'),
+        ),
+        migrations.AddIndex(
+            model_name='informationpage',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='informationpage_search_vector'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='user_search_vector'),
+        ),
+        migrations.RunPython(build_search_vectors, migrations.RunPython.noop),
+    ]
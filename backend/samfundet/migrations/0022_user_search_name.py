@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:48
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('samfundet', '0021_search_vectors'),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.AddField(
+            model_name='user',
+            name='search_name',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Lower(django.db.models.functions.text.Concat('username', models.Value(' '), 'first_name', models.Value(' '), 'last_name')), output_field=models.TextField()),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_name'], name='user_search_name_trigram', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['search_name'], name='user_search_name_prefix', opclasses=['text_pattern_ops']),
+        ),
+    ]
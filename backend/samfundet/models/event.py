@@ -12,11 +12,14 @@ from typing import Any
 
 from django.db import models
 from django.utils import timezone
-from django.db.models import Prefetch, QuerySet
+from django.db.models import QuerySet
+from django.utils.dateparse import parse_datetime
+from django.contrib.postgres.search import SearchVectorField
+from django.contrib.postgres.indexes import GinIndex
 
 from root.utils.mixins import CustomBaseModel
 
-from samfundet.models.billig import BilligEvent, BilligTicketGroup
+from samfundet.models.billig import BilligEvent
 from samfundet.models.general import Gang, User, Image, Organization
 from samfundet.models.model_choices import EventStatus, EventCategory, EventTicketType, EventAgeRestriction
 
@@ -100,6 +103,37 @@ class EventCustomTicket(CustomBaseModel):
     price = models.PositiveIntegerField(blank=False, null=False)
 
 
+# ======================== #
+#     Billig Snapshot      #
+# ======================== #
+
+
+class BilligEventSnapshot(models.Model):
+    """
+    Local copy of a billig event with its ticket and price groups, as serialized for the public API.
+    Kept up to date by the sync_billig command, so public pages never wait on billig and keep working when it is down.
+    """
+
+    # Not a foreign key, the billig event lives in the billig database
+    billig_id = models.IntegerField(primary_key=True)
+    data = models.JSONField()
+    synced_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'BilligEventSnapshot'
+        verbose_name_plural = 'BilligEventSnapshots'
+
+    def __str__(self) -> str:
+        return f'{self.data.get("name")} ({self.billig_id})'
+
+    def as_dict(self) -> dict[str, Any]:
+        """The serialized billig event, with in_sale_period as of now rather than as of the sync."""
+        sale_from = parse_datetime(self.data['sale_from'])
+        sale_to = parse_datetime(self.data['sale_to'])
+        in_sale_period = sale_from is not None and sale_to is not None and sale_from <= timezone.now() <= sale_to
+        return {**self.data, 'in_sale_period': in_sale_period}
+
+
 # ======================== #
 #       Event Model        #
 # ======================== #
@@ -136,6 +170,7 @@ class Event(CustomBaseModel):
     class Meta:
         verbose_name = 'Event'
         verbose_name_plural = 'Events'
+        indexes = [GinIndex(fields=['search_vector'], name='event_search_vector')]
 
     # Instances have a hidden _billig field used to store the fetched billig event.
     # This is necessary because billig cannot be a real foreign key (see below)
@@ -143,6 +178,8 @@ class Event(CustomBaseModel):
         super().__init__(*args, **kwargs)
         self._billig: BilligEvent | None = None
         self._billig_unset: bool = True
+        self._billig_snapshot: BilligEventSnapshot | None = None
+        self._billig_snapshot_unset: bool = True
 
     # ======================== #
     #     General Metadata     #
@@ -214,6 +251,9 @@ class Event(CustomBaseModel):
     # This cannot be a real foreign key because django currently does not support cross-db relationships
     billig_id = models.IntegerField(blank=True, null=True, unique=True)
 
+    # Titles, descriptions, location and event group name, maintained by samfundet.search
+    search_vector = SearchVectorField(null=True, editable=False)
+
     # ======================== #
     #    Computed Properties   #
     # ======================== #
@@ -239,7 +279,7 @@ class Event(CustomBaseModel):
         Handles automatic fetching of billig event using the billig_id.
 
         The private '_billig' is used to save the event and prevent repeated database queries to billig.
-        This field can also be set on many events at the same time by using prefetch_billig
+        For many events, read billig_snapshot instead, prefetched with prefetch_billig_snapshots.
         """
         if self.ticket_type != EventTicketType.BILLIG:
             return None
@@ -250,52 +290,31 @@ class Event(CustomBaseModel):
             return None
         return self._billig
 
+    @property
+    def billig_snapshot(self) -> BilligEventSnapshot | None:
+        """
+        The billig event as of the last sync, read from our own database instead of billig.
+        None until the billig event has been synced. Set on many events at once with prefetch_billig_snapshots.
+        """
+        if self.ticket_type != EventTicketType.BILLIG or self.billig_id is None:
+            return None
+        if self._billig_snapshot_unset:
+            self._billig_snapshot = BilligEventSnapshot.objects.filter(billig_id=self.billig_id).first()
+            self._billig_snapshot_unset = False
+        return self._billig_snapshot
+
     # ======================== #
     #      Billig Helper       #
     # ======================== #
 
     @staticmethod
-    def prefetch_billig(  # noqa: C901
-        *,
-        events: list[Event] | QuerySet[Event],
-        tickets: bool = True,
-        prices: bool = True,
-    ) -> None:
-        """
-        Gets the billig event/ticket/prices for a list of events, and stores it in each event.billig.
-        This is much faster than getting each billig event in separate queries when using `event.billig`
-
-        Example:
-            ```python
-            Event.fetch_billig_events(your_events)
-            if your_events[0].billig:
-                print('Yay! Billig is fetched!')
-            ```
-
-        Note that if you don't need billig for any logic you don't need to
-        do this because the serializer will fetch the data automatically.
-        """
-
-        # Fetch billig events for all events with billig
-        events_with_billig = [e for e in events if e.ticket_type == EventTicketType.BILLIG]
-        billig_ids = [int(e.billig_id) for e in events_with_billig if e.billig_id is not None]
-        billig_events = BilligEvent.objects.filter(id__in=billig_ids)
-
-        # Prefetch related tickets and prices to improve performance
-        if tickets and prices:
-            billig_events = billig_events.prefetch_related(Prefetch('ticket_groups', queryset=BilligTicketGroup.objects.prefetch_related('price_groups')))
-        elif tickets:
-            billig_events = billig_events.prefetch_related(Prefetch('ticket_groups', queryset=BilligTicketGroup.objects.all()))
-
-        # Attach billig events to event objects (set the private _billig field)
-        # This is neccessary because billig_id is not a real foreign key
-        # since cross-db relationships are not currently supported in django
+    def prefetch_billig_snapshots(*, events: list[Event] | QuerySet[Event]) -> None:
+        """Sets event.billig_snapshot for all the events in one query."""
+        events_with_billig = [e for e in events if e.ticket_type == EventTicketType.BILLIG and e.billig_id is not None]
+        snapshots = BilligEventSnapshot.objects.in_bulk([e.billig_id for e in events_with_billig])
         for event in events_with_billig:
-            for billig in billig_events:
-                if event.billig_id == billig.id:
-                    event._billig_unset = False
-                    event._billig = billig
-                    break
+            event._billig_snapshot = snapshots.get(event.billig_id)
+            event._billig_snapshot_unset = False
 
     # ======================== #
     #   Registration Helpers   #
@@ -5,30 +5,32 @@
 from __future__ import annotations
 
 import re
+import hashlib
 import secrets
-from io import BytesIO
 from typing import TYPE_CHECKING
 from pathlib import Path
 from datetime import date, time, datetime, timedelta
 from contextlib import contextmanager
 from collections import defaultdict
-from dataclasses import dataclass
 
 from PIL import Image as PilImage
-from PIL import ImageOps, JpegImagePlugin
 
 from django.db import models, transaction
+from django.conf import settings
 from django.utils import timezone
-from django.db.models import Q
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
 from django.utils.translation import gettext as _
 from django.contrib.auth.models import AbstractUser
-from django.db.models.functions import Lower
+from django.db.models.functions import Lower, Concat
+from django.contrib.postgres.search import SearchVectorField
+from django.contrib.postgres.indexes import GinIndex
 
 from root.utils.mixins import CustomBaseModel, FullCleanSaveMixin
 
 from samfundet.fields import LowerCaseField, PhoneNumberField
+from samfundet.images.variants import ORIENTATION_EXIF_TAG, ImageVariant, encode_variants
+from samfundet.images.originals import ALLOWED_FORMATS, UnsupportedFormatError, file_extension, strip_metadata
 from samfundet.models.model_choices import ReservationOccasion, UserPreferenceTheme, SaksdokumentCategory
 
 from .utils.string_utils import ellipsize
@@ -38,6 +40,7 @@ if TYPE_CHECKING:
     from collections.abc import Iterator
 
     from django.db.models import Model
+    from django.core.files import File
 
 
 class Tag(CustomBaseModel):
@@ -74,7 +77,7 @@ class Tag(CustomBaseModel):
         super().save(*args, **kwargs)
 
 
-def image_upload_path(instance: Image, filename: str) -> str:
+def image_upload_path(instance: Image | None, filename: str) -> str:
     """Partition images two levels deep by filename.
 
     Example: images/9f/86/9f86d081.jpg
@@ -82,22 +85,8 @@ def image_upload_path(instance: Image, filename: str) -> str:
     return f'images/{filename[:2]}/{filename[2:4]}/{filename}'
 
 
-@dataclass(frozen=True, kw_only=True)
-class ImageVariant:
-    # longest side (px), never upscaled
-    max_size: int
-    # If lossy: WebP quality.
-    # If lossless: compression effort.
-    quality: int
-    # Images more elongated than this ratio (long side / short side) are
-    # center-cropped down to it before downscaling
-    max_aspect: float
-    lossless: bool
-
-
 class Image(CustomBaseModel):
-    # Accepted upload formats (PIL format names)
-    ALLOWED_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP', 'TIFF')
+    ALLOWED_FORMATS = ALLOWED_FORMATS
 
     # Originals at or below this size are served as-is, without generated variants
     VARIANT_SIZE_THRESHOLD = 128 * 1024
@@ -117,11 +106,17 @@ class Image(CustomBaseModel):
     tags = models.ManyToManyField(Tag, blank=True, related_name='images')
     image = models.ImageField(upload_to=image_upload_path, blank=False, null=False)
 
-    # Downscaled copies generated automatically on upload.
-    # Empty for animated images, in which case urls falls back to the original.
+    # Downscaled copies, generated after upload by the generate_image_variants worker.
+    # Empty until then, and for animated images, in which case urls falls back to the original.
     image_large = models.ImageField(upload_to=image_upload_path, blank=True, editable=False)
     image_medium = models.ImageField(upload_to=image_upload_path, blank=True, editable=False)
     image_small = models.ImageField(upload_to=image_upload_path, blank=True, editable=False)
+    # Set when the variants need to be (re)generated, cleared by the worker once they are stored
+    variants_pending_since = models.DateTimeField(null=True, blank=True, editable=False)
+    # SHA-256 of the file as uploaded, before metadata is stripped. Lets imports skip files already stored.
+    content_hash = models.CharField(max_length=64, blank=True, editable=False, db_index=True)
+    # Title and tag names, maintained by samfundet.search
+    search_vector = SearchVectorField(null=True, editable=False)
 
     # All fields holding a stored file: the original plus one field per variant
     FILE_FIELDS = ('image', *(f'image_{name}' for name in VARIANTS))
@@ -129,6 +124,7 @@ class Image(CustomBaseModel):
     class Meta:
         verbose_name = 'Image'
         verbose_name_plural = 'Images'
+        indexes = [GinIndex(fields=['search_vector'], name='image_search_vector')]
 
     def __str__(self) -> str:
         return f'{self.title}'
@@ -143,16 +139,18 @@ class Image(CustomBaseModel):
             urls[variant] = file.url if file else original
         return urls
 
-    ORIENTATION_EXIF_TAG = 0x0112
+    ORIENTATION_EXIF_TAG = ORIENTATION_EXIF_TAG
 
     def save(self, *args: Any, **kwargs: Any) -> None:
         stored_files = self._stored_file_names()
         # New uploads carry a name not yet stored in db
         image_changed = bool(self.image) and (stored_files is None or stored_files[0] != self.image.name)
         if image_changed:
+            self.content_hash = hashlib.sha256(self.read_original()).hexdigest()
             self._assign_random_name()
+            # Kept in the request since the original is served until the variants are ready
             self._strip_metadata()
-            self.generate_variants()
+            self._queue_variants()
         super().save(*args, **kwargs)
         if image_changed and stored_files:
             # The save replaced the row's files, so the previous ones are orphans now
@@ -177,114 +175,76 @@ class Image(CustomBaseModel):
         transaction.on_commit(delete_files)
 
     @contextmanager
-    def _open_image(self) -> Iterator[PilImage.Image]:
+    def _open_file(self) -> Iterator[File]:
         file = self.image.file
         file.seek(0)
-        with PilImage.open(file) as pil:
-            yield pil
+        yield file
         file.seek(0)
 
+    @contextmanager
+    def _open_image(self) -> Iterator[PilImage.Image]:
+        with self._open_file() as file, PilImage.open(file) as pil:
+            yield pil
+
     def _assign_random_name(self) -> None:
         """Name the file a random string. The extension is sniffed from the actual format"""
         with self._open_image() as pil:
-            image_format = pil.format or ''
-        if image_format not in self.ALLOWED_FORMATS:
-            raise ValidationError(f'Unsupported image format: {image_format or "<unknown>"}')
-        # normalize both JPG/JPEG to use .jpg
-        extension = {'JPEG': '.jpg'}.get(image_format, f'.{image_format.lower()}')
+            try:
+                extension = file_extension(pil)
+            except UnsupportedFormatError as error:
+                raise ValidationError(str(error)) from error
+        self.image.name = self.random_file_name(extension)
+
+    @classmethod
+    def random_file_name(cls, extension: str) -> str:
+        storage = cls._meta.get_field('image').storage
         name = f'{secrets.token_hex(8)}{extension}'
         # Collisions are essentially impossible, but a silent Django rename would
         # break the shared original/variant stem, so reroll rather than risk it.
-        while self.image.storage.exists(image_upload_path(self, name)):
+        while storage.exists(image_upload_path(None, name)):
             name = f'{secrets.token_hex(8)}{extension}'
-        self.image.name = name
+        return name
 
     def _strip_metadata(self) -> None:
-        """Re-encode the original without metadata, so e.g. GPS EXIF from phone photos is never leaked.
-
-        - Only strips JPEG/PNG
-        - Orientation is baked into the pixels, the ICC color profile is kept
-        """
         with self._open_image() as pil:
-            exif = pil.getexif()
-            has_metadata = exif or pil.info.get('exif') or pil.info.get('xmp')
-            strippable = pil.format in ('JPEG', 'PNG') and not getattr(pil, 'is_animated', False)
-            if not (strippable and has_metadata):
-                return
-
-            options: dict[str, Any] = {'exif': b'', 'xmp': b'', 'icc_profile': pil.info.get('icc_profile')}
-
-            # 1 means "no rotation needed"
-            needs_rotation = exif.get(self.ORIENTATION_EXIF_TAG, 1) != 1
-            stripped = (ImageOps.exif_transpose(pil) or pil) if needs_rotation else pil
+            stripped = strip_metadata(pil)
+        if stripped is not None:
+            self.image.save(self.image.name, ContentFile(stripped), save=False)
 
-            if isinstance(pil, JpegImagePlugin.JpegImageFile):
-                # Inherit the source's compression instead of picking a new quality
-                if needs_rotation:
-                    options |= {'qtables': pil.quantization, 'subsampling': JpegImagePlugin.get_sampling(pil)}
-                else:
-                    options |= {'quality': 'keep', 'subsampling': 'keep'}
-
-            buffer = BytesIO()
-            stripped.save(buffer, format=pil.format, **options)
-        self.image.save(self.image.name, ContentFile(buffer.getvalue()), save=False)
+    def _queue_variants(self) -> None:
+        self._clear_variants()
+        # Small originals are served as-is
+        self.variants_pending_since = timezone.now() if self.image.size > self.VARIANT_SIZE_THRESHOLD else None
 
     def generate_variants(self) -> None:
-        """Generate a downscaled WebP copy of the image for each size in VARIANTS.
-
-        Small and animated originals get no variants, and urls falls back to the original.
-        """
+        """Generate the variants in this process, instead of leaving them to the worker. Does not save."""
         if self.image.size <= self.VARIANT_SIZE_THRESHOLD:
-            self._clear_variants()
+            self.store_variants(None)
             return
-        with self._open_image() as source:
-            if getattr(source, 'is_animated', False):
-                # Resizing would drop animation frames, serve the original instead.
-                self._clear_variants()
-                return
-            pil = self._normalize_for_webp(source)
-            stem = Path(self.image.name).stem
-            for name, variant in self.VARIANTS.items():
-                content = self._encode_variant(pil, variant)
-                getattr(self, f'image_{name}').save(f'{stem}_{name}.webp', content, save=False)
+        self.store_variants(encode_variants(self.read_original(), self.VARIANTS, max_pixels=settings.IMAGE_VARIANT_MAX_PIXELS))
+
+    def read_original(self) -> bytes:
+        with self._open_file() as file:
+            return file.read()
+
+    def store_variants(self, encoded: dict[str, bytes] | None) -> None:
+        """
+        Store variants returned by encode_variants, None meaning the original is served as-is. Variant files
+        already stored are deleted once the transaction commits. Does not save.
+        """
+        replaced = tuple(getattr(self, f'image_{name}').name for name in self.VARIANTS)
+        self._clear_variants()
+        stem = Path(self.image.name).stem
+        for name, content in (encoded or {}).items():
+            getattr(self, f'image_{name}').save(f'{stem}_{name}.webp', ContentFile(content), save=False)
+        self.variants_pending_since = None
+        if any(replaced):
+            self.schedule_file_cleanup(replaced)
 
     def _clear_variants(self) -> None:
         for name in self.VARIANTS:
             setattr(self, f'image_{name}', '')
 
-    @staticmethod
-    def _normalize_for_webp(source: PilImage.Image) -> PilImage.Image:
-        """Bake EXIF orientation into the pixels and convert to a mode WebP can encode."""
-        pil = ImageOps.exif_transpose(source) or source
-        if pil.mode not in ('RGB', 'RGBA'):
-            # Palette images may carry transparency, so they keep an alpha channel
-            pil = pil.convert('RGBA' if pil.mode == 'P' or 'A' in pil.getbands() else 'RGB')
-        return pil
-
-    @classmethod
-    def _encode_variant(cls, pil: PilImage.Image, variant: ImageVariant) -> ContentFile:
-        """Crop, downscale and encode one WebP variant of the (normalized) source image."""
-        resized = cls._center_crop(pil, variant.max_aspect)
-        resized.thumbnail((variant.max_size, variant.max_size), PilImage.Resampling.LANCZOS)
-        buffer = BytesIO()
-        resized.save(buffer, format='WEBP', lossless=variant.lossless, quality=variant.quality)
-        return ContentFile(buffer.getvalue())
-
-    @staticmethod
-    def _center_crop(pil: PilImage.Image, max_aspect: float) -> PilImage.Image:
-        """Center-crop the image so that no side exceeds max_aspect times the other."""
-        width, height = pil.size
-        if width > height * max_aspect:
-            crop_width = round(height * max_aspect)
-            left = (width - crop_width) // 2
-            return pil.crop((left, 0, left + crop_width, height))
-        if height > width * max_aspect:
-            crop_height = round(width * max_aspect)
-            top = (height - crop_height) // 2
-            return pil.crop((0, top, width, top + crop_height))
-        # Copy since thumbnail() mutates and the source is reused for other variants
-        return pil.copy()
-
 
 class Campus(FullCleanSaveMixin):
     name_nb = models.CharField(max_length=64, unique=True, blank=False, null=False)
@@ -342,11 +302,26 @@ class User(AbstractUser):
         null=True,
     )
 
+    # Username and names, maintained by samfundet.search
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Lowercased username and names, for user pickers, see samfundet.search.autocomplete_users
+    search_name = models.GeneratedField(
+        expression=Lower(Concat('username', models.Value(' '), 'first_name', models.Value(' '), 'last_name')),
+        output_field=models.TextField(),
+        db_persist=True,
+    )
+
     class Meta:
         permissions = [
             ('debug', 'Can view debug mode'),
             ('impersonate', 'Can impersonate users'),
         ]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='user_search_vector'),
+            # Needs the pg_trgm extension
+            GinIndex(fields=['search_name'], opclasses=['gin_trgm_ops'], name='user_search_name_trigram'),
+            models.Index(fields=['search_name'], opclasses=['text_pattern_ops'], name='user_search_name_prefix'),
+        ]
 
     def has_perm(self, perm: str, obj: Model | None = None) -> bool:
         """
@@ -471,6 +446,8 @@ class Organization(CustomBaseModel):
         verbose_name = 'Organization'
         verbose_name_plural = 'Organizations'
 
+    owner_paths = {'org': 'pk'}
+
     def resolve_org(self, *, return_id: bool = False) -> Organization | int:
         if return_id:
             return self.id
@@ -502,6 +479,8 @@ class GangType(CustomBaseModel):
     def __str__(self) -> str:
         return f'{self.title_nb}'
 
+    owner_paths = {'org': 'organization'}
+
     def resolve_org(self, *, return_id: bool = False) -> Organization | int:
         if return_id:
             # noinspection PyTypeChecker
@@ -532,6 +511,8 @@ class Gang(CustomBaseModel):
         verbose_name = 'Gang'
         verbose_name_plural = 'Gangs'
 
+    owner_paths = {'org': 'organization', 'gang': 'pk'}
+
     def resolve_org(self, *, return_id: bool = False) -> Organization | int:
         if return_id:
             # noinspection PyTypeChecker
@@ -558,6 +539,8 @@ class GangSection(CustomBaseModel):
     logo = models.ForeignKey(Image, on_delete=models.PROTECT, blank=True, null=True, verbose_name='Logo')
     gang = models.ForeignKey(Gang, blank=False, null=False, related_name='gang', on_delete=models.PROTECT, verbose_name='Gjeng')
 
+    owner_paths = {'org': 'gang__organization', 'gang': 'gang', 'section': 'pk'}
+
     def resolve_org(self, *, return_id: bool = False) -> Organization | int:
         return self.gang.resolve_org(return_id=return_id)
 
@@ -639,12 +622,6 @@ class Reservation(FullCleanSaveMixin):
     # TODO Maybe add method for reallocating reservations if tables are reserved, and prohibit if there is an existing
     table = models.ForeignKey(Table, on_delete=models.PROTECT, null=True, blank=True, verbose_name='Bord')
 
-    def save(self, *args: Any, **kwargs: Any) -> None:
-        self.full_clean()
-        if not self.table:
-            self.table = Reservation.find_available_table(self.venue, self.guest_count, self.reservation_date, self.start_time, self.end_time)
-        super().save(*args, **kwargs)
-
     def clean(self, *args: tuple, **kwargs: dict) -> None:
         super().clean()
 
@@ -655,15 +632,29 @@ class Reservation(FullCleanSaveMixin):
 
         if self.end_time < self.start_time:
             errors.setdefault('end_time', []).append('Time should be in the future')
-
-        if not Reservation.check_time(self.venue, self.guest_count, self.reservation_date, self.start_time, self.end_time):
+        elif not self.assign_table():
             errors.setdefault('start_time', []).append('There are no available tables for this date')
 
         raise ValidationError(errors)
 
+    def assign_table(self) -> bool:
+        """Picks the smallest free table unless one is set already. False if there is none, or the set table is taken."""
+        from samfundet.reservations.availability import Availability  # noqa: PLC0415
+
+        availability = Availability.load(venue=self.venue, start=self.reservation_date, exclude=self)
+        if self.table:
+            return availability.is_free(table=self.table, reservation_date=self.reservation_date, start_time=self.start_time, end_time=self.end_time)
+        self.table = availability.find_table(
+            guest_count=self.guest_count,
+            reservation_date=self.reservation_date,
+            start_time=self.start_time,
+            end_time=self.end_time,
+        )
+        return self.table is not None
+
     @staticmethod
     def check_time(
-        venue: str,
+        venue: Venue | None,
         guest_count: int,
         reservation_date: date,
         start_time: time,
@@ -683,83 +674,27 @@ class Reservation(FullCleanSaveMixin):
 
     @staticmethod
     def find_available_table(
-        venue: str,
+        venue: Venue | None,
         guest_count: int,
         reservation_date: date,
         start_time: time,
         end_time: time,
     ) -> Table | None:
-        tables = Table.objects.filter(venue=venue, seating__gte=guest_count)
-        if tables.count() == 0:
-            return None
+        from samfundet.reservations.availability import Availability  # noqa: PLC0415
 
-        reserved_tables = Reservation.objects.filter(
-            Q(venue=venue, reservation_date=reservation_date, table__in=tables)
-            & (Q(start_time__lte=end_time, end_time__gt=start_time) | Q(start_time__lt=end_time, end_time__gte=end_time))
-        )
-
-        return tables.exclude(id__in=reserved_tables.values_list('table_id', flat=True)).order_by('seating').first()
+        availability = Availability.load(venue=venue, start=reservation_date)
+        return availability.find_table(guest_count=guest_count, reservation_date=reservation_date, start_time=start_time, end_time=end_time)
 
-    def fetch_available_times_for_date(*, slug: str, seating: int, date: date) -> list[str]:  # noqa: C901
+    @staticmethod
+    def fetch_available_times_for_date(*, slug: str, seating: int, date: date) -> list[str]:
         """
         Method for returning available reservation times for a venue
         Based on the amount of seating and the date
         """
+        from samfundet.reservations.availability import Availability  # noqa: PLC0415
 
-        # Fetch venue with the given id
-        venue = Venue.objects.get(slug=slug)
-        # Fetch tables that fits size criteria
-        tables = Table.objects.filter(venue=venue.slug, seating__gte=seating)
-        # fetch all reservations for those tables for that date
-        reserved_tables = (
-            Reservation.objects.filter(venue=venue.slug, reservation_date=date, table__in=tables)
-            .values('table', 'start_time', 'end_time')
-            .order_by('start_time')
-        )
-
-        # fetch opening hours for the date
-        open_hours = venue.get_opening_hours_date(date)
-        c_time = datetime.combine(date, open_hours[0])
-        end_time = datetime.combine(date, open_hours[1]) - timezone.timedelta(hours=1)
-
-        # Transform each occupied table to stacks of their reservations
-        occupied_table_times: dict[int, list[tuple[time, time]]] = defaultdict(list)
-        for tr in reserved_tables:
-            occupied_table_times[tr['table']].append((tr['start_time'], tr['end_time']))
-
-        # Checks if list of occupied tables are shorter than available tables
-        safe = len(occupied_table_times) < len(tables) or len(reserved_tables) == 0
-
-        available_hours: list[str] = []
-        if len(tables) > 0:
-            while c_time <= end_time:
-                available = False
-                # If there are still occupied tables for time
-                if not safe:
-                    # Loop through tables and reservation
-                    for table_times in occupied_table_times.values():
-                        # If top of stack is over, remove it
-
-                        if (c_time.time()) >= table_times[0][1]:  # If greater than end remove element
-                            table_times.pop(0)
-                            # if the reservations for a table is empty, drop checking for availability
-                            if not table_times:
-                                safe = True
-                                break
-                        # If time next occupancy is in future, drop and set available table,
-                        # also tests for a buffer for an hour, to see if table is available for the next hour
-                        if (c_time.time()) < table_times[0][0] and (c_time + timezone.timedelta(hours=1)).time() < table_times[0][0]:
-                            # if there is no reservation at the moment, is available for booking
-                            available = True
-                            break
-                # If available or safe, add available hour
-                if safe or available:
-                    available_hours.append(c_time.strftime('%H:%M'))
-
-                # iterate to next half hour
-                c_time = c_time + timezone.timedelta(minutes=30)
-                c_time = c_time + (timezone.datetime.min - c_time) % timedelta(minutes=30)
-        return available_hours
+        availability = Availability.load(venue=Venue.objects.get(slug=slug), start=date)
+        return availability.available_times(guest_count=seating, reservation_date=date)
 
     class Meta:
         verbose_name = 'Reservation'
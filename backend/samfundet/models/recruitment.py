@@ -13,6 +13,8 @@ from django.contrib.auth.models import UserManager
 
 from root.utils.mixins import CustomBaseModel, FullCleanSaveMixin
 
+from samfundet.recruitment.querysets import RecruitmentPositionQuerySet, RecruitmentApplicationQuerySet
+
 from .general import Gang, User, Campus, GangSection, Organization
 from .model_choices import RecruitmentStatusChoices, RecruitmentApplicantStates, RecruitmentPriorityChoices
 
@@ -34,6 +36,8 @@ class Recruitment(CustomBaseModel):
     max_applications = models.PositiveIntegerField(null=True, blank=True, verbose_name='Max applications per applicant')
     promo_media = models.CharField(max_length=11, help_text='Youtube video id', null=True, default=None, blank=True)
 
+    owner_paths = {'org': 'organization'}
+
     def resolve_org(self, *, return_id: bool = False) -> Organization | int:
         if return_id:
             # noinspection PyTypeChecker
@@ -139,6 +143,8 @@ class RecruitmentPositionSharedInterviewGroup(CustomBaseModel):
 
 
 class RecruitmentPosition(CustomBaseModel):
+    objects = RecruitmentPositionQuerySet.as_manager()
+
     name_nb = models.CharField(max_length=100, help_text='Name of the position')
     name_en = models.CharField(max_length=100, help_text='Name of the position')
 
@@ -190,6 +196,8 @@ class RecruitmentPosition(CustomBaseModel):
             return None
         return self.section.name_nb if language == 'nb' else self.section.name_en
 
+    owner_paths = {'org': 'gang__organization', 'gang': 'gang', 'section': 'section'}
+
     def resolve_section(self, *, return_id: bool = False) -> GangSection | int:
         if return_id:
             # noinspection PyTypeChecker
@@ -260,6 +268,8 @@ class RecruitmentSeparatePosition(CustomBaseModel):
         blank=True,
     )
 
+    owner_paths = {'org': 'recruitment__organization'}
+
     def resolve_org(self, *, return_id: bool = False) -> Organization | int:
         return self.recruitment.resolve_org(return_id=return_id)
 
@@ -278,6 +288,8 @@ class InterviewRoom(CustomBaseModel):
     def __str__(self) -> str:
         return self.name
 
+    owner_paths = {'org': 'recruitment__organization', 'gang': 'gang'}
+
     def resolve_org(self, *, return_id: bool = False) -> Organization | int:
         return self.recruitment.resolve_org(return_id=return_id)
 
@@ -312,6 +324,8 @@ class Interview(CustomBaseModel):
     interviewers = models.ManyToManyField(to='samfundet.User', help_text='Interviewers for this interview', blank=True, related_name='interviews')
     notes = models.TextField(help_text='Notes for the interview', null=True, blank=True)
 
+    owner_paths = {'org': 'room__recruitment__organization', 'gang': 'room__gang'}
+
     def resolve_org(self, *, return_id: bool = False) -> Organization | int:
         return self.room.resolve_org(return_id=return_id)
 
@@ -320,6 +334,8 @@ class Interview(CustomBaseModel):
 
 
 class RecruitmentApplication(CustomBaseModel):
+    objects = RecruitmentApplicationQuerySet.as_manager()
+
     # UUID so that applicants cannot see recruitment info with their own id number
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     application_text = models.TextField(help_text='Application text')
@@ -354,6 +370,8 @@ class RecruitmentApplication(CustomBaseModel):
         choices=RecruitmentApplicantStates.choices, default=RecruitmentApplicantStates.NOT_SET, help_text='The state of the applicant for the recruiter'
     )
 
+    owner_paths = {'org': 'recruitment__organization', 'gang': 'recruitment_position__gang'}
+
     def resolve_org(self, *, return_id: bool = False) -> Organization | int:
         return self.recruitment.resolve_org(return_id=return_id)
 
@@ -362,14 +380,9 @@ class RecruitmentApplication(CustomBaseModel):
 
     def organize_priorities(self) -> None:
         """Organizes priorites from 1 to n, so that it is sequential with no gaps"""
-        non_withdrawn_applications_for_user = RecruitmentApplication.objects.filter(recruitment=self.recruitment, user=self.user, withdrawn=False).order_by(
-            'applicant_priority'
-        )
-        for i in range(len(non_withdrawn_applications_for_user)):
-            correct_position = i + 1
-            if non_withdrawn_applications_for_user[i].applicant_priority != correct_position:
-                non_withdrawn_applications_for_user[i].applicant_priority = correct_position
-                non_withdrawn_applications_for_user[i].save()
+        from samfundet.recruitment.priorities import organize_priorities  # noqa: PLC0415
+
+        organize_priorities(recruitment_id=self.recruitment_id, user_id=self.user_id)
 
     def update_priority(self, direction: int) -> None:
         """
@@ -379,26 +392,9 @@ class RecruitmentApplication(CustomBaseModel):
         can move n positions up or down
 
         """
-        # Use order for more simple an unified for direction
-        ordering = f'{"" if direction < 0 else "-"}applicant_priority'
-        non_withdrawn_applications_for_user = RecruitmentApplication.objects.filter(recruitment=self.recruitment, user=self.user, withdrawn=False).order_by(
-            ordering
-        )
-        direction = abs(direction)  # convert to absolute
-        for i in range(len(non_withdrawn_applications_for_user)):
-            if non_withdrawn_applications_for_user[i].id == self.id:  # find current
-                # Find index of which to switch  priority with
-                switch = len(non_withdrawn_applications_for_user) - 1 if i + direction >= len(non_withdrawn_applications_for_user) else i + direction
-                new_priority = non_withdrawn_applications_for_user[switch].applicant_priority
-                # Move priorites down in direction
-                for ii in range(switch, i, -1):
-                    non_withdrawn_applications_for_user[ii].applicant_priority = non_withdrawn_applications_for_user[ii - 1].applicant_priority
-                    non_withdrawn_applications_for_user[ii].save(skip_organize=True)
-                # update priority
-                non_withdrawn_applications_for_user[i].applicant_priority = new_priority
-                non_withdrawn_applications_for_user[i].save(skip_organize=True)
-                break
-        self.organize_priorities()
+        from samfundet.recruitment.priorities import move_application  # noqa: PLC0415
+
+        move_application(application=self, direction=direction)
 
     ALREADY_APPLIED_ERROR = 'Already created an application for this recruitment'
 
@@ -447,12 +443,13 @@ class RecruitmentApplication(CustomBaseModel):
         if not self.recruitment:
             self.recruitment = self.recruitment_position.recruitment
         if not self.applicant_priority:
-            self.organize_priorities()
-            current_non_withdrawn_applications_count = RecruitmentApplication.objects.filter(
-                user=self.user, recruitment=self.recruitment, withdrawn=False
-            ).count()
-            # Set the applicant_priority to the number of applications + 1 (for the current application)
-            self.applicant_priority = current_non_withdrawn_applications_count + 1
+            # Rank the application last. organize_priorities after the save closes any gaps.
+            lowest_priority = (
+                RecruitmentApplication.objects.filter(user=self.user, recruitment=self.recruitment, withdrawn=False)
+                .exclude(pk=self.pk)
+                .aggregate(lowest=models.Max('applicant_priority'))['lowest']
+            )
+            self.applicant_priority = (lowest_priority or 0) + 1
 
         if self.withdrawn:
             self.applicant_priority = None  # priority is set if the applicant "re-activates" the application
@@ -489,23 +486,10 @@ class RecruitmentApplication(CustomBaseModel):
         return RecruitmentApplication.objects.filter(user=self.user, recruitment=self.recruitment, withdrawn=False).count()
 
     def update_applicant_state(self) -> None:
-        applications = RecruitmentApplication.objects.filter(user=self.user, recruitment=self.recruitment, withdrawn=False).order_by('applicant_priority')
-        # Get top priority
-        top_wanted = applications.filter(recruiter_priority=RecruitmentPriorityChoices.WANTED, withdrawn=False).order_by('applicant_priority').first()
-        top_reserved = applications.filter(recruiter_priority=RecruitmentPriorityChoices.RESERVE, withdrawn=False).order_by('applicant_priority').first()
-        with transaction.atomic():
-            for application in applications:
-                # I hate conditionals, so instead of checking all forms of condtions
-                # I use memory array indexing formula (col+row_size*row) for matrixes, to index into state
-                has_priority = 0
-                if top_reserved and top_reserved.applicant_priority < application.applicant_priority:
-                    has_priority = 1
-                if top_wanted and top_wanted.applicant_priority < application.applicant_priority:
-                    has_priority = 2
-                application.applicant_state = application.recruiter_priority + 3 * has_priority
-                if application.recruiter_priority == RecruitmentPriorityChoices.NOT_WANTED:
-                    application.applicant_state = RecruitmentApplicantStates.NOT_WANTED
-                application.save()
+        """Derives the applicant_state of the applicant's applications, see samfundet.recruitment.transitions."""
+        from samfundet.recruitment.transitions import RecruiterChange, apply_recruiter_changes  # noqa: PLC0415
+
+        apply_recruiter_changes([RecruiterChange(application_id=self.id)])
 
 
 class RecruitmentInterviewAvailability(CustomBaseModel):
@@ -524,6 +508,8 @@ class RecruitmentInterviewAvailability(CustomBaseModel):
     end_time = models.TimeField(help_text='Last possible time of day for interviews', default='23:00:00', null=False, blank=False)
     timeslot_interval = models.PositiveSmallIntegerField(help_text='The time interval (in minutes) between each timeslot', default=30)
 
+    owner_paths = {'org': 'recruitment__organization'}
+
     def resolve_org(self, *, return_id: bool = False) -> Organization | int:
         return self.recruitment.resolve_org(return_id=return_id)
 
@@ -547,6 +533,8 @@ class OccupiedTimeslot(FullCleanSaveMixin):
     class Meta:
         constraints = [models.UniqueConstraint(fields=['user', 'recruitment', 'start_dt', 'end_dt'], name='occupied_UNIQ')]
 
+    owner_paths = {'org': 'recruitment__organization'}
+
     def resolve_org(self, *, return_id: bool = False) -> Organization | int:
         return self.recruitment.resolve_org(return_id=return_id)
 
@@ -572,75 +560,32 @@ class RecruitmentStatistics(FullCleanSaveMixin):
     # Average amount of applications for an applicant
     average_applications_per_applicant = models.FloatField(null=True, blank=True, verbose_name='Gang diversity')
 
+    # Set when an application changes, cleared when the refresh_recruitment_stats worker recounts
+    stale_since = models.DateTimeField(null=True, blank=True, editable=False, verbose_name='Stale since')
+    refreshed_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name='Last recounted')
+
     def save(self, *args: tuple, **kwargs: dict) -> None:
-        self.total_applications = self.recruitment.applications.count()
-        self.total_applicants = self.recruitment.get_applicants().count()
-        self.total_withdrawn = self.recruitment.applications.filter(withdrawn=True).count()
-        self.total_accepted = (
-            self.recruitment.applications.filter(recruiter_status=RecruitmentStatusChoices.CALLED_AND_ACCEPTED).values('user').distinct().count()
-        )
-        self.total_rejected = (
-            self.recruitment.get_applicants()
-            .exclude(
-                id__in=self.recruitment.applications.filter(
-                    recruiter_status__in=[RecruitmentStatusChoices.CALLED_AND_ACCEPTED, RecruitmentStatusChoices.NOT_SET]
-                ).values_list('user__id')
-            )
-            .count()
-        )
-        if self.total_applicants > 0:
-            self.average_gangs_applied_to_per_applicant = (
-                self.recruitment.applications.values('user', 'recruitment_position__gang').distinct().count() / self.total_applicants
-            )
-            self.average_applications_per_applicant = self.total_applications / self.total_applicants if self.total_applicants > 0 else 0
-        else:
-            self.average_gangs_applied_to_per_applicant = 0
-            self.average_applications_per_applicant = 0
+        """
+        Recounts every statistic from scratch, in a handful of grouped aggregates.
+        Saving an application only marks the statistics stale, see samfundet/recruitment/statistics.py
+        """
+        # Imported here, not at module level, because the statistics module imports these models
+        from samfundet.recruitment.statistics import count_totals, rebuild_breakdowns  # noqa: PLC0415
+
+        for field, value in count_totals(recruitment=self.recruitment).items():
+            setattr(self, field, value)
+        self.refreshed_at = timezone.now()
         super().save(*args, **kwargs)
-        self.generate_time_stats()
-        self.generate_date_stats()
-        self.generate_campus_stats()
-        self.generate_position_stats()
-        self.generate_gang_stats()
+        rebuild_breakdowns(stats=self)
 
     def __str__(self) -> str:
         return f'{self.recruitment} stats'
 
+    owner_paths = {'org': 'recruitment__organization'}
+
     def resolve_org(self, *, return_id: bool = False) -> Organization | int:
         return self.recruitment.resolve_org(return_id=return_id)
 
-    def generate_position_stats(self) -> None:
-        for position in RecruitmentPosition.objects.all():
-            position_stat, created = RecruitmentPositionStat.objects.get_or_create(recruitment_stats=self, recruitment_position=position)
-            if not created:
-                position_stat.save()
-
-    def generate_time_stats(self) -> None:
-        for h in range(0, 24):
-            time_stat, created = RecruitmentTimeStat.objects.get_or_create(recruitment_stats=self, hour=h)
-            if not created:
-                time_stat.save()
-
-    def generate_date_stats(self) -> None:
-        date = self.recruitment.visible_from
-        while date < self.recruitment.actual_application_deadline:
-            date_stat, created = RecruitmentDateStat.objects.get_or_create(recruitment_stats=self, date=date.strftime('%Y-%m-%d'))
-            if not created:
-                date_stat.save()
-            date += timezone.timedelta(days=1)
-
-    def generate_campus_stats(self) -> None:
-        for campus in Campus.objects.all():
-            campus_stat, created = RecruitmentCampusStat.objects.get_or_create(recruitment_stats=self, campus=campus)
-            if not created:
-                campus_stat.save()
-
-    def generate_gang_stats(self) -> None:
-        for gang in Gang.objects.filter(id__in=self.recruitment.positions.values_list('gang', flat=True)):
-            gang_stat, created = RecruitmentGangStat.objects.get_or_create(recruitment_stats=self, gang=gang)
-            if not created:
-                gang_stat.save()
-
 
 class RecruitmentPositionStat(models.Model):
     recruitment_stats = models.ForeignKey(RecruitmentStatistics, on_delete=models.CASCADE, blank=False, null=False, related_name='position_stats')
@@ -657,13 +602,6 @@ class RecruitmentPositionStat(models.Model):
     def __str__(self) -> str:
         return f'{self.recruitment_stats} {self.recruitment_position}'
 
-    def save(self, *args: tuple, **kwargs: dict) -> None:
-        if self.recruitment_position.applications.count():
-            self.withdrawn_rate = self.recruitment_position.applications.filter(withdrawn=True).count() / self.recruitment_position.applications.count()
-        else:
-            self.withdrawn_rate = 0
-        super().save(*args, **kwargs)
-
     def normalized_repriorization_value(self) -> float:
         return self.repriorization_value / self.repriorization_count
 
@@ -682,13 +620,7 @@ class RecruitmentTimeStat(models.Model):
     def __str__(self) -> str:
         return f'{self.recruitment_stats} {self.hour} {self.count}'
 
-    def save(self, *args: tuple, **kwargs: dict) -> None:
-        count = 0
-        for application in self.recruitment_stats.recruitment.applications.all():
-            if application.created_at.hour == self.hour:
-                count += 1
-        self.count = count
-        super().save(*args, **kwargs)
+    owner_paths = {'org': 'recruitment_stats__recruitment__organization'}
 
     def resolve_org(self, *, return_id: bool = False) -> Organization | int:
         return self.recruitment_stats.resolve_org(return_id=return_id)
@@ -702,13 +634,7 @@ class RecruitmentDateStat(models.Model):
     def __str__(self) -> str:
         return f'{self.recruitment_stats} {self.date} {self.count}'
 
-    def save(self, *args: tuple, **kwargs: dict) -> None:
-        count = 0
-        for application in self.recruitment_stats.recruitment.applications.all():
-            if application.created_at.date() == self.date:
-                count += 1
-        self.count = count
-        super().save(*args, **kwargs)
+    owner_paths = {'org': 'recruitment_stats__recruitment__organization'}
 
     def resolve_org(self, *, return_id: bool = False) -> Organization | int:
         return self.recruitment_stats.resolve_org(return_id=return_id)
@@ -724,13 +650,6 @@ class RecruitmentCampusStat(models.Model):
     def __str__(self) -> str:
         return f'{self.recruitment_stats} {self.campus} {self.count}'
 
-    def save(self, *args: tuple, **kwargs: dict) -> None:
-        self.count = User.objects.filter(
-            id__in=self.recruitment_stats.recruitment.applications.values_list('user', flat=True).distinct(), campus=self.campus
-        ).count()
-        self.applicant_percentage = self.count / (self.campus.total_students if self.campus.total_students else 1)
-        super().save(*args, **kwargs)
-
     def normalized_applicant_percentage(self) -> float:
         applicant_percentages = list(
             RecruitmentCampusStat.objects.filter(recruitment_stats=self.recruitment_stats).values_list('applicant_percentage', flat=True)
@@ -741,6 +660,8 @@ class RecruitmentCampusStat(models.Model):
             return 0
         return (self.applicant_percentage - min_percent) / (max_percent - min_percent)
 
+    owner_paths = {'org': 'recruitment_stats__recruitment__organization'}
+
     def resolve_org(self, *, return_id: bool = False) -> Organization | int:
         return self.recruitment_stats.resolve_org(return_id=return_id)
 
@@ -758,13 +679,3 @@ class RecruitmentGangStat(models.Model):
 
     def __str__(self) -> str:
         return f'{self.recruitment_stats} {self.gang} {self.application_count}'
-
-    def save(self, *args: tuple, **kwargs: dict) -> None:
-        applications = RecruitmentApplication.objects.filter(recruitment=self.recruitment_stats.recruitment, recruitment_position__gang=self.gang)
-        self.application_count = applications.count()
-        self.applicant_count = applications.values('user').distinct().count()
-
-        self.average_priority = applications.aggregate(models.Avg('applicant_priority'))['applicant_priority__avg'] if len(applications) > 0 else 0
-        self.total_accepted = applications.filter(recruiter_status=RecruitmentStatusChoices.CALLED_AND_ACCEPTED).values('user').distinct().count()
-        self.total_rejected = applications.filter(recruiter_status=RecruitmentStatusChoices.CALLED_AND_REJECTED).values('user').distinct().count()
-        super().save(*args, **kwargs)
@@ -10,9 +10,3 @@ def test_billig_link_with_event(fixture_event: Event, fixture_billig_event: Bill
     fixture_event.ticket_type = EventTicketType.BILLIG
     fixture_event.save()
     assert fixture_event.billig == fixture_billig_event
-
-
-def test_prefetch_billig(fixture_event_with_billig: Event):
-    event, billig_event = fixture_event_with_billig
-    Event.prefetch_billig(events=[event])
-    assert event._billig == billig_event
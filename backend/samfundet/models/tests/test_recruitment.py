@@ -618,6 +618,7 @@ class TestRecruitmentGangStat:
             application_text='I have applied',
             applicant_priority=1,
         )
+        fixture_recruitment.statistics.save()
         assert fixture_recruitment.statistics.gang_stats.filter(gang=fixture_recruitment_position.gang).first().applicant_count == 1
         assert fixture_recruitment.statistics.gang_stats.filter(gang=fixture_recruitment_position.gang).first().application_count == 1
 
@@ -641,6 +642,7 @@ class TestRecruitmentGangStat:
             applicant_priority=1,
         )
 
+        fixture_recruitment.statistics.save()
         assert fixture_recruitment.statistics.gang_stats.filter(gang=fixture_recruitment_position.gang).first().applicant_count == 2
         assert fixture_recruitment.statistics.gang_stats.filter(gang=fixture_recruitment_position.gang).first().application_count == 2
 
@@ -674,6 +676,7 @@ class TestRecruitmentGangStat:
             applicant_priority=2,
         )
 
+        fixture_recruitment.statistics.save()
         assert fixture_recruitment.statistics.gang_stats.filter(gang=fixture_recruitment_position.gang).first().applicant_count == 1
         assert fixture_recruitment.statistics.gang_stats.filter(gang=fixture_recruitment_position.gang).first().application_count == 1
         assert fixture_recruitment.statistics.gang_stats.filter(gang=fixture_recruitment_position2.gang).first().applicant_count == 1
@@ -701,6 +704,7 @@ class TestRecruitmentGangStat:
             application_text='I have applied',
             applicant_priority=2,
         )
+        fixture_recruitment.statistics.save()
         assert fixture_recruitment.statistics.gang_stats.filter(gang=fixture_recruitment_position.gang).first().applicant_count == 1
         assert fixture_recruitment.statistics.gang_stats.filter(gang=fixture_recruitment_position.gang).first().application_count == 2
 
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import csv
+from typing import TYPE_CHECKING, Any
+
+from django.http import StreamingHttpResponse
+from django.db.models import Q, Count
+
+from samfundet.models.recruitment import RecruitmentApplication
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from django.db.models import QuerySet
+
+    from samfundet.models.general import Gang
+    from samfundet.models.recruitment import Recruitment
+
+# Rows fetched from the database at a time. Memory stays flat no matter how many applications are exported.
+EXPORT_CHUNK_SIZE = 2000
+
+APPLICATION_COLUMNS = [
+    'Navn',
+    'Telefon',
+    'Epost',
+    'Campus',
+    'Stilling',
+    'Gjeng',
+    'Seksjon',
+    'Intervjutid',
+    'Intervjusted',
+    'Prioritet',
+    'Status',
+    'Sokers rangering',
+    'Intervjuer satt',
+]
+
+GANG_APPLICATION_COLUMNS = [
+    'Navn',
+    'Telefon',
+    'Epost',
+    'Campus',
+    'Stilling',
+    'Intervjutid',
+    'Intervjusted',
+    'Prioritet',
+    'Status',
+    'Sokers rangering (Hele Opptak)',
+    'Intervjuer satt (For Gjeng)',
+]
+
+
+# =============================== #
+#              Rows               #
+# =============================== #
+# Rows are plain dicts keyed by column, so they can be written as CSV or any other tabular format.
+
+
+def application_rows(*, recruitment: Recruitment) -> Iterator[dict[str, Any]]:
+    """One row per application in the recruitment, in three queries regardless of how many there are."""
+    applications = RecruitmentApplication.objects.filter(recruitment=recruitment)
+    totals = _totals_per_user(applications=applications.filter(withdrawn=False))
+    for application in _for_export(applications=applications):
+        position = application.recruitment_position
+        total_applications, total_interviews = totals.get(application.user_id, (0, 0))
+        yield {
+            **_applicant_columns(application=application),
+            'Gjeng': position.gang.name_nb if position.gang else '',
+            'Seksjon': position.get_section_name('nb'),
+            'Sokers rangering': f'{application.applicant_priority}/{total_applications}',
+            'Intervjuer satt': f'{total_interviews}/{total_applications}',
+        }
+
+
+def gang_application_rows(*, recruitment: Recruitment, gang: Gang) -> Iterator[dict[str, Any]]:
+    """One row per application to the gang in the recruitment. Ranking is against the whole recruitment, interviews only within the gang."""
+    applications = RecruitmentApplication.objects.filter(recruitment=recruitment)
+    active = applications.filter(withdrawn=False)
+    totals = _totals_per_user(applications=active)
+    gang_totals = _totals_per_user(applications=active.filter(recruitment_position__gang=gang))
+    for application in _for_export(applications=applications.filter(recruitment_position__gang=gang)):
+        total_applications = totals.get(application.user_id, (0, 0))[0]
+        gang_applications, gang_interviews = gang_totals.get(application.user_id, (0, 0))
+        yield {
+            **_applicant_columns(application=application),
+            'Sokers rangering (Hele Opptak)': f'{application.applicant_priority}/{total_applications}',
+            'Intervjuer satt (For Gjeng)': f'{gang_interviews}/{gang_applications}',
+        }
+
+
+def _for_export(*, applications: QuerySet[RecruitmentApplication]) -> Iterator[RecruitmentApplication]:
+    return applications.select_related(
+        'user__campus',
+        'interview',
+        'recruitment_position__gang',
+        'recruitment_position__section',
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _totals_per_user(*, applications: QuerySet[RecruitmentApplication]) -> dict[int, tuple[int, int]]:
+    """Number of applications and of those with an interview set, per applicant, in one grouped aggregate."""
+    rows = (
+        applications.order_by()
+        .values('user')
+        .annotate(applications=Count('id'), interviews=Count('id', filter=Q(interview__isnull=False)))
+        .values_list('user', 'applications', 'interviews')
+    )
+    return {user_id: (total_applications, total_interviews) for user_id, total_applications, total_interviews in rows}
+
+
+def _applicant_columns(*, application: RecruitmentApplication) -> dict[str, Any]:
+    user = application.user
+    interview = application.interview
+    return {
+        'Navn': user.get_full_name(),
+        'Telefon': user.phone_number,
+        'Epost': user.email,
+        'Campus': user.campus.name_en if user.campus else '',
+        'Stilling': application.recruitment_position.name_nb,
+        'Intervjutid': interview.interview_time if interview else '',
+        'Intervjusted': interview.interview_location if interview else '',
+        'Prioritet': application.get_recruiter_priority_display(),
+        'Status': application.get_recruiter_status_display(),
+    }
+
+
+# =============================== #
+#             Formats             #
+# =============================== #
+
+
+class _Echo:
+    """File-like object that hands back whatever is written to it, so csv can produce one line at a time."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def stream_csv(*, rows: Iterable[dict[str, Any]], columns: list[str]) -> Iterator[str]:
+    writer = csv.DictWriter(_Echo(), fieldnames=columns)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def csv_response(*, rows: Iterable[dict[str, Any]], columns: list[str], filename: str) -> StreamingHttpResponse:
+    """Streams the rows as they are fetched, instead of building the whole file in memory first."""
+    return StreamingHttpResponse(
+        stream_csv(rows=rows, columns=columns),
+        content_type='text/csv',
+        headers={'Content-Disposition': f'Attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,110 @@
+"""
+Applicant priorities of recruitment applications.
+
+An applicant ranks their active (not withdrawn) applications in a recruitment from 1 to n. Reordering writes every
+changed priority in one UPDATE, instead of saving the applications one by one, which ran full_clean and the pre_save
+signals per row. What those signals did for a priority change is done here for the whole set: priority changes after
+the interview are counted on the position statistics, and applications_changed is sent once.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from collections import defaultdict
+
+from django.db import models, transaction
+from django.utils import timezone
+from django.db.models import F, Case, When, Value
+
+from root.constants import request_contextvar
+
+from samfundet.models.recruitment import RecruitmentStatistics, RecruitmentApplication, RecruitmentPositionStat
+from samfundet.recruitment.transitions import notify_applications_changed
+
+if TYPE_CHECKING:
+    import uuid
+    import datetime
+    from collections.abc import Iterable
+
+    from django.db.models import QuerySet
+
+
+def active_applications(*, recruitment_id: int, user_id: int) -> QuerySet[RecruitmentApplication]:
+    """The applicant's active applications in the recruitment, highest priority first."""
+    return RecruitmentApplication.objects.filter(recruitment_id=recruitment_id, user_id=user_id, withdrawn=False).order_by('applicant_priority', 'created_at')
+
+
+def organize_priorities(*, recruitment_id: int, user_id: int) -> int:
+    """Renumbers the applicant's active applications from 1 to n in their current order, closing gaps. Returns how many changed."""
+    applications = list(active_applications(recruitment_id=recruitment_id, user_id=user_id).select_related('interview'))
+    return _write_priorities(applications=applications, recruitment_id=recruitment_id)
+
+
+def move_application(*, application: RecruitmentApplication, direction: int) -> int:
+    """
+    Moves the application `direction` places up (positive) or down (negative) in the applicant's ranking, stopping at
+    the top or bottom, and renumbers the rest to make room. Returns how many applications changed priority.
+    """
+    applications = list(active_applications(recruitment_id=application.recruitment_id, user_id=application.user_id).select_related('interview'))
+    ids = [other.id for other in applications]
+    if application.id not in ids:
+        # Withdrawn applications have no place in the ranking
+        return _write_priorities(applications=applications, recruitment_id=application.recruitment_id)
+    index = ids.index(application.id)
+    moved = applications.pop(index)
+    applications.insert(min(max(index - direction, 0), len(applications)), moved)
+    changed = _write_priorities(applications=applications, recruitment_id=application.recruitment_id)
+    application.applicant_priority, application.version, application.updated_at = moved.applicant_priority, moved.version, moved.updated_at
+    application.updated_by_id = moved.updated_by_id
+    return changed
+
+
+def _write_priorities(*, applications: list[RecruitmentApplication], recruitment_id: int) -> int:
+    """Gives `applications` the priorities 1 to n in list order, with one UPDATE of the rows whose priority changes."""
+    changed: dict[uuid.UUID, tuple[RecruitmentApplication, int]] = {
+        application.id: (application, priority) for priority, application in enumerate(applications, start=1) if application.applicant_priority != priority
+    }
+    if not changed:
+        return 0
+    now = timezone.now()
+    request = request_contextvar.get()
+    # As CustomBaseModel.save would
+    updated = {'version': F('version') + 1, 'updated_at': now}
+    if request and request.user.is_authenticated:
+        updated['updated_by'] = request.user
+    with transaction.atomic():
+        RecruitmentApplication.objects.filter(id__in=changed).update(
+            applicant_priority=Case(*(When(id=pk, then=Value(priority)) for pk, (_, priority) in changed.items()), output_field=models.PositiveIntegerField()),
+            **updated,
+        )
+        _count_repriorizations(changes=changed.values(), recruitment_id=recruitment_id, now=now)
+    for application, priority in changed.values():
+        application.applicant_priority = priority
+        application.version += 1
+        application.updated_at = now
+        if 'updated_by' in updated:
+            application.updated_by = updated['updated_by']
+    notify_applications_changed([application for application, _ in changed.values()])
+    return len(changed)
+
+
+def _count_repriorizations(*, changes: Iterable[tuple[RecruitmentApplication, int]], recruitment_id: int, now: datetime.datetime) -> None:
+    """
+    Adds the priority changes of applications whose interview has been held to their position's statistics, as
+    RecruitmentPositionStat.update_repriorization_stats does for one change. This may reflect the quality of the interview.
+    """
+    per_position: dict[int, list[int]] = defaultdict(lambda: [0, 0])
+    for application, priority in changes:
+        interview = application.interview
+        if application.applicant_priority and interview and interview.interview_time < now:
+            per_position[application.recruitment_position_id][0] += application.applicant_priority - priority
+            per_position[application.recruitment_position_id][1] += 1
+    if not per_position:
+        return
+    recruitment_stats, _created = RecruitmentStatistics.objects.get_or_create(recruitment_id=recruitment_id)
+    for position_id, (value, count) in per_position.items():
+        position_stats, _created = RecruitmentPositionStat.objects.get_or_create(recruitment_position_id=position_id, recruitment_stats=recruitment_stats)
+        RecruitmentPositionStat.objects.filter(pk=position_stats.pk).update(
+            repriorization_value=F('repriorization_value') + value,
+            repriorization_count=F('repriorization_count') + count,
+        )
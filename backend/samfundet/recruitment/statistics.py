@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import datetime
+from typing import Any
+
+from django.db import models, transaction
+from django.utils import timezone
+from django.db.models import Q, Avg, Count
+from django.db.models.functions import TruncDate, ExtractHour
+
+from samfundet.models.general import Campus
+from samfundet.models.recruitment import (
+    Recruitment,
+    RecruitmentDateStat,
+    RecruitmentGangStat,
+    RecruitmentTimeStat,
+    RecruitmentCampusStat,
+    RecruitmentStatistics,
+    RecruitmentPositionStat,
+)
+from samfundet.models.model_choices import RecruitmentStatusChoices
+
+_ACCEPTED = RecruitmentStatusChoices.CALLED_AND_ACCEPTED
+_REJECTED = RecruitmentStatusChoices.CALLED_AND_REJECTED
+# An applicant counts as rejected once none of their applications are accepted or still undecided.
+_NOT_REJECTED = (RecruitmentStatusChoices.CALLED_AND_ACCEPTED, RecruitmentStatusChoices.NOT_SET)
+
+
+# =============================== #
+#        Full recomputation       #
+# =============================== #
+
+
+def count_totals(*, recruitment: Recruitment) -> dict[str, Any]:
+    """Every top level field of RecruitmentStatistics, counted in two queries."""
+    applications = recruitment.applications.order_by()
+    totals = applications.aggregate(
+        total_applications=Count('id'),
+        total_applicants=Count('user', distinct=True),
+        total_withdrawn=Count('id', filter=Q(withdrawn=True)),
+        total_accepted=Count('user', distinct=True, filter=Q(recruiter_status=_ACCEPTED)),
+        not_rejected=Count('user', distinct=True, filter=Q(recruiter_status__in=_NOT_REJECTED)),
+    )
+    totals['total_rejected'] = totals['total_applicants'] - totals.pop('not_rejected')
+    gang_pairs = applications.values('user', 'recruitment_position__gang').distinct().count()
+    totals.update(_averages(applications=totals['total_applications'], applicants=totals['total_applicants'], gang_pairs=gang_pairs))
+    return totals
+
+
+def rebuild_breakdowns(*, stats: RecruitmentStatistics) -> None:
+    """Recounts the time, date, campus, position and gang rows of a saved RecruitmentStatistics, one grouped aggregate each."""
+    _write_time_stats(stats=stats)
+    _write_date_stats(stats=stats)
+    _write_campus_stats(stats=stats)
+    _write_position_stats(stats=stats)
+    _write_gang_stats(stats=stats)
+
+
+def _averages(*, applications: int, applicants: int, gang_pairs: int) -> dict[str, float]:
+    if applicants == 0:
+        return {'average_gangs_applied_to_per_applicant': 0, 'average_applications_per_applicant': 0}
+    return {'average_gangs_applied_to_per_applicant': gang_pairs / applicants, 'average_applications_per_applicant': applications / applicants}
+
+
+def _write_time_stats(*, stats: RecruitmentStatistics) -> None:
+    counts = dict(
+        stats.recruitment.applications.order_by()
+        .annotate(hour=ExtractHour('created_at', tzinfo=datetime.UTC))
+        .values('hour')
+        .annotate(count=Count('id'))
+        .values_list('hour', 'count')
+    )
+    _write_rows(model=RecruitmentTimeStat, stats=stats, key_field='hour', rows={hour: {'count': counts.get(hour, 0)} for hour in range(24)})
+
+
+def _write_date_stats(*, stats: RecruitmentStatistics) -> None:
+    recruitment = stats.recruitment
+    counts = dict(
+        recruitment.applications.order_by()
+        .annotate(day=TruncDate('created_at', tzinfo=datetime.UTC))
+        .values('day')
+        .annotate(count=Count('id'))
+        .values_list('day', 'count')
+    )
+    rows = {}
+    date = recruitment.visible_from
+    while date < recruitment.actual_application_deadline:
+        rows[date.date()] = {'count': counts.get(date.date(), 0)}
+        date += datetime.timedelta(days=1)
+    _write_rows(model=RecruitmentDateStat, stats=stats, key_field='date', rows=rows)
+
+
+def _write_campus_stats(*, stats: RecruitmentStatistics) -> None:
+    campuses = Campus.objects.all()
+    counts = dict(
+        stats.recruitment.applications.order_by()
+        .filter(user__campus__in=campuses)
+        .values('user__campus')
+        .annotate(count=Count('user', distinct=True))
+        .values_list('user__campus', 'count')
+    )
+    rows = {}
+    for campus in campuses:
+        count = counts.get(campus.id, 0)
+        rows[campus.id] = {'count': count, 'applicant_percentage': _applicant_percentage(count=count, total_students=campus.total_students)}
+    _write_rows(model=RecruitmentCampusStat, stats=stats, key_field='campus_id', rows=rows)
+
+
+def _applicant_percentage(*, count: int, total_students: int | None) -> int:
+    # Stored in an integer field, which truncates
+    return int(count / (total_students or 1))
+
+
+def _write_position_stats(*, stats: RecruitmentStatistics) -> None:
+    positions = stats.recruitment.positions.all()
+    counts = {
+        row['recruitment_position']: row
+        for row in stats.recruitment.applications.order_by()
+        .filter(recruitment_position__in=positions)
+        .values('recruitment_position')
+        .annotate(total=Count('id'), withdrawn=Count('id', filter=Q(withdrawn=True)))
+    }
+    rows = {}
+    for position_id in positions.values_list('id', flat=True):
+        row = counts.get(position_id)
+        rows[position_id] = {'withdrawn_rate': row['withdrawn'] / row['total'] if row else 0}
+    _write_rows(model=RecruitmentPositionStat, stats=stats, key_field='recruitment_position_id', rows=rows)
+
+
+def _write_gang_stats(*, stats: RecruitmentStatistics) -> None:
+    gangs = set(stats.recruitment.positions.exclude(gang=None).values_list('gang_id', flat=True))
+    aggregates = (
+        stats.recruitment.applications.order_by()
+        .filter(recruitment_position__gang__in=gangs)
+        .values('recruitment_position__gang')
+        .annotate(
+            application_count=Count('id'),
+            applicant_count=Count('user', distinct=True),
+            average_priority=Avg('applicant_priority'),
+            total_accepted=Count('user', distinct=True, filter=Q(recruiter_status=_ACCEPTED)),
+            total_rejected=Count('user', distinct=True, filter=Q(recruiter_status=_REJECTED)),
+        )
+    )
+    rows = {gang_id: {'application_count': 0, 'applicant_count': 0, 'average_priority': 0, 'total_accepted': 0, 'total_rejected': 0} for gang_id in gangs}
+    for row in aggregates:
+        rows[row.pop('recruitment_position__gang')] = row
+    _write_rows(model=RecruitmentGangStat, stats=stats, key_field='gang_id', rows=rows)
+
+
+def _write_rows(*, model: type[models.Model], stats: RecruitmentStatistics, key_field: str, rows: dict[Any, dict[str, Any]]) -> None:
+    """Writes one row per key, updating the rows that exist and creating the rest. Three queries at most."""
+    if not rows:
+        return
+    existing = {getattr(row, key_field): row for row in model.objects.filter(recruitment_stats=stats, **{f'{key_field}__in': list(rows)})}
+    to_create: list[models.Model] = []
+    to_update: list[models.Model] = []
+    for key, values in rows.items():
+        row = existing.get(key) or model(recruitment_stats=stats, **{key_field: key})
+        for field, value in values.items():
+            setattr(row, field, value)
+        (to_update if key in existing else to_create).append(row)
+    model.objects.bulk_create(to_create)
+    model.objects.bulk_update(to_update, fields=list(next(iter(rows.values()))))
+
+
+# =============================== #
+#          Deferred refresh       #
+# =============================== #
+
+# How long a mark is left to settle before it is recounted, so a burst of applications costs one recount
+REFRESH_DELAY = datetime.timedelta(seconds=30)
+
+
+def mark_stale(*, recruitment_id: int) -> None:
+    """
+    Flags the statistics of a recruitment for the next refresh. Only the first mark since the
+    last refresh writes anything, every other one is an update matching no rows.
+    """
+    RecruitmentStatistics.objects.filter(recruitment_id=recruitment_id, stale_since=None).update(stale_since=timezone.now())
+
+
+def refresh_stale_statistics(*, delay: datetime.timedelta = REFRESH_DELAY) -> int:
+    """Recounts the statistics that have been marked stale for at least `delay`. Returns how many were recounted."""
+    cutoff = timezone.now() - delay
+    stale_ids = list(RecruitmentStatistics.objects.filter(stale_since__lte=cutoff).values_list('id', flat=True))
+    return sum(_refresh(stats_id=stats_id) for stats_id in stale_ids)
+
+
+def _refresh(*, stats_id: int) -> bool:
+    with transaction.atomic():
+        # The row lock makes marks arriving during the recount wait for it, and land as a new mark after it.
+        # Everything committed before the lock was taken is included in the recount.
+        stats = RecruitmentStatistics.objects.select_for_update().filter(id=stats_id, stale_since__isnull=False).first()
+        if stats is None:
+            # Refreshed by someone else in the meantime
+            return False
+        stats.stale_since = None
+        stats.save()
+    return True
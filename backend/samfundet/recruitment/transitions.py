@@ -0,0 +1,163 @@
+"""
+Recruiter decisions on applications: recruiter_priority and recruiter_status, and the applicant_state derived from them.
+
+A decision on one application changes other applications of the same applicant. Calling the applicant (accepted or
+rejected) automatically rejects their unprocessed applications, and undoing the call restores them. The applicant_state
+of every active application depends on the recruiter priorities of the applicant's other applications.
+
+apply_recruiter_changes works all of it out in memory for the applicants involved. It writes the changed rows with one
+bulk_update, and sends applications_changed once the transaction commits. The alternative, saving each application,
+runs full_clean and the pre_save signals again for every affected row.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from functools import partial
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.utils import timezone
+from django.dispatch import Signal
+from django.db.models import Exists, OuterRef
+
+from root.constants import request_contextvar
+
+from samfundet.models.recruitment import RecruitmentApplication
+from samfundet.models.model_choices import RecruitmentStatusChoices, RecruitmentApplicantStates, RecruitmentPriorityChoices
+
+if TYPE_CHECKING:
+    import uuid
+    from collections.abc import Iterable, Sequence
+
+# Sent once the transaction has committed, after a batch of applications was written without saving each one.
+# Receivers get `applications`, the changed RecruitmentApplication instances.
+applications_changed = Signal()
+
+# mypy types choice members as their (value, label) tuples
+CALLED: tuple[int, ...] = (RecruitmentStatusChoices.CALLED_AND_ACCEPTED, RecruitmentStatusChoices.CALLED_AND_REJECTED)  # type: ignore[assignment]
+# How the applicant's other applications change when one is called, or the call is undone: (from status, to status)
+RESET_ON_CALL: tuple[int, int] = (RecruitmentStatusChoices.NOT_SET, RecruitmentStatusChoices.AUTOMATIC_REJECTION)  # type: ignore[assignment]
+RESET_ON_UNDO: tuple[int, int] = (RecruitmentStatusChoices.AUTOMATIC_REJECTION, RecruitmentStatusChoices.NOT_SET)  # type: ignore[assignment]
+
+# The fields a recruiter decision changes, directly or through the applicant's other applications
+DECISION_FIELDS = ('recruiter_priority', 'recruiter_status', 'applicant_state')
+
+
+@dataclass(frozen=True)
+class RecruiterChange:
+    """A recruiter's decision on one application. Fields left as None are not changed."""
+
+    application_id: uuid.UUID
+    recruiter_priority: int | None = None
+    recruiter_status: int | None = None
+
+
+def status_reset(*, previous: int, status: int) -> tuple[int, int] | None:
+    """
+    How the applicant's other applications change when one goes from status `previous` to `status`, as
+    (from status, to status). None if they are left alone.
+    """
+    if previous == status:
+        return None
+    if status in CALLED:
+        return RESET_ON_CALL
+    if previous in CALLED:
+        return RESET_ON_UNDO
+    return None
+
+
+def notify_applications_changed(applications: list[RecruitmentApplication]) -> None:
+    """Sends applications_changed for `applications` once the current transaction commits."""
+    if applications:
+        transaction.on_commit(partial(applications_changed.send, sender=RecruitmentApplication, applications=applications))
+
+
+def apply_recruiter_changes(changes: Sequence[RecruiterChange]) -> list[RecruitmentApplication]:
+    """
+    Applies `changes`, and what follows from them for the other applications of the same applicants. Returns every
+    application that changed, with its new version. Raises RecruitmentApplication.DoesNotExist if an application
+    does not exist.
+    """
+    ids = {change.application_id for change in changes}
+    with transaction.atomic():
+        applications = _lock_applications_of_applicants(ids=ids)
+        if not ids <= applications.keys():
+            raise RecruitmentApplication.DoesNotExist(f'No application with id {", ".join(str(pk) for pk in ids - applications.keys())}')
+        before = {pk: _decision(application) for pk, application in applications.items()}
+        by_applicant: dict[tuple[int, int], list[RecruitmentApplication]] = defaultdict(list)
+        for application in applications.values():
+            by_applicant[application.recruitment_id, application.user_id].append(application)
+
+        for change in changes:
+            application = applications[change.application_id]
+            _decide(application=application, change=change, siblings=by_applicant[application.recruitment_id, application.user_id])
+        for siblings in by_applicant.values():
+            derive_applicant_states(siblings)
+
+        changed = [application for pk, application in applications.items() if _decision(application) != before[pk]]
+        _write(changed)
+    notify_applications_changed(changed)
+    return changed
+
+
+def derive_applicant_states(applications: Iterable[RecruitmentApplication]) -> None:
+    """
+    Sets the applicant_state of the active ones of one applicant's `applications`, from their recruiter_priority and
+    whether the applicant is wanted or reserved for a position they ranked higher.
+    """
+    active = sorted((application for application in applications if not application.withdrawn), key=lambda application: application.applicant_priority)
+    top_wanted = next((application for application in active if application.recruiter_priority == RecruitmentPriorityChoices.WANTED), None)
+    top_reserved = next((application for application in active if application.recruiter_priority == RecruitmentPriorityChoices.RESERVE), None)
+    for application in active:
+        if application.recruiter_priority == RecruitmentPriorityChoices.NOT_WANTED:
+            application.applicant_state = RecruitmentApplicantStates.NOT_WANTED
+            continue
+        # Indexes the states as a matrix, the recruiter priority here by what the applicant has elsewhere
+        has_priority = 0
+        if top_reserved and top_reserved.applicant_priority < application.applicant_priority:
+            has_priority = 1
+        if top_wanted and top_wanted.applicant_priority < application.applicant_priority:
+            has_priority = 2
+        application.applicant_state = application.recruiter_priority + 3 * has_priority
+
+
+def _lock_applications_of_applicants(*, ids: set[uuid.UUID]) -> dict[uuid.UUID, RecruitmentApplication]:
+    """Every application, in the same recruitment, of the applicants of the applications `ids`. Locked until the transaction ends."""
+    of_same_applicant = RecruitmentApplication.objects.filter(id__in=ids, recruitment=OuterRef('recruitment'), user=OuterRef('user'))
+    return {application.id: application for application in RecruitmentApplication.objects.select_for_update().filter(Exists(of_same_applicant))}
+
+
+def _decision(application: RecruitmentApplication) -> tuple[int, ...]:
+    return tuple(getattr(application, field) for field in DECISION_FIELDS)
+
+
+def _decide(*, application: RecruitmentApplication, change: RecruiterChange, siblings: list[RecruitmentApplication]) -> None:
+    if change.recruiter_priority is not None:
+        application.recruiter_priority = change.recruiter_priority
+    if change.recruiter_status is None:
+        return
+    reset = status_reset(previous=application.recruiter_status, status=change.recruiter_status)
+    application.recruiter_status = change.recruiter_status
+    if reset is not None:
+        _reset_siblings(application=application, siblings=siblings, reset=reset)
+
+
+def _reset_siblings(*, application: RecruitmentApplication, siblings: list[RecruitmentApplication], reset: tuple[int, int]) -> None:
+    reset_from, reset_to = reset
+    for sibling in siblings:
+        if sibling is not application and sibling.recruiter_status == reset_from:
+            sibling.recruiter_status = reset_to
+
+
+def _write(applications: list[RecruitmentApplication]) -> None:
+    """Writes the decisions on `applications` in one query, with the version and updated fields CustomBaseModel.save sets."""
+    now = timezone.now()
+    request = request_contextvar.get()
+    user = request.user if request and request.user.is_authenticated else None
+    for application in applications:
+        application.version += 1
+        application.updated_at = now
+        application.updated_by = user or application.updated_by
+    RecruitmentApplication.objects.bulk_update(applications, fields=[*DECISION_FIELDS, 'version', 'updated_at', 'updated_by'])
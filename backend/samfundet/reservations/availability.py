@@ -0,0 +1,123 @@
+"""
+Table availability for sulten reservations.
+
+The reservations of each table are kept as one bitmap per day, with a bit for every SLOT_MINUTES of the day.
+Checking a table for a time is then a single bitwise and, and a range of days is loaded with one query for
+the tables and one for the reservations, however many times are asked about afterwards.
+"""
+
+from __future__ import annotations
+
+from datetime import date, time, datetime, timedelta
+from collections import defaultdict
+from dataclasses import dataclass
+
+from samfundet.models.general import Table, Venue, Reservation
+
+SLOT_MINUTES = 5
+# Guests are offered a time every half hour, and keep the table for an hour
+STEP = timedelta(minutes=30)
+DURATION = timedelta(hours=1)
+MAX_DAYS = 31
+
+
+def _floor_slot(t: time) -> int:
+    return (t.hour * 60 + t.minute) // SLOT_MINUTES
+
+
+def _ceil_slot(t: time) -> int:
+    seconds = t.hour * 3600 + t.minute * 60 + t.second
+    return -(-seconds // (SLOT_MINUTES * 60))
+
+
+def _span(*, first: int, last: int) -> int:
+    """Bitmap with slots first through last set."""
+    if last < first:
+        return 0
+    return ((1 << (last - first + 1)) - 1) << first
+
+
+def _occupied(*, start_time: time, end_time: time) -> int:
+    return _span(first=_floor_slot(start_time), last=_ceil_slot(end_time) - 1)
+
+
+def _wanted(*, start_time: time, end_time: time) -> int:
+    # Ending as another reservation starts counts as a clash, like it always has
+    return _span(first=_floor_slot(start_time), last=_floor_slot(end_time))
+
+
+def _key(*, day: date, table_id: int) -> tuple[int, int]:
+    # Ordinals, since callers may pass a datetime for a day
+    return day.toordinal(), table_id
+
+
+def _start_times(*, day: date, opening: time, closing: time) -> list[time]:
+    """Opening time, then every half hour until an hour before closing."""
+    current = datetime.combine(day, opening)
+    last = datetime.combine(day, closing) - DURATION
+    times = []
+    while current <= last:
+        times.append(current.time())
+        current += STEP
+        current += (datetime.min - current) % STEP
+    return times
+
+
+@dataclass
+class Availability:
+    """Reservations for the tables of a venue over a range of days."""
+
+    venue: Venue | None
+    days: list[date]
+    # Smallest first, so the first free table is the best fit
+    tables: list[Table]
+    occupied: dict[tuple[int, int], int]
+
+    @classmethod
+    def load(cls, *, venue: Venue | None, start: date, days: int = 1, exclude: Reservation | None = None) -> Availability:
+        """`exclude` leaves out a reservation being changed, so it does not clash with itself."""
+        dates = [start + timedelta(days=offset) for offset in range(days)]
+        tables = list(Table.objects.filter(venue=venue, seating__isnull=False).order_by('seating', 'id'))
+        occupied: dict[tuple[int, int], int] = defaultdict(int)
+        if not tables:
+            return cls(venue=venue, days=dates, tables=tables, occupied=occupied)
+
+        reservations = Reservation.objects.filter(reservation_date__range=(dates[0], dates[-1]), table__in=[table.id for table in tables])
+        if exclude is not None and exclude.pk is not None:
+            reservations = reservations.exclude(pk=exclude.pk)
+        for reservation_date, table_id, start_time, end_time in reservations.values_list('reservation_date', 'table_id', 'start_time', 'end_time'):
+            occupied[_key(day=reservation_date, table_id=table_id)] |= _occupied(start_time=start_time, end_time=end_time)
+        return cls(venue=venue, days=dates, tables=tables, occupied=occupied)
+
+    def is_free(self, *, table: Table, reservation_date: date, start_time: time, end_time: time) -> bool:
+        wanted = _wanted(start_time=start_time, end_time=end_time)
+        return not self.occupied.get(_key(day=reservation_date, table_id=table.id), 0) & wanted
+
+    def find_table(self, *, guest_count: int, reservation_date: date, start_time: time, end_time: time) -> Table | None:
+        """The smallest free table seating `guest_count`."""
+        for table in self._seating(guest_count=guest_count):
+            if self.is_free(table=table, reservation_date=reservation_date, start_time=start_time, end_time=end_time):
+                return table
+        return None
+
+    def available_times(self, *, guest_count: int, reservation_date: date) -> list[str]:
+        """Start times, as HH:MM, at which some table seating `guest_count` is free for an hour."""
+        opening, closing = self.venue.get_opening_hours_date(reservation_date) if self.venue else (None, None)
+        tables = self._seating(guest_count=guest_count)
+        if opening is None or closing is None or not tables:
+            return []
+
+        bitmaps = [self.occupied.get(_key(day=reservation_date, table_id=table.id), 0) for table in tables]
+        times = []
+        for start_time in _start_times(day=reservation_date, opening=opening, closing=closing):
+            end_time = (datetime.combine(reservation_date, start_time) + DURATION).time()
+            wanted = _wanted(start_time=start_time, end_time=end_time)
+            if any(not bitmap & wanted for bitmap in bitmaps):
+                times.append(start_time.strftime('%H:%M'))
+        return times
+
+    def available_times_by_day(self, *, guest_count: int) -> dict[date, list[str]]:
+        return {day: self.available_times(guest_count=guest_count, reservation_date=day) for day in self.days}
+
+    def _seating(self, *, guest_count: int) -> list[Table]:
+        return [table for table in self.tables if table.seating >= guest_count]
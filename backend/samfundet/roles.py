@@ -3,12 +3,17 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 from dataclasses import field, dataclass
 
+from django.db.models import Q
+from django.contrib.contenttypes.models import ContentType
+
 from .models.role import UserOrgRole, UserGangRole, UserRoleBase, UserGangSectionRole
 from .models.general import Gang, GangSection
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
 
+    from django.db.models import Model
+
     from .models import User
 
 
@@ -30,6 +35,84 @@ class OwnerPermissionMap:
         return self.sections.get(section_id, set()) if section_id is not None else set()
 
 
+@dataclass(frozen=True)
+class RolePermissionMap:
+    """
+    Every permission a user's roles grant, per organization, gang and section the role is held on.
+
+    Unlike OwnerPermissionMap nothing is inherited downwards, a gang role only counts for the gang.
+    """
+
+    orgs: dict[int, set[str]] = field(default_factory=dict)
+    gangs: dict[int, set[str]] = field(default_factory=dict)
+    sections: dict[int, set[str]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.orgs or self.gangs or self.sections)
+
+
+class _Generation:
+    """Bumped on every role change. A kept RolePermissionMap is only valid for the generation it was loaded in."""
+
+    value = 0
+
+
+_generation = _Generation()
+
+
+def get_role_permission_map(*, user: User) -> RolePermissionMap:
+    """
+    The user's RolePermissionMap, loaded once and kept on the user object, the way ModelBackend
+    keeps `_perm_cache`. Any change to a role or role assignment makes every kept map stale,
+    see `invalidate_role_permission_maps`.
+    """
+    cached = getattr(user, '_role_permission_cache', None)
+    if cached is not None and cached[0] == _generation.value:
+        return cached[1]
+
+    role_map = RolePermissionMap(
+        orgs=_role_permissions_by_object(role_model=UserOrgRole, user=user),
+        gangs=_role_permissions_by_object(role_model=UserGangRole, user=user),
+        sections=_role_permissions_by_object(role_model=UserGangSectionRole, user=user),
+    )
+    user._role_permission_cache = (_generation.value, role_map)
+    return role_map
+
+
+def invalidate_role_permission_maps() -> None:
+    """
+    Makes every RolePermissionMap kept on a user object in this process stale. Maps are only kept
+    for the lifetime of the user object, which for a request is the request.
+    """
+    _generation.value += 1
+
+
+def role_permission_q(*, user: User, model: type[Model], permission: str) -> Q:
+    """
+    Matches the objects of `model` where one of the user's roles grants `permission`, the same
+    objects RoleAuthBackend.has_perm allows. The model declares how to reach its owners in
+    `owner_paths`, see docs/technical/backend/rolesystem.md.
+    """
+    # Checked on the model's own content type, like RoleAuthBackend
+    content_type = ContentType.objects.get_for_model(model)
+    name = f'{content_type.app_label}.{permission.rsplit(".", maxsplit=1)[-1]}'
+
+    role_map = get_role_permission_map(user=user)
+    permitted = Q(pk__in=[])
+    for kind, granted_by_owner in (('org', role_map.orgs), ('gang', role_map.gangs), ('section', role_map.sections)):
+        owner_ids = [owner_id for owner_id, granted in granted_by_owner.items() if name in granted]
+        if owner_ids:
+            permitted |= _owned_by(paths=model.owner_paths.get(kind, ()), owner_ids=owner_ids)
+    return permitted
+
+
+def _owned_by(*, paths: str | Sequence[str], owner_ids: list[int]) -> Q:
+    owned = Q(pk__in=[])
+    for path in (paths,) if isinstance(paths, str) else paths:
+        owned |= Q(**{f'{path}__in': owner_ids})
+    return owned
+
+
 def get_owner_permission_map(*, user: User | None, permissions: Sequence[str]) -> OwnerPermissionMap:
     """
     Maps gang and section ids to the subset of `permissions` the user holds for them.
@@ -57,11 +140,11 @@ def _gang_permissions(*, user: User, wanted: set[str], global_perms: set[str]) -
     if global_perms:
         gangs = {gang_id: set(global_perms) for gang_id in Gang.objects.values_list('id', flat=True)}
 
-    org_perms = _role_permissions_by_object(role_model=UserOrgRole, user=user, wanted=wanted)
+    org_perms = _restrict(get_role_permission_map(user=user).orgs, wanted=wanted)
     for gang_id, org_id in Gang.objects.filter(organization_id__in=org_perms).values_list('id', 'organization_id'):
         gangs.setdefault(gang_id, set()).update(org_perms[org_id])
 
-    for gang_id, perms in _role_permissions_by_object(role_model=UserGangRole, user=user, wanted=wanted).items():
+    for gang_id, perms in _restrict(get_role_permission_map(user=user).gangs, wanted=wanted).items():
         gangs.setdefault(gang_id, set()).update(perms)
 
     return gangs
@@ -77,20 +160,26 @@ def _section_permissions(*, user: User, wanted: set[str], global_perms: set[str]
     for section_id, gang_id in GangSection.objects.filter(gang_id__in=gangs).values_list('id', 'gang_id'):
         sections.setdefault(section_id, set()).update(gangs[gang_id])
 
-    for section_id, perms in _role_permissions_by_object(role_model=UserGangSectionRole, user=user, wanted=wanted).items():
+    for section_id, perms in _restrict(get_role_permission_map(user=user).sections, wanted=wanted).items():
         sections.setdefault(section_id, set()).update(perms)
 
     return sections
 
 
-def _role_permissions_by_object(*, role_model: type[UserRoleBase], user: User, wanted: set[str]) -> dict[int, set[str]]:
-    """Maps object id to the subset of `wanted` that the user's roles on that object grant."""
+def _restrict(granted_by_object: dict[int, set[str]], *, wanted: set[str]) -> dict[int, set[str]]:
+    """Only the `wanted` permissions, and only the objects where at least one of them is granted."""
+    restricted = {obj_id: granted & wanted for obj_id, granted in granted_by_object.items()}
+    return {obj_id: granted for obj_id, granted in restricted.items() if granted}
+
+
+def _role_permissions_by_object(*, role_model: type[UserRoleBase], user: User) -> dict[int, set[str]]:
+    """Maps object id to every permission the user's roles on that object grant, in one query."""
     granted_by_object: dict[int, set[str]] = {}
 
-    for user_role in role_model.objects.filter(user=user).prefetch_related('role__permissions__content_type'):
-        names = {f'{permission.content_type.app_label}.{permission.codename}' for permission in user_role.role.permissions.all()}
-        granted = names & wanted
-        if granted:
-            granted_by_object.setdefault(user_role.obj_id, set()).update(granted)
+    rows = role_model.objects.filter(user=user, role__permissions__isnull=False).values_list(
+        'obj_id', 'role__permissions__content_type__app_label', 'role__permissions__codename'
+    )
+    for obj_id, app_label, codename in rows:
+        granted_by_object.setdefault(obj_id, set()).add(f'{app_label}.{codename}')
 
     return granted_by_object
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-import re
+from typing import TYPE_CHECKING
 from dataclasses import field, dataclass
 
 from django.utils.html import escape
 
+if TYPE_CHECKING:
+    from .template import FrontendTemplate
+
 
 @dataclass
 class MetadataItem:
@@ -18,38 +21,44 @@ class Metadata:
     title: str | None = None
     description: str | None = None
     canonical_url: str | None = None
+    # Absolute, since link previews are fetched by other sites
+    image_url: str | None = None
     items: list[MetadataItem] = field(default_factory=list)
 
 
 def build_metadata_html(metadata: Metadata) -> str:
     tags = []
+    items = []
 
     if metadata.title:
-        metadata.items.append(MetadataItem('property', 'og:title', metadata.title))
-        metadata.items.append(MetadataItem('name', 'twitter:title', metadata.title))
+        items.append(MetadataItem('property', 'og:title', metadata.title))
+        items.append(MetadataItem('name', 'twitter:title', metadata.title))
 
     if metadata.description:
         tags.append(f'<meta name="description" content="{escape(metadata.description)}">')
-        metadata.items.append(MetadataItem('property', 'og:description', metadata.description))
+        items.append(MetadataItem('property', 'og:description', metadata.description))
+        items.append(MetadataItem('name', 'twitter:description', metadata.description))
 
     if metadata.canonical_url:
         tags.append(f'<link rel="canonical" href="{escape(metadata.canonical_url)}">')
+        items.append(MetadataItem('property', 'og:url', metadata.canonical_url))
+
+    if metadata.image_url:
+        items.append(MetadataItem('property', 'og:image', metadata.image_url))
+        items.append(MetadataItem('name', 'twitter:image', metadata.image_url))
+        items.append(MetadataItem('name', 'twitter:card', 'summary_large_image'))
 
-    tags.extend(f'<meta {item.attr}="{escape(item.key)}" content="{escape(item.value)}">' for item in metadata.items)
+    items.extend(metadata.items)
+    tags.extend(f'<meta {item.attr}="{escape(item.key)}" content="{escape(item.value)}">' for item in items)
 
     return '\n'.join(tags)
 
 
-def inject_metadata(html: str, metadata: Metadata) -> str:
-    if metadata.title:
-        title = escape(metadata.title)
-        if re.search(r'<title>.*?</title>', html, flags=re.IGNORECASE | re.DOTALL):
-            html = re.sub(r'<title>.*?</title>', f'<title>{title}</title>', html, flags=re.IGNORECASE | re.DOTALL)
-        else:
-            html = html.replace('</head>', f'<title>{title}</title></head>')
+def inject_metadata(template: FrontendTemplate, metadata: Metadata) -> str:
+    if not template.rest:
+        return template.html
 
+    title = f'<title>{escape(metadata.title)}</title>' if metadata.title else template.title
     meta_html = build_metadata_html(metadata)
 
-    html = html.replace('</head>', f'{meta_html}\n</head>')
-
-    return html
+    return f'{template.before_title}{title}{template.before_head_end}{meta_html}\n{template.rest}'
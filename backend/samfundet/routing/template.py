@@ -0,0 +1,71 @@
+"""
+The built React index.html, kept in memory.
+
+Every frontend route serves this file, so it is read once per process and again only when its mtime changes
+(i.e. after a new frontend build). It is stored split around the <title> and the end of <head>, so injecting
+metadata is a concatenation rather than a search through the document.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+
+from django.conf import settings
+
+_TITLE = re.compile(r'<title>.*?</title>', flags=re.IGNORECASE | re.DOTALL)
+_HEAD_END = '</head>'
+
+
+@dataclass(frozen=True)
+class FrontendTemplate:
+    html: str
+    mtime_ns: int
+    before_title: str
+    title: str
+    before_head_end: str
+    # From </head> to the end, empty if the document has no </head>
+    rest: str
+
+    @classmethod
+    def parse(cls, *, html: str, mtime_ns: int) -> FrontendTemplate:
+        head_end = html.find(_HEAD_END)
+        if head_end == -1:
+            return cls(html=html, mtime_ns=mtime_ns, before_title=html, title='', before_head_end='', rest='')
+
+        match = _TITLE.search(html, 0, head_end)
+        if match is None:
+            return cls(html=html, mtime_ns=mtime_ns, before_title=html[:head_end], title='', before_head_end='', rest=html[head_end:])
+        return cls(
+            html=html,
+            mtime_ns=mtime_ns,
+            before_title=html[: match.start()],
+            title=match.group(),
+            before_head_end=html[match.end() : head_end],
+            rest=html[head_end:],
+        )
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.mtime_ns:x}-{len(self.html):x}"'
+
+    @property
+    def last_modified(self) -> int:
+        return self.mtime_ns // 1_000_000_000
+
+
+# Keyed by path, so tests pointing REACT_BUILD_DIR elsewhere get their own entry
+_TEMPLATES: dict[str, FrontendTemplate] = {}
+
+
+def frontend_template() -> FrontendTemplate:
+    """Raises FileNotFoundError if the frontend has not been built."""
+    path = os.path.join(settings.REACT_BUILD_DIR, 'index.html')
+    mtime_ns = os.stat(path).st_mtime_ns
+    template = _TEMPLATES.get(path)
+    if template is None or template.mtime_ns != mtime_ns:
+        with open(path) as f:
+            template = FrontendTemplate.parse(html=f.read(), mtime_ns=mtime_ns)
+        _TEMPLATES[path] = template
+    return template
@@ -1,20 +1,30 @@
 from __future__ import annotations
 
-import os
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from django.conf import settings
 from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+from django.utils.http import http_date
+from django.utils.cache import patch_cache_control, get_conditional_response
 
 from samfundet.models import Event
+from samfundet.caching import EVENT_PAGES, INFORMATION_PAGES, RECRUITMENT_POSITION_PAGES
+from samfundet.infopages.models import InformationPage
+from samfundet.models.recruitment import RecruitmentPosition
+from samfundet.models.utils.string_utils import ellipsize
 
 from .metadata import Metadata, MetadataItem, inject_metadata
+from .template import FrontendTemplate, frontend_template
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from samfundet.caching import CacheRegion
+    from samfundet.models.general import Image
 
 
 def get_frontend_html() -> str:
-    path = os.path.join(settings.REACT_BUILD_DIR, 'index.html')
-    with open(path) as f:
-        return f.read()
+    return frontend_template().html
 
 
 def react_view(request: HttpRequest, **kwargs: Any) -> HttpResponse:
@@ -24,10 +34,17 @@ def react_view(request: HttpRequest, **kwargs: Any) -> HttpResponse:
     (React Router will handle routing on the client side)
     """
     try:
-        return HttpResponse(get_frontend_html())
+        template = frontend_template()
     except FileNotFoundError:
         return HttpResponse('React build not found.', status=500)
 
+    response = get_conditional_response(request, etag=template.etag, last_modified=template.last_modified) or HttpResponse(template.html)
+    response['ETag'] = template.etag
+    response['Last-Modified'] = http_date(template.last_modified)
+    # Always revalidate, so a new build is picked up right away
+    patch_cache_control(response, no_cache=True)
+    return response
+
 
 def react_404_view(request: HttpRequest, exception: Exception | None = None, **kwargs: Any) -> HttpResponse:
     """
@@ -59,22 +76,100 @@ def is_bot(request: HttpRequest) -> bool:
         'pinterestbot',
         'curl',
     ]
-    user_agent = request.META['HTTP_USER_AGENT'].lower()
+    user_agent = request.META.get('HTTP_USER_AGENT', '').lower()
     return any(pattern in user_agent for pattern in bot_patterns)
 
 
-def react_event_view(request: HttpRequest, **kwargs: Any) -> HttpResponse:
-    try:
-        event = Event.objects.get(id=kwargs['id'])
-    except Event.DoesNotExist:
-        # Let React handle displaying that the event wasn't found
-        return HttpResponse(get_frontend_html(), status=404)
+def metadata_view(*, region: CacheRegion, load: Callable[..., Metadata | None]) -> Callable[..., HttpResponse]:
+    """
+    View for a frontend route showing one object, e.g. an event.
+
+    People get the plain React app, which fetches the object itself. Bots get the object's metadata rendered
+    into the page, and HTTP 404 if it does not exist. The rendered page is cached in `region` per URL, so
+    link previews for a shared page do not touch the database until the object changes. 404s are not cached,
+    so requests for made up URLs cannot fill the cache.
+    `load` is called with the request and the route parameters, and returns None if there is no such object.
+    """
+
+    def view(request: HttpRequest, **kwargs: Any) -> HttpResponse:
+        if not is_bot(request):
+            return react_view(request, **kwargs)
+
+        try:
+            template = frontend_template()
+        except FileNotFoundError:
+            return HttpResponse('React build not found.', status=500)
+
+        status, html = region.get_or_set(
+            request.build_absolute_uri(request.path),
+            template.etag,
+            default=lambda: _render(template=template, metadata=load(request, **kwargs)),
+            timeout_for=_not_found_uncached,
+        )
+        return HttpResponse(html, status=status)
+
+    return view
+
+
+def _render(*, template: FrontendTemplate, metadata: Metadata | None) -> tuple[int, str]:
+    if metadata is None:
+        return 404, template.html
+    return 200, inject_metadata(template, metadata)
+
+
+def _not_found_uncached(rendered: tuple[int, str]) -> float | None:
+    status, _html = rendered
+    return 0 if status == 404 else None
+
+
+def _id(value: str) -> int | None:
+    return int(value) if value.isdigit() else None
+
+
+def _image_url(request: HttpRequest, image: Image | None) -> str | None:
+    return request.build_absolute_uri(image.urls['medium']) if image and image.image else None
+
+
+def event_metadata(request: HttpRequest, *, id: str) -> Metadata | None:  # noqa: A002
+    event = Event.objects.select_related('image').filter(id=_id(id)).first()
+    if event is None:
+        return None
+    return Metadata(
+        title=f'{event.title_nb} - Samfundet',
+        description=event.description_short_nb,
+        canonical_url=request.build_absolute_uri(request.path),
+        image_url=_image_url(request, event.image),
+        items=[MetadataItem('property', 'og:type', 'website')],
+    )
+
+
+def information_page_metadata(request: HttpRequest, *, slugField: str) -> Metadata | None:  # noqa: N803
+    page = InformationPage.objects.visible().select_related('current_revision').filter(slug_field=slugField.lower()).first()
+    revision = page.current_revision if page else None
+    if revision is None:
+        return None
+    return Metadata(
+        title=f'{revision.title_nb or page.slug_field} - Samfundet',
+        description=ellipsize(revision.text_nb, length=160) if revision.text_nb else None,
+        canonical_url=request.build_absolute_uri(request.path),
+    )
+
 
-    title = f'{event.title_nb} - Samfundet'
-    description = event.description_short_nb
+def recruitment_position_metadata(request: HttpRequest, *, recruitmentId: str, positionId: str) -> Metadata | None:  # noqa: N803
+    position = (
+        RecruitmentPosition.objects.select_related('recruitment')
+        .filter(id=_id(positionId), recruitment_id=_id(recruitmentId), recruitment__visible_from__lte=timezone.now())
+        .first()
+    )
+    if position is None:
+        return None
+    return Metadata(
+        title=f'{position.name_nb} - {position.recruitment.name_nb} - Samfundet',
+        description=position.short_description_nb,
+        canonical_url=request.build_absolute_uri(request.path),
+    )
 
-    metadata = Metadata(title=title, description=description)
-    metadata.items.append(MetadataItem('name', 'og:custom', 'Lorem ipsum'))  # TODO:
 
-    html = get_frontend_html()
-    return HttpResponse(inject_metadata(html, metadata))
+react_event_view = metadata_view(region=EVENT_PAGES, load=event_metadata)
+react_information_page_view = metadata_view(region=INFORMATION_PAGES, load=information_page_metadata)
+react_recruitment_position_view = metadata_view(region=RECRUITMENT_POSITION_PAGES, load=recruitment_position_metadata)
@@ -0,0 +1,167 @@
+"""
+Full-text search over events, images, information pages and users.
+
+Each searchable model has a stored `search_vector` column with a GIN index, built from the model's own fields and
+related rows (event group, tags, the current revision of an info page). The signals in samfundet.signals rebuild it
+on save. Queryset updates and bulk_create send no signals, so code writing searchable fields that way must call
+update_search_vectors itself.
+
+Norwegian and English fields are indexed with the matching Postgres text search configuration, so inflected forms
+match ("billetter" finds "billett"). Names, tags and other text of no particular language use 'simple'. A query is
+matched in all three configurations, with every word as a prefix, so results show up while typing.
+
+User pickers use autocomplete_users instead, a pg_trgm lookup on User.search_name returning only the top matches.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Any, TypeVar
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.db.models import F, Q, Model, OuterRef, Subquery, BooleanField, ExpressionWrapper
+from django.contrib.postgres.search import SearchRank, SearchQuery, SearchVector, TrigramWordSimilarity
+from django.contrib.postgres.aggregates import StringAgg
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from django.db.models import QuerySet
+
+M = TypeVar('M', bound=Model)
+
+SEARCH_CONFIGS = ('norwegian', 'english', 'simple')
+
+# Characters with a meaning in tsquery syntax, stripped from what users type
+TSQUERY_OPERATORS = re.compile(r"[&|!():*<>'\\]")
+
+# pg_trgm cannot use its index for shorter text, so these are only matched as a prefix of the username
+TRIGRAM_MIN_LENGTH = 3
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    # Fields of the model itself the vector is built from. Saves with update_fields outside these skip the rebuild.
+    fields: tuple[str, ...]
+    # Builds the vector expression for the model class. Migration 0021 has a frozen copy of the first versions.
+    vector: Callable[[type[Model]], SearchVector]
+
+
+def _event_vector(model: type[Model]) -> SearchVector:
+    group = model._meta.get_field('event_group').related_model
+    group_name = Subquery(group._base_manager.filter(pk=OuterRef('event_group')).values('name'))
+    return (
+        SearchVector('title_nb', config='norwegian', weight='A')
+        + SearchVector('title_en', config='english', weight='A')
+        + SearchVector('description_short_nb', config='norwegian', weight='B')
+        + SearchVector('description_short_en', config='english', weight='B')
+        + SearchVector(group_name, config='simple', weight='B')
+        + SearchVector('description_long_nb', config='norwegian', weight='C')
+        + SearchVector('description_long_en', config='english', weight='C')
+        + SearchVector('location', config='simple', weight='D')
+    )
+
+
+def _image_vector(model: type[Model]) -> SearchVector:
+    through = model._meta.get_field('tags').remote_field.through
+    tag_names = Subquery(through._base_manager.filter(image=OuterRef('pk')).values('image').annotate(names=StringAgg('tag__name', ' ')).values('names'))
+    return SearchVector('title', config='simple', weight='A') + SearchVector(tag_names, config='simple', weight='B')
+
+
+def _information_page_vector(model: type[Model]) -> SearchVector:
+    revisions = model._meta.get_field('current_revision').related_model._base_manager.filter(pk=OuterRef('current_revision'))
+
+    def revision(field: str) -> Subquery:
+        return Subquery(revisions.values(field))
+
+    return (
+        SearchVector(revision('title_nb'), config='norwegian', weight='A')
+        + SearchVector(revision('title_en'), config='english', weight='A')
+        + SearchVector('slug_field', config='simple', weight='B')
+        + SearchVector(revision('text_nb'), config='norwegian', weight='C')
+        + SearchVector(revision('text_en'), config='english', weight='C')
+    )
+
+
+def _user_vector(model: type[Model]) -> SearchVector:
+    return SearchVector('username', 'first_name', 'last_name', config='simple', weight='A')
+
+
+# By model label
+SEARCH_INDEXES = {
+    'samfundet.Event': SearchIndex(
+        fields=(
+            'title_nb',
+            'title_en',
+            'description_short_nb',
+            'description_short_en',
+            'description_long_nb',
+            'description_long_en',
+            'location',
+            'event_group',
+        ),
+        vector=_event_vector,
+    ),
+    'samfundet.Image': SearchIndex(fields=('title',), vector=_image_vector),
+    'samfundet.InformationPage': SearchIndex(fields=('slug_field', 'current_revision'), vector=_information_page_vector),
+    'samfundet.User': SearchIndex(fields=('username', 'first_name', 'last_name'), vector=_user_vector),
+}
+
+
+def update_search_vectors(model: type[Model], *, pks: Iterable[Any] | None = None) -> int:
+    """Rebuilds the search vector of the rows with `pks`, or of every row. Returns how many rows were updated."""
+    rows = model._base_manager.all()
+    if pks is not None:
+        rows = rows.filter(pk__in=pks)
+    return rows.update(search_vector=SEARCH_INDEXES[model._meta.label].vector(model))
+
+
+def rebuild_search_vectors() -> int:
+    """Rebuilds every search vector, e.g. after seeding or changing how a vector is built."""
+    return sum(update_search_vectors(apps.get_model(label)) for label in SEARCH_INDEXES)
+
+
+def search_query(text: str) -> SearchQuery | None:
+    """`text` as a query matching every word as a prefix, in any of the SEARCH_CONFIGS. None if there are no words."""
+    words = TSQUERY_OPERATORS.sub(' ', text).split()
+    if not words:
+        return None
+    raw = ' & '.join(f'{word}:*' for word in words)
+    query = SearchQuery(raw, config=SEARCH_CONFIGS[0], search_type='raw')
+    for config in SEARCH_CONFIGS[1:]:
+        query |= SearchQuery(raw, config=config, search_type='raw')
+    return query
+
+
+def full_text_search(queryset: QuerySet[M], text: str) -> QuerySet[M]:
+    """
+    The rows of `queryset` matching every word of `text`, best match first, annotated with their `search_rank`.
+    The queryset's own ordering breaks ties.
+    """
+    query = search_query(text)
+    if query is None:
+        return queryset.none()
+    ordering = queryset.query.order_by
+    return queryset.filter(search_vector=query).annotate(search_rank=SearchRank(F('search_vector'), query)).order_by('-search_rank', *ordering)
+
+
+def autocomplete_users(users: QuerySet[M], text: str, *, limit: int) -> QuerySet[M]:
+    """
+    The `limit` users best matching `text`, for user pickers. Matches the text anywhere in the username or name, or
+    fuzzily (pg_trgm word similarity) to allow typos. Usernames and names starting with the text come first.
+    """
+    text = ' '.join(text.lower().split())
+    if not text:
+        return users.none()
+    if len(text) < TRIGRAM_MIN_LENGTH:
+        return users.filter(search_name__startswith=text).order_by('search_name')[:limit]
+    starts_with = Q(search_name__startswith=text) | Q(search_name__contains=f' {text}')
+    return (
+        users.filter(Q(search_name__contains=text) | Q(search_name__trigram_word_similar=text))
+        .annotate(
+            starts_with=ExpressionWrapper(starts_with, output_field=BooleanField()),
+            similarity=TrigramWordSimilarity(text, 'search_name'),
+        )
+        .order_by('-starts_with', '-similarity', 'search_name')[:limit]
+    )
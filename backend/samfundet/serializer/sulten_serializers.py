@@ -5,6 +5,7 @@ from rest_framework import serializers
 from root.utils.mixins import FullCleanSerializer, CustomBaseSerializer
 
 from samfundet.models.general import Menu, Table, MenuItem, Reservation, FoodCategory, FoodPreference
+from samfundet.reservations.availability import MAX_DAYS
 
 
 class TableSerializer(CustomBaseSerializer):
@@ -25,6 +26,13 @@ class ReservationCheckSerializer(serializers.ModelSerializer):
         fields = ['guest_count', 'occasion', 'reservation_date']
 
 
+class ReservationAvailabilitySerializer(serializers.Serializer):
+    venue = serializers.SlugField(default='lyche')
+    guest_count = serializers.IntegerField(min_value=1)
+    start_date = serializers.DateField()
+    days = serializers.IntegerField(min_value=1, max_value=MAX_DAYS, default=7)
+
+
 class FoodCategorySerializer(CustomBaseSerializer):
     class Meta:
         model = FoodCategory
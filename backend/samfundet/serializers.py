@@ -11,9 +11,8 @@ from PIL import UnidentifiedImageError
 from guardian.models import UserObjectPermission, GroupObjectPermission
 
 from rest_framework import serializers
-from rest_framework.utils.serializer_helpers import ReturnList
 
-from django.db.models import Q, QuerySet
+from django.db.models import Q, Manager, Prefetch, QuerySet, prefetch_related_objects
 from django.core.files import File
 from django.contrib.auth import authenticate
 from django.core.exceptions import ValidationError
@@ -104,6 +103,14 @@ class BasicUserSerializer(serializers.ModelSerializer):
         fields = ['username', 'first_name', 'last_name']
 
 
+class UserOptionSerializer(serializers.ModelSerializer):
+    """A user to pick, e.g. in the autocomplete of user pickers."""
+
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'first_name', 'last_name']
+
+
 class ImageSerializer(CustomBaseSerializer):
     # Read only tags used in frontend.
     tags = TagSerializer(many=True, read_only=True)
@@ -116,7 +123,7 @@ class ImageSerializer(CustomBaseSerializer):
 
     class Meta:
         model = Image
-        exclude = ['image', *(f'image_{name}' for name in Image.VARIANTS)]
+        exclude = ['image', *(f'image_{name}' for name in Image.VARIANTS), 'search_vector']
 
     def validate(self, attributes: dict) -> dict:
         is_create = self.instance is None
@@ -273,7 +280,7 @@ class EventListSerializer(serializers.ListSerializer):
             events = events.prefetch_related('custom_tickets')
             events = events.prefetch_related('image')
 
-        Event.prefetch_billig(events=events, tickets=True, prices=True)
+        Event.prefetch_billig_snapshots(events=events)
 
         # Use event serializer (child) as normal after
         return [self.child.to_representation(e) for e in events]
@@ -284,7 +291,7 @@ class EventSerializer(CustomBaseSerializer):
         model = Event
         list_serializer_class = EventListSerializer
         # Warning: registration object contains sensitive data, don't include it!
-        exclude = ['registration', 'event_group', 'billig_id']
+        exclude = ['registration', 'event_group', 'billig_id', 'search_vector']
 
     # Read only properties (computed property, foreign model).
     total_registrations = serializers.IntegerField(read_only=True)
@@ -292,14 +299,20 @@ class EventSerializer(CustomBaseSerializer):
 
     # Custom tickets/billig
     custom_tickets = EventCustomTicketSerializer(many=True, read_only=True)
-    billig = BilligEventSerializer(read_only=True)
+    # Serialized with BilligEventSerializer by the last billig sync
+    billig = serializers.SerializerMethodField(read_only=True)
 
     # For post/put (change image by id).
     image_id = serializers.IntegerField(write_only=True, required=True)
 
+    def get_billig(self, obj: Event) -> dict | None:
+        snapshot = obj.billig_snapshot
+        return snapshot.as_dict() if snapshot else None
+
     def get_image(self, obj: Event) -> dict:
         img = obj.image
-        return {'id': img.id, 'urls': img.urls, 'title': img.title, 'tags': list(img.tags.values_list('id', flat=True))}
+        # Through all() so prefetched tags are used
+        return {'id': img.id, 'urls': img.urls, 'title': img.title, 'tags': [tag.id for tag in img.tags.all()]}
 
     def update(self, instance: Event, validated_data: dict[str, Any]) -> Event:
         image_id = validated_data.pop('image_id', None)
@@ -537,7 +550,21 @@ class CampusSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class UserListSerializer(serializers.ModelSerializer):
+    """
+    A user in listings, which anonymous users may read. Leaves out the contact details and admin flags, and the
+    permissions, roles and preference of UserSerializer, which are only needed for the logged-in user and cost
+    several queries per user.
+    """
+
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'first_name', 'last_name', 'is_active', 'date_joined', 'last_login']
+
+
 class UserSerializer(serializers.ModelSerializer):
+    """The logged-in user, with everything the frontend needs to check permissions. Use UserListSerializer for lists of users."""
+
     groups = GroupSerializer(many=True, read_only=True)
     campus = CampusSerializer(read_only=True)
     permissions = serializers.SerializerMethodField(method_name='get_permissions', read_only=True)
@@ -548,7 +575,7 @@ class UserSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = User
-        exclude = ['password', 'user_permissions']
+        exclude = ['password', 'user_permissions', 'search_vector', 'search_name']
 
     def get_permissions(self, user: User) -> list[str]:
         return list(user.get_all_permissions())
@@ -708,7 +735,7 @@ class RoleSerializer(CustomBaseSerializer):
 
 
 class UserOrgRoleSerializer(CustomBaseSerializer):
-    user = UserSerializer()
+    user = UserListSerializer()
     org_role = serializers.SerializerMethodField()
 
     class Meta:
@@ -718,13 +745,13 @@ class UserOrgRoleSerializer(CustomBaseSerializer):
     def get_org_role(self, obj: UserOrgRole) -> dict:
         return {
             'created_at': obj.created_at,
-            'created_by': UserSerializer(obj.created_by).data,
+            'created_by': UserListSerializer(obj.created_by).data if obj.created_by else None,
             'organization': OrganizationSerializer(obj.obj).data,
         }
 
 
 class UserGangRoleSerializer(CustomBaseSerializer):
-    user = UserSerializer()
+    user = UserListSerializer()
     gang_role = serializers.SerializerMethodField()
 
     class Meta:
@@ -734,13 +761,13 @@ class UserGangRoleSerializer(CustomBaseSerializer):
     def get_gang_role(self, obj: UserGangRole) -> dict:
         return {
             'created_at': obj.created_at,
-            'created_by': UserSerializer(obj.created_by).data,
+            'created_by': UserListSerializer(obj.created_by).data if obj.created_by else None,
             'gang': GangSerializer(obj.obj).data,
         }
 
 
 class UserGangSectionRoleSerializer(CustomBaseSerializer):
-    user = UserSerializer()
+    user = UserListSerializer()
     section_role = serializers.SerializerMethodField()
 
     class Meta:
@@ -750,7 +777,7 @@ class UserGangSectionRoleSerializer(CustomBaseSerializer):
     def get_section_role(self, obj: UserGangSectionRole) -> dict:
         return {
             'created_at': obj.created_at,
-            'created_by': UserSerializer(obj.created_by).data,
+            'created_by': UserListSerializer(obj.created_by).data if obj.created_by else None,
             'section': GangSectionSerializer(obj.obj).data,
         }
 
@@ -885,7 +912,19 @@ class RecruitmentUpdateUserPrioritySerializer(serializers.Serializer):
     direction = serializers.IntegerField(label='direction', write_only=True)
 
 
+class UserForRecruitmentListSerializer(serializers.ListSerializer):
+    """Serializes many users with UserForRecruitmentSerializer, loading the applications of all of them in one query."""
+
+    def to_representation(self, users: list[User] | QuerySet[User]) -> list[dict]:
+        users = list(users.all() if isinstance(users, Manager) else users)
+        self.child.prefetch_applications(users)
+        return [self.child.to_representation(user) for user in users]
+
+
 class UserForRecruitmentSerializer(serializers.ModelSerializer):
+    # Attribute the prefetched applications of a user are stored in
+    PREFETCHED = 'recruitment_applications'
+
     applications = serializers.SerializerMethodField(method_name='get_applications', read_only=True)
     applications_without_interview = serializers.SerializerMethodField(method_name='get_applications_without_interviews_for_recruitment', read_only=True)
     top_application = serializers.SerializerMethodField(method_name='get_top_application', read_only=True)
@@ -905,6 +944,7 @@ class UserForRecruitmentSerializer(serializers.ModelSerializer):
             'applications_without_interview',
             'top_application',
         ]
+        list_serializer_class = UserForRecruitmentListSerializer
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         # This will allow it to filter applications on recruitment
@@ -912,31 +952,32 @@ class UserForRecruitmentSerializer(serializers.ModelSerializer):
         self.gang = kwargs.pop('gang', None)
         super().__init__(*args, **kwargs)
 
-    def get_applications(self, obj: User) -> list[int]:
-        """Return list of recruitment application IDs for the user."""
-        applications = RecruitmentApplication.objects.filter(user=obj)
+    def prefetch_applications(self, users: list[User]) -> None:
+        """Loads the applications of `users` in the recruitment and gang, ranked per user by applicant priority, in one query."""
+        applications = RecruitmentApplication.objects.for_applicant_listing().with_applicant_rank()
         if self.recruitment:
             applications = applications.filter(recruitment=self.recruitment)
         if self.gang:
             applications = applications.filter(recruitment_position__gang=self.gang)
-        return RecruitmentApplicationForApplicantSerializer(applications, many=True).data
+        prefetch_related_objects(users, 'campus', Prefetch('applications', queryset=applications, to_attr=self.PREFETCHED))
+
+    def _applications(self, obj: User) -> list[RecruitmentApplication]:
+        if not hasattr(obj, self.PREFETCHED):
+            self.prefetch_applications([obj])
+        return getattr(obj, self.PREFETCHED)
+
+    def get_applications(self, obj: User) -> list[int]:
+        """Return list of recruitment application IDs for the user."""
+        return RecruitmentApplicationForApplicantSerializer(self._applications(obj), many=True).data
 
     def get_applications_without_interviews_for_recruitment(self, obj: User) -> list[int]:
         """Return list of recruitment application IDs for the user."""
-        applications = RecruitmentApplication.objects.filter(user=obj, interview=None)
-        if self.recruitment:
-            applications = applications.filter(recruitment=self.recruitment)
-        if self.gang:
-            applications = applications.filter(recruitment_position__gang=self.gang)
+        applications = [application for application in self._applications(obj) if application.interview_id is None]
         return RecruitmentApplicationForApplicantSerializer(applications, many=True).data
 
     def get_top_application(self, obj: User) -> list[int]:
-        applications = RecruitmentApplication.objects.filter(user=obj)
-        if self.recruitment:
-            applications = applications.filter(recruitment=self.recruitment)
-        if self.gang:
-            applications = applications.filter(recruitment_position__gang=self.gang)
-        return RecruitmentApplicationForApplicantSerializer(applications.order_by('applicant_priority').first()).data
+        top = next((application for application in self._applications(obj) if application.applicant_rank == 1), None)
+        return RecruitmentApplicationForApplicantSerializer(top).data
 
 
 class InterviewerSerializer(CustomBaseSerializer):
@@ -1079,10 +1120,17 @@ class RecruitmentPositionSerializer(CustomBaseSerializer):
         self._update_interviewers(recruitment_position=updated_instance, interviewer_ids=self.interviewer_ids)
         return updated_instance
 
+    # The counts are read from RecruitmentPositionQuerySet.with_applicant_counts when the queryset was annotated with it
     def get_total_applicants(self, recruitment_position: RecruitmentPosition) -> int:
+        annotated = getattr(recruitment_position, 'total_applicants', None)
+        if annotated is not None:
+            return annotated
         return RecruitmentApplication.objects.filter(recruitment_position=recruitment_position, withdrawn=False).count()
 
     def get_processed_applicants(self, recruitment_position: RecruitmentPosition) -> int:
+        annotated = getattr(recruitment_position, 'processed_applicants', None)
+        if annotated is not None:
+            return annotated
         return (
             RecruitmentApplication.objects.filter(recruitment_position=recruitment_position, withdrawn=False)
             .exclude(recruiter_status=RecruitmentStatusChoices.NOT_SET)
@@ -1090,6 +1138,9 @@ class RecruitmentPositionSerializer(CustomBaseSerializer):
         )
 
     def get_accepted_applicants(self, recruitment_position: RecruitmentPosition) -> int:
+        annotated = getattr(recruitment_position, 'accepted_applicants', None)
+        if annotated is not None:
+            return annotated
         return RecruitmentApplication.objects.filter(
             recruitment_position=recruitment_position, withdrawn=False, recruiter_status=RecruitmentStatusChoices.CALLED_AND_ACCEPTED
         ).count()
@@ -1357,48 +1408,86 @@ class RecruitmentApplicationForGangSerializer(CustomBaseSerializer):
         # Update other fields of RecruitmentApplication instance
         return super().update(instance, validated_data)
 
+    # Read from RecruitmentApplicationQuerySet.with_application_count when the queryset was annotated with it
     def get_application_count(self, application: RecruitmentApplication) -> int:
+        annotated = getattr(application, 'application_count', None)
+        if annotated is not None:
+            return annotated
         return application.user.applications.filter(recruitment=application.recruitment).count()
 
 
 class RecruitmentPositionOrganizedApplications(CustomBaseSerializer):
+    """
+    The applications to a position, grouped by where the recruiters are with them. Fetches and serializes the
+    applications once, so pass a position from RecruitmentPositionQuerySet.for_listing to keep it at a fixed
+    number of queries.
+    """
+
     ApplicationSerializer = RecruitmentApplicationForGangSerializer
-    unprocessed = serializers.SerializerMethodField(method_name='get_unprocessed', read_only=True)
-    withdrawn = serializers.SerializerMethodField(method_name='get_withdrawn', read_only=True)
-    accepted = serializers.SerializerMethodField(method_name='get_accepted', read_only=True)
-    rejected = serializers.SerializerMethodField(method_name='get_rejected', read_only=True)
-    hardtoget = serializers.SerializerMethodField(method_name='get_hardtoget', read_only=True)
+    unprocessed = ApplicationSerializer(many=True, read_only=True)
+    withdrawn = ApplicationSerializer(many=True, read_only=True)
+    accepted = ApplicationSerializer(many=True, read_only=True)
+    rejected = ApplicationSerializer(many=True, read_only=True)
+    hardtoget = ApplicationSerializer(many=True, read_only=True)
+
+    # Which group an active application belongs to, by its recruiter_status
+    STATUS_GROUPS = {
+        RecruitmentStatusChoices.NOT_SET: 'unprocessed',
+        RecruitmentStatusChoices.CALLED_AND_ACCEPTED: 'accepted',
+        RecruitmentStatusChoices.CALLED_AND_REJECTED: 'hardtoget',
+        RecruitmentStatusChoices.REJECTION: 'rejected',
+        RecruitmentStatusChoices.AUTOMATIC_REJECTION: 'rejected',
+    }
 
     class Meta:
         model = RecruitmentPosition
         fields = ['unprocessed', 'withdrawn', 'accepted', 'rejected', 'hardtoget']
 
-    def get_unprocessed(self, instance: RecruitmentPosition) -> ReturnList:
-        unprocessed = instance.applications.filter(withdrawn=False, recruiter_status=RecruitmentStatusChoices.NOT_SET)
-        return self.ApplicationSerializer(unprocessed, many=True).data
+    def to_representation(self, instance: RecruitmentPosition) -> dict[str, list]:
+        applications = list(instance.applications.for_listing())
+        organized: dict[str, list] = {group: [] for group in self.Meta.fields}
+        for application, data in zip(applications, self.ApplicationSerializer(applications, many=True).data, strict=True):
+            group = self._group(application)
+            if group is not None:
+                organized[group].append(data)
+        return organized
+
+    @classmethod
+    def _group(cls, application: RecruitmentApplication) -> str | None:
+        if application.withdrawn:
+            return 'withdrawn'
+        # withdrawn is nullable, and an application with it unset belongs to no group
+        if application.withdrawn is None:
+            return None
+        return cls.STATUS_GROUPS.get(application.recruiter_status)
 
-    def get_withdrawn(self, instance: RecruitmentPosition) -> ReturnList:
-        withdrawn = instance.applications.filter(withdrawn=True)
-        return self.ApplicationSerializer(withdrawn, many=True).data
 
-    def get_rejected(self, instance: RecruitmentPosition) -> ReturnList:
-        rejected = instance.applications.filter(
-            withdrawn=False, recruiter_status__in=[RecruitmentStatusChoices.AUTOMATIC_REJECTION, RecruitmentStatusChoices.REJECTION]
-        )
-        return self.ApplicationSerializer(rejected, many=True).data
+class RecruitmentApplicationUpdateForGangSerializer(serializers.Serializer):
+    recruiter_priority = serializers.ChoiceField(choices=RecruitmentPriorityChoices.choices, required=False)
+    recruiter_status = serializers.ChoiceField(choices=RecruitmentStatusChoices.choices, required=False)
 
-    def get_accepted(self, instance: RecruitmentPosition) -> ReturnList:
-        accepted = instance.applications.filter(withdrawn=False, recruiter_status=RecruitmentStatusChoices.CALLED_AND_ACCEPTED)
-        return self.ApplicationSerializer(accepted, many=True).data
 
-    def get_hardtoget(self, instance: RecruitmentPosition) -> ReturnList:
-        hardtoget = instance.applications.filter(withdrawn=False, recruiter_status=RecruitmentStatusChoices.CALLED_AND_REJECTED)
-        return self.ApplicationSerializer(hardtoget, many=True).data
+class RecruitmentApplicationStateChangeListSerializer(serializers.ListSerializer):
+    def validate(self, attrs: list[dict]) -> list[dict]:
+        ids = [change['application_id'] for change in attrs]
+        if len(set(ids)) != len(ids):
+            raise serializers.ValidationError('Each application can only be changed once per request')
+        return attrs
 
 
-class RecruitmentApplicationUpdateForGangSerializer(serializers.Serializer):
-    recruiter_priority = serializers.ChoiceField(choices=RecruitmentPriorityChoices.choices, required=False)
-    recruiter_status = serializers.ChoiceField(choices=RecruitmentStatusChoices.choices, required=False)
+class RecruitmentApplicationStateChangeSerializer(RecruitmentApplicationUpdateForGangSerializer):
+    application_id = serializers.UUIDField()
+
+    class Meta:
+        list_serializer_class = RecruitmentApplicationStateChangeListSerializer
+
+
+class RecruitmentApplicationStateSerializer(serializers.ModelSerializer):
+    """The recruiter decision on an application, with the version it was written at."""
+
+    class Meta:
+        model = RecruitmentApplication
+        fields = ['id', 'recruiter_priority', 'recruiter_status', 'applicant_state', 'version']
 
 
 class UserFeedbackSerializer(serializers.ModelSerializer):
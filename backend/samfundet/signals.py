@@ -1,15 +1,25 @@
 from __future__ import annotations
 
 from typing import Any
+from functools import partial
 
+from django.db import transaction
 from django.utils import timezone
 from django.dispatch import receiver
-from django.db.models.signals import pre_save, post_save, post_delete
+from django.db.models import F, Model
+from django.db.models.signals import pre_save, post_save, pre_delete, m2m_changed, post_delete
 
+from .roles import invalidate_role_permission_maps
 from .models import User, UserPreference
-from .models.general import Image, Saksdokument
+from .search import SEARCH_INDEXES, update_search_vectors
+from .caching import tagged_models, regions_tagged_with
+from .models.role import Role, UserOrgRole, UserGangRole, UserGangSectionRole
+from .models.event import Event, EventGroup
+from .models.general import Tag, Image, Saksdokument
+from .infopages.models import InformationPage
 from .models.recruitment import Recruitment, RecruitmentStatistics, RecruitmentApplication, RecruitmentPositionStat
-from .models.model_choices import RecruitmentStatusChoices
+from .recruitment.statistics import mark_stale
+from .recruitment.transitions import status_reset, applications_changed
 
 
 @receiver(post_save, sender=User)
@@ -31,6 +41,81 @@ def delete_saksdokument(sender: Saksdokument, instance: Saksdokument, **kwargs:
     instance.schedule_file_cleanup(instance.file.name)
 
 
+# Search vectors, see samfundet.search. Info pages get a new revision through a queryset update, so
+# samfundet.infopages.services rebuilds their vector itself.
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Image)
+@receiver(post_save, sender=InformationPage)
+@receiver(post_save, sender=User)
+def update_search_vector(sender: type[Model], instance: Model, *, update_fields: frozenset[str] | None, **kwargs: Any) -> None:
+    """Skipped when only fields outside the vector were saved, like User.last_login on every login."""
+    if update_fields is None or not update_fields.isdisjoint(SEARCH_INDEXES[sender._meta.label].fields):
+        update_search_vectors(sender, pks=[instance.pk])
+
+
+@receiver(post_save, sender=EventGroup)
+def event_group_search_vectors(sender: EventGroup, instance: EventGroup, **kwargs: Any) -> None:
+    update_search_vectors(Event, pks=instance.event_set.values('pk'))
+
+
+@receiver(m2m_changed, sender=Image.tags.through)
+def image_tags_search_vectors(sender: type, instance: Image | Tag, *, action: str, reverse: bool, pk_set: set[int] | None, **kwargs: Any) -> None:
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        pks = pk_set if pk_set is not None else getattr(instance, '_tagged_image_pks', [])
+        update_search_vectors(Image, pks=pks if reverse else [instance.pk])
+
+
+@receiver(m2m_changed, sender=Image.tags.through)
+def remember_cleared_images(sender: type, instance: Image | Tag, *, action: str, reverse: bool, **kwargs: Any) -> None:
+    """Clearing from the tag's side (tag.images.clear()) gives no pk_set, so the tagged images are looked up before"""
+    if action == 'pre_clear' and reverse:
+        instance._tagged_image_pks = list(instance.images.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Tag)
+def tag_search_vectors(sender: Tag, instance: Tag, **kwargs: Any) -> None:
+    update_search_vectors(Image, pks=instance.images.values('pk'))
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tagged_images(sender: Tag, instance: Tag, **kwargs: Any) -> None:
+    """The tagged images are unknown once the tag is deleted, so they are looked up before"""
+    instance._tagged_image_pks = list(instance.images.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def deleted_tag_search_vectors(sender: Tag, instance: Tag, **kwargs: Any) -> None:
+    update_search_vectors(Image, pks=getattr(instance, '_tagged_image_pks', []))
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(m2m_changed, sender=Role.permissions.through)
+@receiver(post_save, sender=UserOrgRole)
+@receiver(post_delete, sender=UserOrgRole)
+@receiver(post_save, sender=UserGangRole)
+@receiver(post_delete, sender=UserGangRole)
+@receiver(post_save, sender=UserGangSectionRole)
+@receiver(post_delete, sender=UserGangSectionRole)
+def role_changed(sender: type, **kwargs: Any) -> None:
+    """Roles are kept in memory for permission checks, see samfundet.roles.get_role_permission_map"""
+    invalidate_role_permission_maps()
+
+
+def invalidate_cached_regions(sender: type, **kwargs: Any) -> None:
+    """Expires the cached regions built from the saved or deleted model, see samfundet.caching"""
+    for region in regions_tagged_with(sender):
+        region.invalidate()
+        # Once more after commit, in case a concurrent request cached the old rows in the meantime
+        transaction.on_commit(region.invalidate)
+
+
+# Queryset updates and bulk operations send no signals, their callers must invalidate the region themselves
+for tagged_model in tagged_models():
+    post_save.connect(invalidate_cached_regions, sender=tagged_model)
+    post_delete.connect(invalidate_cached_regions, sender=tagged_model)
+
+
 @receiver(post_save, sender=Recruitment)
 def create_recruitment_statistics(sender: Recruitment, instance: Recruitment, *, created: bool, **kwargs: Any) -> None:
     """Ensures stats are created when an recruitment is created"""
@@ -39,9 +124,17 @@ def create_recruitment_statistics(sender: Recruitment, instance: Recruitment, *,
 
 
 @receiver(post_save, sender=RecruitmentApplication)
-def application_created(sender: RecruitmentApplication, instance: RecruitmentApplication, *, created: bool, **kwargs: Any) -> None:
-    if created:
-        instance.recruitment.update_stats()
+def application_update_statistics(sender: RecruitmentApplication, instance: RecruitmentApplication, *, created: bool, **kwargs: Any) -> None:
+    """Marks the recruitment statistics stale once the save is committed. The refresh_recruitment_stats worker recounts them."""
+    # After commit, so the request never holds a lock on the statistics row
+    transaction.on_commit(partial(mark_stale, recruitment_id=instance.recruitment_id))
+
+
+@receiver(applications_changed, sender=RecruitmentApplication)
+def applications_changed_update_statistics(sender: RecruitmentApplication, applications: list[RecruitmentApplication], **kwargs: Any) -> None:
+    """application_update_statistics for applications written in bulk. Sent after commit already."""
+    for recruitment_id in {application.recruitment_id for application in applications}:
+        mark_stale(recruitment_id=recruitment_id)
 
 
 @receiver(post_save, sender=RecruitmentApplication)
@@ -61,37 +154,24 @@ def application_interview_set(sender: RecruitmentApplication, instance: Recruitm
 
 
 @receiver(pre_save, sender=RecruitmentApplication)
-def application_applicant_rejected_or_accepted(sender: RecruitmentApplication, instance: RecruitmentApplication, **kwargs: Any) -> None:  # noqa C901
-    """Whenever an applicant is contacted, set all other applications to automatic rejection"""
+def application_applicant_rejected_or_accepted(sender: RecruitmentApplication, instance: RecruitmentApplication, **kwargs: Any) -> None:
+    """
+    Whenever an applicant is contacted, set all other applications to automatic rejection, and back when the call is undone.
+    The other applications are updated in one query, see samfundet.recruitment.transitions.status_reset.
+    """
 
     obj = RecruitmentApplication.objects.filter(pk=instance.pk).first()
     if not obj:
         return
-    # Check if Status is set to called
-    if obj.recruiter_status != instance.recruiter_status:
-        # Check if Status is changed to called, then set all unset to AUTOMATIC_REJECTION
-        if instance.recruiter_status in [
-            RecruitmentStatusChoices.CALLED_AND_ACCEPTED,
-            RecruitmentStatusChoices.CALLED_AND_REJECTED,
-        ]:
-            # Set all others to Automatic rejection
-            for other_application in RecruitmentApplication.objects.filter(
-                recruitment=obj.recruitment, user=obj.user, recruiter_status=RecruitmentStatusChoices.NOT_SET
-            ).exclude(id=obj.id):
-                other_application.recruiter_status = RecruitmentStatusChoices.AUTOMATIC_REJECTION
-                other_application.save()
-
-        # Check if status is reverted from called, this will set all all AUTOMATIC_REJECTION back
-        elif obj.recruiter_status in [
-            RecruitmentStatusChoices.CALLED_AND_ACCEPTED,
-            RecruitmentStatusChoices.CALLED_AND_REJECTED,
-        ]:
-            # Set all others to Automatic rejection
-            for other_application in RecruitmentApplication.objects.filter(
-                recruitment=obj.recruitment, user=obj.user, recruiter_status=RecruitmentStatusChoices.AUTOMATIC_REJECTION
-            ).exclude(id=obj.id):
-                other_application.recruiter_status = RecruitmentStatusChoices.NOT_SET
-                other_application.save()
+    reset = status_reset(previous=obj.recruiter_status, status=instance.recruiter_status)
+    if reset is None:
+        return
+    reset_from, reset_to = reset
+    RecruitmentApplication.objects.filter(recruitment=obj.recruitment, user=obj.user, recruiter_status=reset_from).exclude(id=obj.id).update(
+        recruiter_status=reset_to,
+        version=F('version') + 1,
+        updated_at=timezone.now(),
+    )
 
 
 @receiver(pre_save, sender=RecruitmentApplication)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from rest_framework import status
+
+from django.test import AsyncClient
+from django.urls import reverse
+from django.utils import timezone
+from django.core.handlers.asgi import ASGIHandler
+
+from root.utils import routes
+from root.constants import WebFeatures
+from root.custom_classes.async_views import AsyncReadOnlyView
+
+from samfundet.models.event import Event
+from samfundet.models.recruitment import Recruitment
+
+if TYPE_CHECKING:
+    from rest_framework.test import APIClient
+
+    from samfundet.models.general import User
+
+
+def starts_soon(event: Event) -> None:
+    event.start_dt = timezone.now() + timezone.timedelta(minutes=30)
+    event.save()
+
+
+def test_middleware_runs_without_thread_hops(caplog: pytest.LogCaptureFixture):
+    with caplog.at_level(logging.DEBUG, logger='django.request'):
+        ASGIHandler().load_middleware(is_async=True)
+
+    assert not [record.message for record in caplog.records if 'adapted' in record.message]
+
+
+def test_served_through_asgi(fixture_event: Event):
+    starts_soon(fixture_event)
+    response = async_to_sync(AsyncClient().get)(reverse(routes.samfundet__eventsperday))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()
+
+
+def test_data_is_required():
+    with pytest.raises(TypeError, match='Incomplete must implement data'):
+
+        class Incomplete(AsyncReadOnlyView):
+            pass
+
+
+class TestEventViews:
+    def test_events_per_day(self, fixture_rest_client: APIClient, fixture_event: Event):
+        starts_soon(fixture_event)
+
+        data = fixture_rest_client.get(reverse(routes.samfundet__eventsperday)).json()
+
+        day = fixture_event.start_dt.strftime('%Y-%m-%d')
+        assert list(data) == [day]
+        assert [event['id'] for event in data[day]] == [fixture_event.id]
+
+    def test_upcoming_events(self, fixture_rest_client: APIClient, fixture_event: Event):
+        url = reverse(routes.samfundet__eventsupcomming)
+        starts_soon(fixture_event)
+
+        data = fixture_rest_client.get(url, {'search': 'test'}).json()
+
+        assert data['count'] == 1
+        assert data['results'][0]['id'] == fixture_event.id
+        assert {'categories', 'locations', 'ticket_types', 'next', 'previous', 'total_pages'} <= set(data)
+        assert fixture_rest_client.get(url, {'search': 'nothing like it'}).json()['count'] == 0
+        assert fixture_rest_client.get(url, {'page': 5}).status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestActiveRecruitmentsView:
+    def test_lists_active_recruitments(self, fixture_rest_client: APIClient, fixture_recruitment: Recruitment, settings):
+        settings.CP_ENABLED = {WebFeatures.RECRUITMENT}
+
+        data = fixture_rest_client.get(reverse(routes.samfundet__active_recruitments)).json()
+
+        assert [recruitment['id'] for recruitment in data] == [fixture_recruitment.id]
+        assert data[0]['organization']['id'] == fixture_recruitment.organization_id
+
+    def test_feature_disabled(self, fixture_rest_client: APIClient, fixture_recruitment: Recruitment, settings):
+        settings.CP_ENABLED = set()
+
+        response = fixture_rest_client.get(reverse(routes.samfundet__active_recruitments))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_permissions_unchanged(self, fixture_rest_client: APIClient, fixture_user: User, fixture_recruitment: Recruitment, settings):
+        # Like DjangoModelPermissionsOrAnonReadOnly on the ListAPIView it replaced: anyone may read, nobody may write
+        settings.CP_ENABLED = {WebFeatures.RECRUITMENT}
+        url = reverse(routes.samfundet__active_recruitments)
+
+        assert fixture_rest_client.get(url).status_code == status.HTTP_200_OK
+        fixture_rest_client.force_authenticate(fixture_user)
+        assert fixture_rest_client.get(url).status_code == status.HTTP_200_OK
+        assert fixture_rest_client.post(url, {}).status_code == status.HTTP_405_METHOD_NOT_ALLOWED
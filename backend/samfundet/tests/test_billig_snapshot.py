@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from io import StringIO
+from collections.abc import Iterator
+
+import pytest
+
+from django.db import OperationalError, connections
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+
+from root.management.commands import sync_billig
+
+from samfundet.billig import snapshot
+from samfundet.serializers import EventSerializer
+from samfundet.models.event import Event, BilligEventSnapshot
+from samfundet.models.billig import BilligEvent, BilligPriceGroup, BilligTicketGroup
+
+pytestmark = pytest.mark.django_db(databases=['default', 'billig'])
+
+
+class WorkerStoppedError(Exception):
+    pass
+
+
+@pytest.fixture
+def ticket_group(fixture_billig_event: BilligEvent) -> Iterator[BilligTicketGroup]:
+    group = BilligTicketGroup.objects.create(id=1, name='Concert', event=fixture_billig_event, num=10, num_sold=9)
+    price = BilligPriceGroup.objects.create(id=1, name='Member', ticket_group=group, can_be_put_on_card=True, membership_needed=True, netsale=True, price=100)
+    yield group
+    price.delete()
+    group.delete()
+
+
+class TestSync:
+    def test_stores_relevant_events(self, fixture_billig_event: BilligEvent, ticket_group: BilligTicketGroup):
+        assert snapshot.sync() == 1
+
+        data = BilligEventSnapshot.objects.get(billig_id=fixture_billig_event.id).data
+        assert data['is_almost_sold_out'] is True
+        assert data['is_sold_out'] is False
+        assert [price['name'] for price in data['ticket_groups'][0]['price_groups']] == ['Member']
+
+    def test_only_changes_are_written(self, fixture_billig_event: BilligEvent, ticket_group: BilligTicketGroup):
+        snapshot.sync()
+        synced_at = BilligEventSnapshot.objects.get().synced_at
+        assert snapshot.sync() == 0
+        assert BilligEventSnapshot.objects.get().synced_at == synced_at
+
+        ticket_group.num_sold = 10
+        ticket_group.save()
+
+        assert snapshot.sync() == 1
+        assert BilligEventSnapshot.objects.get().data['is_sold_out'] is True
+
+    def test_drops_events_no_longer_relevant(self, fixture_billig_event: BilligEvent):
+        snapshot.sync()
+        fixture_billig_event.hidden = True
+        fixture_billig_event.save()
+
+        assert snapshot.sync() == 1
+        assert not BilligEventSnapshot.objects.exists()
+
+    def test_command(self, fixture_billig_event: BilligEvent):
+        out = StringIO()
+        call_command('sync_billig', '--once', stdout=out)
+
+        assert 'Synced 1 billig event(s).' in out.getvalue()
+
+    def test_worker_recovers_from_a_failed_sync(self, fixture_billig_event: BilligEvent, monkeypatch: pytest.MonkeyPatch):
+        syncs: list[int] = []
+        sync = snapshot.sync
+
+        def fails_first() -> int:
+            syncs.append(len(syncs))
+            if len(syncs) == 1:
+                raise OperationalError('server closed the connection unexpectedly')
+            return sync()
+
+        def stop_after_second(seconds: float) -> None:
+            if len(syncs) == 2:
+                raise WorkerStoppedError
+
+        # The real one would close the connection holding the test transaction
+        closed_at: list[int] = []
+        monkeypatch.setattr(sync_billig, 'close_old_connections', lambda: closed_at.append(len(syncs)))
+        monkeypatch.setattr(snapshot, 'sync', fails_first)
+        monkeypatch.setattr(sync_billig.time, 'sleep', stop_after_second)
+        out = StringIO()
+        with pytest.raises(WorkerStoppedError):
+            call_command('sync_billig', stdout=out)
+
+        assert closed_at == [0, 1, 1]
+        assert 'Synced 1 billig event(s).' in out.getvalue()
+        assert BilligEventSnapshot.objects.filter(billig_id=fixture_billig_event.id).exists()
+
+
+class TestServing:
+    def test_events_are_served_without_billig(self, fixture_event_with_billig: tuple[Event, BilligEvent], ticket_group: BilligTicketGroup):
+        event, billig_event = fixture_event_with_billig
+        snapshot.sync()
+
+        with CaptureQueriesContext(connections['billig']) as billig_queries:
+            data = EventSerializer(Event.objects.all(), many=True).data
+
+        assert not billig_queries.captured_queries
+        assert data[0]['billig']['id'] == billig_event.id
+        assert data[0]['billig']['ticket_groups'][0]['is_almost_sold_out'] is True
+
+    def test_not_yet_synced(self, fixture_event_with_billig: tuple[Event, BilligEvent]):
+        event, _ = fixture_event_with_billig
+
+        assert EventSerializer(event).data['billig'] is None
+
+    def test_sale_period_is_current(self, fixture_event_with_billig: tuple[Event, BilligEvent]):
+        event, billig_event = fixture_event_with_billig
+        snapshot.sync()
+        assert EventSerializer(event).data['billig']['in_sale_period'] is True
+
+        # As if the sale ended since the last sync
+        BilligEventSnapshot.objects.filter(billig_id=billig_event.id).update(
+            data={**BilligEventSnapshot.objects.get().data, 'sale_to': (timezone.now() - timezone.timedelta(minutes=1)).isoformat()},
+        )
+
+        assert EventSerializer(Event.objects.get(pk=event.pk)).data['billig']['in_sale_period'] is False
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from io import StringIO
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from django.urls import reverse
+from django.core.management import call_command
+
+from root.utils import routes
+
+from samfundet.caching import HIT, MISS, KEY_VALUES, TEXT_ITEMS, CacheRegion
+from samfundet.models.general import KeyValue, TextItem
+
+
+class TestCacheRegion:
+    def test_value_is_computed_once(self):
+        calls = []
+        region = CacheRegion(name='test', timeout=60, tags=())
+
+        def compute() -> list[int]:
+            calls.append(1)
+            return [len(calls)]
+
+        assert region.get_or_set('a', default=compute) == [1]
+        assert region.get_or_set('a', default=compute) == [1]
+        assert region.get_or_set('b', default=compute) == [2]
+        assert region.stats() == {HIT: 1, MISS: 2}
+
+    def test_falsy_values_are_cached(self):
+        region = CacheRegion(name='test', timeout=60, tags=())
+        region.get_or_set(default=list)
+
+        assert region.get_or_set(default=lambda: ['recomputed']) == []
+
+    def test_invalidate_drops_every_value(self):
+        region = CacheRegion(name='test', timeout=60, tags=())
+        region.get_or_set('a', default=lambda: 'old')
+        region.get_or_set('b', default=lambda: 'old')
+
+        region.invalidate()
+
+        assert region.get_or_set('a', default=lambda: 'new') == 'new'
+        assert region.get_or_set('b', default=lambda: 'new') == 'new'
+
+    def test_saving_a_tagged_model_invalidates(self, fixture_text_item: TextItem):
+        TEXT_ITEMS.get_or_set('list', default=lambda: 'old')
+        KEY_VALUES.get_or_set('list', default=lambda: 'untouched')
+
+        fixture_text_item.text_en = 'Changed'
+        fixture_text_item.save()
+
+        assert TEXT_ITEMS.get_or_set('list', default=lambda: 'new') == 'new'
+        assert KEY_VALUES.get_or_set('list', default=lambda: 'new') == 'untouched'
+
+    def test_stats_command(self):
+        TEXT_ITEMS.get_or_set('list', default=list)
+        TEXT_ITEMS.get_or_set('list', default=list)
+        out = StringIO()
+
+        call_command('cache_stats', '--reset', stdout=out)
+
+        assert 'text-items       hits=1        misses=1        hit rate=50%' in out.getvalue()
+        assert TEXT_ITEMS.stats() == {HIT: 0, MISS: 0}
+
+
+class TestCachedViews:
+    def test_key_value_served_from_cache_until_changed(self, fixture_rest_client: APIClient, django_assert_num_queries):
+        keyvalue = KeyValue.objects.create(key='FOO', value='bar')
+        url = reverse(routes.samfundet__key_value_detail, kwargs={'key': keyvalue.key})
+        assert fixture_rest_client.get(url).data['value'] == 'bar'
+
+        with django_assert_num_queries(0):
+            response = fixture_rest_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['value'] == 'bar'
+
+        keyvalue.value = 'baz'
+        keyvalue.save()
+        assert fixture_rest_client.get(url).data['value'] == 'baz'
+
+    def test_missing_key_is_not_cached(self, fixture_rest_client: APIClient):
+        url = reverse(routes.samfundet__key_value_detail, kwargs={'key': 'FOO'})
+        assert fixture_rest_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+        KeyValue.objects.create(key='FOO', value='bar')
+
+        assert fixture_rest_client.get(url).status_code == status.HTTP_200_OK
+
+    def test_list_with_query_parameters_bypasses_the_cache(self, fixture_rest_client: APIClient):
+        TEXT_ITEMS.reset_stats()
+
+        response = fixture_rest_client.get(reverse(routes.samfundet__text_item_list), {'page': 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert TEXT_ITEMS.stats() == {HIT: 0, MISS: 0}
+
+    def test_homepage_served_from_cache(self, fixture_rest_client: APIClient, django_assert_num_queries):
+        url = reverse(routes.samfundet__home)
+        first = fixture_rest_client.get(url)
+
+        with django_assert_num_queries(0):
+            second = fixture_rest_client.get(url)
+        assert second.json() == first.json()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from django.utils import timezone
+
+from samfundet.homepage import homepage
+from samfundet.models.event import Event
+from samfundet.models.general import Image
+from samfundet.models.model_choices import EventStatus, EventCategory
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+
+@pytest.fixture
+def copy_event(fixture_event: Event) -> Iterator[Callable[..., Event]]:
+    """Saves copies of fixture_event starting `hours` from now."""
+    copies = []
+
+    def copy(*, hours: int, **kwargs: object) -> Event:
+        event = Event.objects.get(pk=fixture_event.pk)
+        event.pk = None
+        event.id = None
+        event._state.adding = True
+        event.start_dt = timezone.now() + timezone.timedelta(hours=hours)
+        event.end_dt = event.start_dt + timezone.timedelta(hours=1)
+        for name, value in kwargs.items():
+            setattr(event, name, value)
+        event.save()
+        copies.append(event)
+        return event
+
+    yield copy
+    for event in copies:
+        event.delete()
+
+
+def titles(events: list[dict]) -> list[str]:
+    return [event['title_en'] for event in events]
+
+
+class TestHomePage:
+    def test_layout(self, fixture_event: Event, copy_event: Callable[..., Event]):
+        for hour in range(1, 12):
+            copy_event(hours=hour, title_en=f'Event {hour}', category=EventCategory.DEBATE if hour % 2 else EventCategory.OTHER)
+        copy_event(hours=2, title_en='Archived', status=EventStatus.ARCHIVED)
+        copy_event(hours=-7, title_en='Over')
+
+        page = homepage.build().payload
+        upcoming, highlight, debates = page['elements']
+
+        assert titles(page['splash']) == ['Test Event', 'Event 1', 'Event 2']
+        assert titles(upcoming['events']) == ['Test Event', *(f'Event {hour}' for hour in range(1, 9))]
+        assert titles(highlight['events']) == ['Event 11']
+        assert titles(debates['events']) == [f'Event {hour}' for hour in range(1, 12, 2)]
+
+    def test_no_events(self):
+        page = homepage.build().payload
+
+        assert page['splash'] == []
+        assert [element['events'] for element in page['elements']] == [[], []]
+
+    def test_queries_do_not_grow_with_events(self, copy_event: Callable[..., Event], django_assert_max_num_queries):
+        for hour in range(1, 20):
+            copy_event(hours=hour)
+
+        # Events, custom tickets, editors, image tags, and billig
+        with django_assert_max_num_queries(5):
+            homepage.build()
+
+    def test_expires_when_the_first_event_drops_out(self, fixture_event: Event, copy_event: Callable[..., Event]):
+        copy_event(hours=3)
+
+        page = homepage.build()
+
+        assert page.expires_at == fixture_event.start_dt + homepage.UPCOMING_GRACE
+
+    def test_cached_until_images_change(self, fixture_event: Event, fixture_image: Image, django_assert_num_queries):
+        first = homepage.cached()
+        with django_assert_num_queries(0):
+            assert homepage.cached() == first
+
+        fixture_image.title = 'Renamed'
+        fixture_image.save()
+
+        assert homepage.cached()['splash'][0]['image']['title'] == 'Renamed'
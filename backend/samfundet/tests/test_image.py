@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import re
-from io import BytesIO
+import json
+import hashlib
+from io import BytesIO, StringIO
 from typing import TYPE_CHECKING, Any
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 from PIL import Image as PilImage
@@ -12,13 +15,20 @@ from rest_framework import status
 from django.conf import settings
 from django.urls import reverse
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.core.files.images import ImageFile
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 from root.utils import routes
+from root.management.commands import generate_image_variants
 
+from samfundet.images import pipeline
 from samfundet.serializers import ImageSerializer
 from samfundet.models.general import Tag, User, Image, Merch
+from samfundet.images.pipeline import generate_pending_variants
+from samfundet.images.variants import ImageVariant, encode_variants
+from samfundet.images.benchmark import ssim
+from samfundet.images.bulk_import import import_images, sources_from_manifest
 
 if TYPE_CHECKING:
     from rest_framework.test import APIClient
@@ -30,6 +40,10 @@ def fixture_tmp_media_root(settings: Any, tmp_path: Any) -> None:
     settings.MEDIA_ROOT = tmp_path
 
 
+class WorkerStoppedError(Exception):
+    pass
+
+
 def make_image_bytes(image_format: str = 'JPEG', size: tuple[int, int] = (1200, 900), *, noise: bool = True, **save_kwargs: Any) -> BytesIO:
     """In-memory image file. Noise compresses poorly, producing files above the variant threshold."""
     pil = PilImage.effect_noise(size, 60).convert('RGB') if noise else PilImage.new('RGB', size, 'red')
@@ -39,10 +53,24 @@ def make_image_bytes(image_format: str = 'JPEG', size: tuple[int, int] = (1200,
     return buffer
 
 
-def make_image(image_format: str = 'JPEG', size: tuple[int, int] = (1200, 900), *, name: str = 'upload.bin', **save_kwargs: Any) -> Image:
+def generate_queued_variants() -> None:
+    # The worker command encodes on a process pool, see TestVariantQueue.test_worker_command
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        generate_pending_variants(executor=executor, batch_size=100)
+
+
+def upload(image_format: str = 'JPEG', size: tuple[int, int] = (1200, 900), *, name: str = 'upload.bin', **save_kwargs: Any) -> Image:
     return Image.objects.create(title='test', image=ImageFile(make_image_bytes(image_format, size, **save_kwargs), name=name))
 
 
+def make_image(image_format: str = 'JPEG', size: tuple[int, int] = (1200, 900), *, name: str = 'upload.bin', **save_kwargs: Any) -> Image:
+    """An uploaded image, after the worker has generated its variants."""
+    image = upload(image_format, size, name=name, **save_kwargs)
+    generate_queued_variants()
+    image.refresh_from_db()
+    return image
+
+
 def file_exists(name: str) -> bool:
     return (settings.MEDIA_ROOT / name).exists()
 
@@ -107,7 +135,10 @@ class TestVariantSkipping:
         frames[0].save(buffer, 'GIF', save_all=True, append_images=frames[1:])
         buffer.seek(0)
         image = Image.objects.create(title='test', image=ImageFile(buffer, name='a.gif'))
+        generate_queued_variants()
+        image.refresh_from_db()
 
+        assert image.variants_pending_since is None
         assert image.image.size > Image.VARIANT_SIZE_THRESHOLD  # skipped due to animation, not size
         assert not any(getattr(image, f'image_{name}') for name in Image.VARIANTS)
 
@@ -125,6 +156,191 @@ class TestVariantSkipping:
             assert image.urls[variant_name] == getattr(image, f'image_{variant_name}').url
 
 
+class TestVariantQueue:
+    def test_upload_leaves_variants_to_the_worker(self):
+        image = upload()
+
+        assert image.variants_pending_since
+        assert not any(getattr(image, f'image_{name}') for name in Image.VARIANTS)
+        assert all(url == image.image.url for url in image.urls.values())
+
+    def test_small_original_is_not_queued(self):
+        assert upload(noise=False).variants_pending_since is None
+
+    def test_worker_command(self):
+        image = upload()
+
+        call_command('generate_image_variants', '--once', '--workers', '2', stdout=StringIO())
+
+        image.refresh_from_db()
+        assert image.variants_pending_since is None
+        assert all(getattr(image, f'image_{name}') for name in Image.VARIANTS)
+
+    def test_worker_recycles_connections_when_idle(self, monkeypatch: pytest.MonkeyPatch):
+        sleeps: list[float] = []
+
+        def stop_on_second_sleep(seconds: float) -> None:
+            sleeps.append(seconds)
+            if len(sleeps) == 2:
+                raise WorkerStoppedError
+
+        # The real one would close the connection holding the test transaction
+        closed_at: list[int] = []
+        monkeypatch.setattr(generate_image_variants, 'close_old_connections', lambda: closed_at.append(len(sleeps)))
+        monkeypatch.setattr(generate_image_variants.time, 'sleep', stop_on_second_sleep)
+        with pytest.raises(WorkerStoppedError):
+            call_command('generate_image_variants', '--workers', '1', stdout=StringIO())
+
+        assert closed_at == [1]
+
+    def test_force_regenerates_and_deletes_old_variants(self, django_capture_on_commit_callbacks):
+        image = make_image()
+        old_names = [getattr(image, f'image_{name}').name for name in Image.VARIANTS]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            call_command('generate_image_variants', '--once', '--force', '--workers', '1', stdout=StringIO())
+
+        image.refresh_from_db()
+        new_names = [getattr(image, f'image_{name}').name for name in Image.VARIANTS]
+        assert set(new_names).isdisjoint(old_names)
+        assert all(file_exists(name) for name in new_names)
+        assert not any(file_exists(name) for name in old_names)
+
+    def test_unreadable_original_is_dequeued(self):
+        missing = upload()
+        missing.image.storage.delete(missing.image.name)
+        image = upload()
+
+        generate_queued_variants()
+
+        missing.refresh_from_db()
+        image.refresh_from_db()
+        assert missing.variants_pending_since is None
+        assert all(url == missing.image.url for url in missing.urls.values())
+        assert image.variants_pending_since is None
+        assert all(getattr(image, f'image_{name}') for name in Image.VARIANTS)
+
+    def test_variants_of_a_replaced_file_are_dropped(self):
+        image = upload()
+        # Replaced while the worker was encoding the first file
+        replacement = Image.objects.get(pk=image.pk)
+        replacement.image = ImageFile(make_image_bytes(), name='replacement.jpg')
+        replacement.save()
+
+        assert not pipeline._store(image=image, pending_since=image.variants_pending_since, encoded={})
+        replacement.refresh_from_db()
+        assert replacement.variants_pending_since
+
+
+class TestVariantDecoding:
+    THUMBNAIL = {'thumbnail': ImageVariant(max_size=300, quality=80, max_aspect=4.0, lossless=False)}
+
+    def test_jpeg_is_decoded_at_reduced_scale(self):
+        data = make_image_bytes(size=(2400, 1600)).getvalue()
+
+        # 1/8 scale is 300x200
+        encoded = encode_variants(data, self.THUMBNAIL, max_pixels=300 * 200)
+
+        assert PilImage.open(BytesIO(encoded['thumbnail'])).size == (300, 200)
+
+    def test_pixel_budget(self):
+        data = make_image_bytes('PNG', size=(2400, 1600)).getvalue()
+
+        with pytest.raises(PilImage.DecompressionBombError):
+            encode_variants(data, self.THUMBNAIL, max_pixels=300 * 200)
+
+    def test_orientation_is_applied(self):
+        exif = PilImage.Exif()
+        exif[Image.ORIENTATION_EXIF_TAG] = 6  # rotate 90
+        data = make_image_bytes(size=(3000, 600), exif=exif).getvalue()
+
+        encoded = encode_variants(data, self.THUMBNAIL)
+
+        # Cropped to 4:1 and rotated
+        assert PilImage.open(BytesIO(encoded['thumbnail'])).size == (75, 300)
+
+
+class TestBulkImport:
+    def test_directory(self, tmp_path: Any):
+        photo = make_image_bytes().getvalue()
+        already_uploaded = make_image_bytes().getvalue()
+        Image.objects.create(title='test', image=ImageFile(BytesIO(already_uploaded), name='x.jpg'))
+        # Not tmp_path itself, it is the media root
+        archive = tmp_path / 'archive'
+        (archive / 'nested').mkdir(parents=True)
+        (archive / 'photo.jpg').write_bytes(photo)
+        (archive / 'nested' / 'same photo.jpg').write_bytes(photo)
+        (archive / 'uploaded.jpg').write_bytes(already_uploaded)
+        (archive / 'notes.txt').write_text('not an image')
+        stdout = StringIO()
+
+        call_command('import_images', str(archive), '--tag', 'archive', '--workers', '1', stdout=stdout)
+
+        assert 'Imported 1 image(s), skipped 2 duplicate(s), 1 failed.' in stdout.getvalue()
+        image = Image.objects.get(title__in=['photo', 'same photo'])
+        assert image.content_hash == hashlib.sha256(photo).hexdigest()
+        assert image.variants_pending_since is None
+        assert all(file_exists(getattr(image, field).name) for field in Image.FILE_FIELDS)
+        assert [tag.name for tag in image.tags.all()] == ['archive']
+
+    def test_manifest(self, tmp_path: Any):
+        exif = PilImage.Exif()
+        exif[0x010F] = 'Apple'  # Make
+        (tmp_path / 'poster.png').write_bytes(make_image_bytes('PNG', noise=False).getvalue())
+        (tmp_path / 'photo.jpg').write_bytes(make_image_bytes(exif=exif).getvalue())
+        (tmp_path / 'manifest.csv').write_text('path,title,tags\nposter.png,Poster,"concert, Stage"\nphoto.jpg,,stage\nmissing.jpg,Missing,\n')
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            result = import_images(sources_from_manifest(tmp_path / 'manifest.csv'), executor=executor, io_workers=2, batch_size=1)
+
+        assert (result.imported, result.duplicates, result.failed) == (2, 0, 1)
+        poster = Image.objects.get(title='Poster')
+        assert poster.image.name.endswith('.png')
+        assert not poster.image_small  # too small for variants
+        assert sorted(tag.name for tag in poster.tags.all()) == ['Stage', 'concert']
+        photo = Image.objects.get(title='photo')
+        assert [tag.name for tag in photo.tags.all()] == ['Stage']
+        with photo.image.open() as file:
+            assert dict(PilImage.open(BytesIO(file.read())).getexif()) == {}
+
+    def test_uploads_record_their_hash(self):
+        data = make_image_bytes().getvalue()
+
+        image = Image.objects.create(title='test', image=ImageFile(BytesIO(data), name='x.jpg'))
+
+        assert image.content_hash == hashlib.sha256(data).hexdigest()
+
+
+class TestBenchmark:
+    def test_ssim(self):
+        original = PilImage.effect_noise((256, 256), 60).convert('RGB')
+
+        def encoded(quality: int) -> PilImage.Image:
+            buffer = BytesIO()
+            original.save(buffer, 'WEBP', quality=quality)
+            return PilImage.open(buffer)
+
+        assert ssim(original, original) == pytest.approx(1)
+        assert ssim(original, encoded(5)) < ssim(original, encoded(90)) < 1
+
+    def test_command(self, tmp_path: Any):
+        (tmp_path / 'photo.jpg').write_bytes(make_image_bytes(size=(1600, 1200)).getvalue())
+        (tmp_path / 'notes.txt').write_text('not an image')
+        stdout = StringIO()
+
+        call_command('benchmark_image_variants', str(tmp_path), '--quality', '60', '--repeat', '1', '--json', stdout=stdout)
+
+        measurements = json.loads(stdout.getvalue())['measurements']
+        assert [(m['image'], m['profile']) for m in measurements] == [
+            (str(tmp_path / 'photo.jpg'), 'current'),
+            (str(tmp_path / 'photo.jpg'), 'quality=60 lanczos'),
+        ]
+        current, lower = ({v['name']: v for v in m['variants']} for m in measurements)
+        assert set(current) == set(Image.VARIANTS)
+        assert lower['large']['bytes'] < current['large']['bytes']
+        assert lower['large']['ssim'] < current['large']['ssim'] <= 1
+
+
 class TestMetadataStripping:
     def test_exif_is_stripped_from_original(self):
         exif = PilImage.Exif()
@@ -162,6 +378,8 @@ class TestFileLifecycle:
         with django_capture_on_commit_callbacks(execute=True):
             image.image = ImageFile(make_image_bytes(), name='replacement.jpg')
             image.save()
+            generate_queued_variants()
+        image.refresh_from_db()
 
         new_names = [getattr(image, field).name for field in Image.FILE_FIELDS]
         assert set(new_names).isdisjoint(old_names)
@@ -206,7 +424,7 @@ class TestImageSerializer:
         image = serializer.save()
 
         assert set(serializer.data['urls']) == {'original', *Image.VARIANTS}
-        assert image.image_small
+        assert image.variants_pending_since
 
 
 class TestImageSerializerUpdate:
@@ -262,6 +480,8 @@ class TestImageSerializerUpdate:
             serializer = ImageSerializer(image, data={'file': file}, partial=True)
             assert serializer.is_valid(), serializer.errors
             serializer.save()
+            generate_queued_variants()
+        image.refresh_from_db()
 
         new_names = [getattr(image, field).name for field in Image.FILE_FIELDS]
         assert set(new_names).isdisjoint(old_names)
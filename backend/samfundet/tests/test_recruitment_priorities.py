@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from django.db import connection
+from django.test import RequestFactory
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+
+from root.constants import request_contextvar
+
+from samfundet.conftest import apply_to_position
+from samfundet.models.general import User
+from samfundet.models.recruitment import Interview, RecruitmentPosition, RecruitmentStatistics, RecruitmentApplication
+from samfundet.recruitment.priorities import move_application, active_applications, organize_priorities
+
+if TYPE_CHECKING:
+    import uuid
+
+
+def ranking(user: User, position: RecruitmentPosition) -> list[tuple[uuid.UUID, int]]:
+    return [(application.id, application.applicant_priority) for application in active_applications(recruitment_id=position.recruitment_id, user_id=user.id)]
+
+
+def count_move_queries(application: RecruitmentApplication, direction: int) -> int:
+    with CaptureQueriesContext(connection) as queries:
+        move_application(application=application, direction=direction)
+    return len(queries)
+
+
+class TestMoveApplication:
+    def test_moves_and_renumbers(self, fixture_user: User, fixture_recruitment_position: RecruitmentPosition):
+        first, second, third, fourth = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=4)
+
+        assert move_application(application=fourth, direction=2) == 3
+
+        assert fourth.applicant_priority == 2
+        assert ranking(fixture_user, fixture_recruitment_position) == [(first.id, 1), (fourth.id, 2), (second.id, 3), (third.id, 4)]
+
+    def test_stops_at_the_ends(self, fixture_user: User, fixture_recruitment_position: RecruitmentPosition):
+        first, second = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=2)
+
+        assert move_application(application=first, direction=5) == 0
+        move_application(application=first, direction=-5)
+
+        assert ranking(fixture_user, fixture_recruitment_position) == [(second.id, 1), (first.id, 2)]
+
+    def test_queries_do_not_grow_with_applications(self, fixture_user: User, fixture_user2: User, fixture_recruitment_position: RecruitmentPosition):
+        few = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=2)
+        many = apply_to_position(user=fixture_user2, position=fixture_recruitment_position, count=6)
+
+        assert count_move_queries(few[-1], direction=1) == count_move_queries(many[-1], direction=5)
+
+    def test_records_who_moved(self, fixture_user: User, fixture_user2: User, fixture_recruitment_position: RecruitmentPosition):
+        first, second = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=2)
+        request = RequestFactory().put('/')
+        request.user = fixture_user2
+        token = request_contextvar.set(request)
+        try:
+            move_application(application=second, direction=1)
+        finally:
+            request_contextvar.reset(token)
+
+        assert second.updated_by == fixture_user2
+        assert {application.updated_by for application in RecruitmentApplication.objects.filter(id__in=[first.id, second.id])} == {fixture_user2}
+
+    def test_counts_repriorizations_after_interview(self, fixture_user: User, fixture_recruitment_position: RecruitmentPosition):
+        first, second, third = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=3)
+        interview = Interview.objects.create(interview_time=timezone.now() - timezone.timedelta(hours=1), interview_location='Lyche')
+        RecruitmentApplication.objects.filter(id__in=[first.id, second.id]).update(interview=interview)
+
+        move_application(application=third, direction=2)
+
+        position_stats = RecruitmentStatistics.objects.get(recruitment=fixture_recruitment_position.recruitment).position_stats
+        assert position_stats.get(recruitment_position=first.recruitment_position).repriorization_value == -1
+        assert position_stats.get(recruitment_position=second.recruitment_position).repriorization_value == -1
+        assert not position_stats.filter(recruitment_position=third.recruitment_position, repriorization_count__gt=0).exists()
+
+
+class TestOrganizePriorities:
+    def test_closes_gaps(self, fixture_user: User, fixture_recruitment_position: RecruitmentPosition):
+        first, second, third = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=3)
+        RecruitmentApplication.objects.filter(id=first.id).update(withdrawn=True, applicant_priority=None)
+
+        assert organize_priorities(recruitment_id=fixture_recruitment_position.recruitment_id, user_id=fixture_user.id) == 2
+
+        assert ranking(fixture_user, fixture_recruitment_position) == [(second.id, 1), (third.id, 2)]
+        assert RecruitmentApplication.objects.get(id=second.id).version == second.version + 1
+
+    def test_new_application_is_ranked_last(
+        self, fixture_user: User, fixture_recruitment_position: RecruitmentPosition, fixture_recruitment_position2: RecruitmentPosition
+    ):
+        first, second = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=2)
+        RecruitmentApplication.objects.filter(id=first.id).update(applicant_priority=4)
+        RecruitmentApplication.objects.filter(id=second.id).update(applicant_priority=7)
+
+        (third,) = apply_to_position(user=fixture_user, position=fixture_recruitment_position2)
+
+        assert ranking(fixture_user, fixture_recruitment_position) == [(first.id, 1), (second.id, 2), (third.id, 3)]
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import datetime
+from io import StringIO
+
+import pytest
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from django.db import OperationalError, connection
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+
+from root.utils import routes
+from root.constants import WebFeatures
+from root.management.commands import refresh_recruitment_stats
+
+from samfundet.models.general import User, Campus
+from samfundet.models.recruitment import (
+    Recruitment,
+    RecruitmentDateStat,
+    RecruitmentGangStat,
+    RecruitmentPosition,
+    RecruitmentTimeStat,
+    RecruitmentCampusStat,
+    RecruitmentStatistics,
+    RecruitmentApplication,
+)
+from samfundet.models.model_choices import RecruitmentStatusChoices
+from samfundet.recruitment.statistics import refresh_stale_statistics
+
+
+class WorkerStoppedError(Exception):
+    pass
+
+
+COUNTER_MODELS = (RecruitmentStatistics, RecruitmentTimeStat, RecruitmentDateStat, RecruitmentCampusStat, RecruitmentGangStat)
+
+
+def apply(*, user: User, position: RecruitmentPosition) -> RecruitmentApplication:
+    return RecruitmentApplication.objects.create(
+        user=user,
+        recruitment_position=position,
+        recruitment=position.recruitment,
+        application_text='I have applied',
+    )
+
+
+def refresh_now() -> int:
+    return refresh_stale_statistics(delay=datetime.timedelta(0))
+
+
+class TestDeferredStatistics:
+    def test_saving_an_application_only_marks_the_statistics_stale(
+        self,
+        fixture_user: User,
+        fixture_recruitment_position: RecruitmentPosition,
+        fixture_recruitment: Recruitment,
+        django_capture_on_commit_callbacks,
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            apply(user=fixture_user, position=fixture_recruitment_position)
+
+        stats = RecruitmentStatistics.objects.get(recruitment=fixture_recruitment)
+        assert stats.stale_since is not None
+        assert stats.total_applications == 0
+
+    def test_marks_are_coalesced_into_one_recount(
+        self,
+        fixture_user: User,
+        fixture_user2: User,
+        fixture_recruitment_position: RecruitmentPosition,
+        fixture_recruitment: Recruitment,
+        django_capture_on_commit_callbacks,
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            apply(user=fixture_user, position=fixture_recruitment_position)
+        first_mark = RecruitmentStatistics.objects.get(recruitment=fixture_recruitment).stale_since
+        with django_capture_on_commit_callbacks(execute=True):
+            apply(user=fixture_user2, position=fixture_recruitment_position)
+        assert RecruitmentStatistics.objects.get(recruitment=fixture_recruitment).stale_since == first_mark
+
+        assert refresh_now() == 1
+        assert refresh_now() == 0
+        stats = RecruitmentStatistics.objects.get(recruitment=fixture_recruitment)
+        assert stats.stale_since is None
+        assert stats.refreshed_at is not None
+        assert stats.total_applications == 2
+        assert stats.total_applicants == 2
+
+    def test_recent_marks_are_left_to_settle(self, fixture_user: User, fixture_recruitment_position: RecruitmentPosition, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            apply(user=fixture_user, position=fixture_recruitment_position)
+
+        assert refresh_stale_statistics(delay=datetime.timedelta(minutes=5)) == 0
+        assert refresh_now() == 1
+
+    def test_saving_an_application_does_not_write_statistics(self, fixture_user: User, fixture_recruitment_position: RecruitmentPosition):
+        application = apply(user=fixture_user, position=fixture_recruitment_position)
+        application.withdrawn = True
+
+        with CaptureQueriesContext(connection) as queries:
+            application.save()
+
+        statistics_tables = {model._meta.db_table for model in COUNTER_MODELS}
+        written = [query['sql'] for query in queries.captured_queries if query['sql'].startswith(('UPDATE', 'INSERT'))]
+        assert not [sql for sql in written if any(f'"{table}"' in sql for table in statistics_tables)]
+
+    def test_command_refreshes_once(self, fixture_user: User, fixture_recruitment_position: RecruitmentPosition, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            apply(user=fixture_user, position=fixture_recruitment_position)
+
+        call_command('refresh_recruitment_stats', '--once', '--delay=0', stdout=StringIO())
+
+        assert RecruitmentStatistics.objects.get(recruitment=fixture_recruitment_position.recruitment).total_applications == 1
+
+    def test_worker_recovers_from_a_failed_refresh(
+        self,
+        fixture_user: User,
+        fixture_recruitment_position: RecruitmentPosition,
+        django_capture_on_commit_callbacks,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            apply(user=fixture_user, position=fixture_recruitment_position)
+        refreshes: list[int] = []
+
+        def fails_first(*, delay: datetime.timedelta) -> int:
+            refreshes.append(len(refreshes))
+            if len(refreshes) == 1:
+                raise OperationalError('terminating connection due to administrator command')
+            return refresh_stale_statistics(delay=delay)
+
+        def stop_after_second(seconds: float) -> None:
+            if len(refreshes) == 2:
+                raise WorkerStoppedError
+
+        # The real one would close the connection holding the test transaction
+        closed_at: list[int] = []
+        monkeypatch.setattr(refresh_recruitment_stats, 'close_old_connections', lambda: closed_at.append(len(refreshes)))
+        monkeypatch.setattr(refresh_recruitment_stats, 'refresh_stale_statistics', fails_first)
+        monkeypatch.setattr(refresh_recruitment_stats.time, 'sleep', stop_after_second)
+        with pytest.raises(WorkerStoppedError):
+            call_command('refresh_recruitment_stats', '--delay=0', stdout=StringIO())
+
+        assert closed_at == [0, 1, 1]
+        assert RecruitmentStatistics.objects.get(recruitment=fixture_recruitment_position.recruitment).total_applications == 1
+
+    def test_retrieve_serves_the_snapshot(
+        self,
+        fixture_rest_client: APIClient,
+        fixture_superuser: User,
+        fixture_user: User,
+        fixture_recruitment_position: RecruitmentPosition,
+        fixture_recruitment: Recruitment,
+        settings,
+    ):
+        settings.CP_ENABLED = {*settings.CP_ENABLED, WebFeatures.RECRUITMENT}
+        apply(user=fixture_user, position=fixture_recruitment_position)
+        fixture_rest_client.force_authenticate(user=fixture_superuser)
+
+        url = reverse(routes.samfundet__recruitment_stats_detail, kwargs={'pk': fixture_recruitment.statistics.pk})
+        response = fixture_rest_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['total_applications'] == 0
+
+
+class TestRecount:
+    def test_counts_applications(
+        self, fixture_user: User, fixture_recruitment_position: RecruitmentPosition, fixture_recruitment: Recruitment, fixture_campus: Campus
+    ):
+        application = apply(user=fixture_user, position=fixture_recruitment_position)
+        fixture_recruitment.statistics.save()
+
+        stats = RecruitmentStatistics.objects.get(recruitment=fixture_recruitment)
+        assert stats.total_applications == 1
+        assert stats.total_applicants == 1
+        assert stats.time_stats.get(hour=application.created_at.astimezone(datetime.UTC).hour).count == 1
+        assert stats.campus_stats.get(campus=fixture_campus).count == 1
+        assert stats.gang_stats.get(gang=fixture_recruitment_position.gang).application_count == 1
+
+    def test_second_application_does_not_count_applicant_twice(
+        self,
+        fixture_user: User,
+        fixture_recruitment_position: RecruitmentPosition,
+        fixture_recruitment_position2: RecruitmentPosition,
+        fixture_recruitment: Recruitment,
+    ):
+        apply(user=fixture_user, position=fixture_recruitment_position)
+        apply(user=fixture_user, position=fixture_recruitment_position2)
+        fixture_recruitment.statistics.save()
+
+        stats = RecruitmentStatistics.objects.get(recruitment=fixture_recruitment)
+        assert stats.total_applications == 2
+        assert stats.total_applicants == 1
+        assert stats.average_applications_per_applicant == 2
+
+    def test_withdrawal(
+        self,
+        fixture_user: User,
+        fixture_user2: User,
+        fixture_recruitment_position: RecruitmentPosition,
+        fixture_recruitment: Recruitment,
+    ):
+        application = apply(user=fixture_user, position=fixture_recruitment_position)
+        apply(user=fixture_user2, position=fixture_recruitment_position)
+        application.withdrawn = True
+        application.save()
+        fixture_recruitment.statistics.save()
+
+        stats = RecruitmentStatistics.objects.get(recruitment=fixture_recruitment)
+        assert stats.total_withdrawn == 1
+        assert stats.position_stats.get(recruitment_position=fixture_recruitment_position).withdrawn_rate == 0.5
+
+    def test_accepted_applicant(
+        self,
+        fixture_user: User,
+        fixture_recruitment_position: RecruitmentPosition,
+        fixture_recruitment_position2: RecruitmentPosition,
+        fixture_recruitment: Recruitment,
+    ):
+        accepted = apply(user=fixture_user, position=fixture_recruitment_position)
+        apply(user=fixture_user, position=fixture_recruitment_position2)
+        accepted.recruiter_status = RecruitmentStatusChoices.CALLED_AND_ACCEPTED
+        accepted.save()
+        fixture_recruitment.statistics.save()
+
+        stats = RecruitmentStatistics.objects.get(recruitment=fixture_recruitment)
+        assert stats.total_accepted == 1
+        assert stats.total_rejected == 0
+        assert stats.gang_stats.get(gang=fixture_recruitment_position.gang).total_accepted == 1
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import uuid
+
+import pytest
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from django.db import connection
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import Permission
+
+from root.utils import routes
+
+from samfundet import views
+from samfundet.conftest import apply_to_position
+from samfundet.models.role import Role, UserGangRole
+from samfundet.models.general import Gang, User
+from samfundet.models.recruitment import RecruitmentPosition, RecruitmentStatistics, RecruitmentApplication
+from samfundet.models.model_choices import RecruitmentStatusChoices, RecruitmentApplicantStates, RecruitmentPriorityChoices
+from samfundet.recruitment.transitions import RecruiterChange, applications_changed, apply_recruiter_changes
+
+
+def statuses(applications: list[RecruitmentApplication]) -> list[int]:
+    return [RecruitmentApplication.objects.get(id=application.id).recruiter_status for application in applications]
+
+
+def count_queries(changes: list[RecruiterChange]) -> int:
+    with CaptureQueriesContext(connection) as queries:
+        apply_recruiter_changes(changes)
+    return len(queries)
+
+
+class TestApplyRecruiterChanges:
+    def test_calling_rejects_the_others(self, fixture_user: User, fixture_recruitment_position: RecruitmentPosition):
+        first, second, third = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=3)
+        RecruitmentApplication.objects.filter(id=third.id).update(recruiter_status=RecruitmentStatusChoices.REJECTION)
+
+        changed = apply_recruiter_changes([RecruiterChange(application_id=second.id, recruiter_status=RecruitmentStatusChoices.CALLED_AND_ACCEPTED)])
+
+        assert {application.id for application in changed} == {first.id, second.id}
+        assert statuses([first, second, third]) == [
+            RecruitmentStatusChoices.AUTOMATIC_REJECTION,
+            RecruitmentStatusChoices.CALLED_AND_ACCEPTED,
+            RecruitmentStatusChoices.REJECTION,
+        ]
+        assert RecruitmentApplication.objects.get(id=first.id).version == first.version + 1
+
+    def test_undoing_the_call_restores_the_others(self, fixture_user: User, fixture_recruitment_position: RecruitmentPosition):
+        first, second = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=2)
+        apply_recruiter_changes([RecruiterChange(application_id=second.id, recruiter_status=RecruitmentStatusChoices.CALLED_AND_REJECTED)])
+
+        apply_recruiter_changes([RecruiterChange(application_id=second.id, recruiter_status=RecruitmentStatusChoices.NOT_SET)])
+
+        assert statuses([first, second]) == [RecruitmentStatusChoices.NOT_SET, RecruitmentStatusChoices.NOT_SET]
+
+    def test_applicant_states(self, fixture_user: User, fixture_recruitment_position: RecruitmentPosition):
+        first, second, third = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=3)
+
+        apply_recruiter_changes(
+            [
+                RecruiterChange(application_id=first.id, recruiter_priority=RecruitmentPriorityChoices.WANTED),
+                RecruiterChange(application_id=third.id, recruiter_priority=RecruitmentPriorityChoices.NOT_WANTED),
+            ]
+        )
+
+        assert [RecruitmentApplication.objects.get(id=application.id).applicant_state for application in (first, second, third)] == [
+            RecruitmentApplicantStates.TOP_PRI_WANTED_HERE,
+            RecruitmentApplicantStates.WANTED_ELSEWHERE_UNPROCESSED_HERE,
+            RecruitmentApplicantStates.NOT_WANTED,
+        ]
+
+    def test_queries_do_not_grow_with_applications(self, fixture_user: User, fixture_user2: User, fixture_recruitment_position: RecruitmentPosition):
+        few = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=2)
+        many = apply_to_position(user=fixture_user2, position=fixture_recruitment_position, count=6)
+
+        called = RecruitmentStatusChoices.CALLED_AND_ACCEPTED
+        assert count_queries([RecruiterChange(application_id=few[0].id, recruiter_status=called)]) == count_queries(
+            [RecruiterChange(application_id=many[0].id, recruiter_status=called)]
+        )
+
+    def test_one_event_after_commit(self, fixture_user: User, fixture_recruitment_position: RecruitmentPosition, django_capture_on_commit_callbacks):
+        first, second, third = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=3)
+        RecruitmentStatistics.objects.filter(recruitment=fixture_recruitment_position.recruitment).update(stale_since=None)
+        received = []
+
+        def receiver(applications: list[RecruitmentApplication], **kwargs) -> None:
+            received.append({application.id for application in applications})
+
+        applications_changed.connect(receiver)
+        try:
+            with django_capture_on_commit_callbacks(execute=True):
+                apply_recruiter_changes([RecruiterChange(application_id=first.id, recruiter_status=RecruitmentStatusChoices.CALLED_AND_ACCEPTED)])
+        finally:
+            applications_changed.disconnect(receiver)
+
+        assert received == [{first.id, second.id, third.id}]
+        assert RecruitmentStatistics.objects.get(recruitment=fixture_recruitment_position.recruitment).stale_since is not None
+
+    def test_unknown_application(self, fixture_user: User, fixture_recruitment_position: RecruitmentPosition):
+        (application,) = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=1)
+
+        with pytest.raises(RecruitmentApplication.DoesNotExist):
+            apply_recruiter_changes(
+                [
+                    RecruiterChange(application_id=application.id, recruiter_status=RecruitmentStatusChoices.REJECTION),
+                    RecruiterChange(application_id=uuid.uuid4(), recruiter_status=RecruitmentStatusChoices.REJECTION),
+                ]
+            )
+
+        assert statuses([application]) == [RecruitmentStatusChoices.NOT_SET]
+
+
+class TestBulkUpdateStateView:
+    url = reverse(routes.samfundet__recruitment_application_bulk_update_state)
+
+    def put(self, client: APIClient, user: User, changes: list[dict]):
+        client.force_authenticate(user=user)
+        return client.put(self.url, changes, format='json')
+
+    def test_returns_only_changed_rows(
+        self,
+        fixture_rest_client: APIClient,
+        fixture_superuser: User,
+        fixture_user: User,
+        fixture_user2: User,
+        fixture_recruitment_position: RecruitmentPosition,
+    ):
+        first, second = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=2)
+        (other,) = apply_to_position(user=fixture_user2, position=fixture_recruitment_position, count=1)
+
+        response = self.put(
+            fixture_rest_client,
+            fixture_superuser,
+            [
+                {'application_id': str(first.id), 'recruiter_status': RecruitmentStatusChoices.CALLED_AND_ACCEPTED},
+                {'application_id': str(other.id), 'recruiter_priority': RecruitmentPriorityChoices.RESERVE},
+            ],
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        changed = {row['id']: row for row in response.json()}
+        assert changed.keys() == {str(first.id), str(second.id), str(other.id)}
+        assert changed[str(second.id)]['recruiter_status'] == RecruitmentStatusChoices.AUTOMATIC_REJECTION
+        assert changed[str(other.id)]['version'] == RecruitmentApplication.objects.get(id=other.id).version == other.version + 1
+
+    def test_gang_role_is_allowed(
+        self,
+        fixture_rest_client: APIClient,
+        fixture_user: User,
+        fixture_user2: User,
+        fixture_role: Role,
+        fixture_recruitment_position: RecruitmentPosition,
+    ):
+        (application,) = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=1)
+        fixture_role.permissions.add(Permission.objects.get(codename='change_recruitmentapplication'))
+        UserGangRole.objects.create(user=fixture_user2, role=fixture_role, obj=fixture_recruitment_position.gang)
+
+        response = self.put(
+            fixture_rest_client, fixture_user2, [{'application_id': str(application.id), 'recruiter_status': RecruitmentStatusChoices.REJECTION}]
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert statuses([application]) == [RecruitmentStatusChoices.REJECTION]
+
+    def test_other_gangs_are_left_out_of_the_response(
+        self,
+        fixture_rest_client: APIClient,
+        fixture_user: User,
+        fixture_user2: User,
+        fixture_role: Role,
+        fixture_gang2: Gang,
+        fixture_recruitment_position: RecruitmentPosition,
+    ):
+        application, sibling = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=2)
+        RecruitmentPosition.objects.filter(id=sibling.recruitment_position_id).update(gang=fixture_gang2)
+        fixture_role.permissions.add(Permission.objects.get(codename='change_recruitmentapplication'))
+        UserGangRole.objects.create(user=fixture_user2, role=fixture_role, obj=fixture_recruitment_position.gang)
+
+        response = self.put(
+            fixture_rest_client, fixture_user2, [{'application_id': str(application.id), 'recruiter_status': RecruitmentStatusChoices.CALLED_AND_ACCEPTED}]
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [row['id'] for row in response.json()] == [str(application.id)]
+        assert statuses([sibling]) == [RecruitmentStatusChoices.AUTOMATIC_REJECTION]
+
+    def test_all_or_nothing(self, fixture_rest_client: APIClient, fixture_user: User, fixture_user2: User, fixture_recruitment_position: RecruitmentPosition):
+        (application,) = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=1)
+        change = {'application_id': str(application.id), 'recruiter_status': RecruitmentStatusChoices.REJECTION}
+
+        forbidden = self.put(fixture_rest_client, fixture_user2, [change])
+        duplicated = self.put(fixture_rest_client, fixture_user2, [change, change])
+
+        assert forbidden.status_code == status.HTTP_403_FORBIDDEN
+        assert duplicated.status_code == status.HTTP_400_BAD_REQUEST
+        assert statuses([application]) == [RecruitmentStatusChoices.NOT_SET]
+
+    def test_unknown_application(self, fixture_rest_client: APIClient, fixture_superuser: User):
+        response = self.put(
+            fixture_rest_client, fixture_superuser, [{'application_id': str(uuid.uuid4()), 'recruiter_status': RecruitmentStatusChoices.REJECTION}]
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_deleted_meanwhile(
+        self, fixture_rest_client: APIClient, fixture_superuser: User, fixture_user: User, fixture_recruitment_position: RecruitmentPosition, monkeypatch
+    ):
+        (application,) = apply_to_position(user=fixture_user, position=fixture_recruitment_position, count=1)
+
+        def delete_first(changes: list[RecruiterChange]) -> list[RecruitmentApplication]:
+            RecruitmentApplication.objects.filter(id=application.id).delete()
+            return apply_recruiter_changes(changes)
+
+        monkeypatch.setattr(views, 'apply_recruiter_changes', delete_first)
+        response = self.put(
+            fixture_rest_client, fixture_superuser, [{'application_id': str(application.id), 'recruiter_status': RecruitmentStatusChoices.REJECTION}]
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from datetime import date, time, timedelta
+
+import pytest
+
+from rest_framework import status
+
+from django.urls import reverse
+from django.utils import timezone
+
+from root.utils import routes
+
+from samfundet.models.general import Table, Venue, Reservation
+from samfundet.reservations.availability import Availability
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def reserve(fixture_venue: Venue) -> Iterator[Callable[..., Reservation]]:
+    """Creates reservations at fixture_venue, defaulting to an hour from `start`."""
+    reservations = []
+
+    def create(*, day: date, start: time, end: time | None = None, table: Table | None = None, guest_count: int = 2) -> Reservation:
+        reservation = Reservation.objects.create(
+            venue=fixture_venue,
+            table=table,
+            guest_count=guest_count,
+            reservation_date=day,
+            start_time=start,
+            end_time=end or time(hour=start.hour + 1, minute=start.minute),
+        )
+        reservations.append(reservation)
+        return reservation
+
+    yield create
+    for reservation in reservations:
+        reservation.delete()
+
+
+@pytest.fixture
+def big_table(fixture_venue: Venue) -> Iterator[Table]:
+    table = Table.objects.create(name_nb='big', name_en='big', seating=8, venue=fixture_venue)
+    yield table
+    table.delete()
+
+
+class TestAvailability:
+    def test_smallest_free_table_is_picked(self, fixture_venue: Venue, fixture_table: Table, big_table: Table, reserve: Callable[..., Reservation]):
+        day = date(2023, 12, 25)
+
+        assert reserve(day=day, start=time(10)).table == fixture_table
+        assert reserve(day=day, start=time(10)).table == big_table
+        assert reserve(day=day, start=time(11)).table == fixture_table
+        assert (
+            Availability.load(venue=fixture_venue, start=day).find_table(guest_count=2, reservation_date=day, start_time=time(10, 30), end_time=time(11, 30))
+            is None
+        )
+
+    def test_ending_as_another_starts_clashes(self, fixture_venue: Venue, fixture_table: Table, reserve: Callable[..., Reservation]):
+        day = date(2023, 12, 25)
+        reserve(day=day, start=time(10))
+        availability = Availability.load(venue=fixture_venue, start=day)
+
+        def free(start: time, end: time) -> bool:
+            return availability.is_free(table=fixture_table, reservation_date=day, start_time=start, end_time=end)
+
+        assert not free(time(9), time(10))
+        assert not free(time(10, 55), time(11, 30))
+        assert free(time(11), time(12))
+        assert free(time(8), time(9, 55))
+
+    def test_week_is_loaded_with_two_queries(self, fixture_venue: Venue, fixture_table: Table, reserve: Callable[..., Reservation], django_assert_num_queries):
+        monday = date(2023, 12, 25)
+        for offset in range(7):
+            reserve(day=monday + timedelta(days=offset), start=time(10 + offset))
+
+        with django_assert_num_queries(2):
+            availability = Availability.load(venue=fixture_venue, start=monday, days=7)
+        times = availability.available_times_by_day(guest_count=2)
+
+        assert list(times) == [monday + timedelta(days=offset) for offset in range(7)]
+        # The venue closes at 14 on mondays and tuesdays, and at 20 the rest of the week
+        assert times[monday] == ['08:00', '08:30', '11:00', '11:30', '12:00', '12:30', '13:00']
+        assert '16:00' not in times[monday + timedelta(days=6)]
+        assert '17:00' in times[monday + timedelta(days=6)]
+
+    def test_too_many_guests(self, fixture_venue: Venue, fixture_table: Table):
+        day = date(2023, 12, 25)
+
+        assert Availability.load(venue=fixture_venue, start=day).available_times(guest_count=5, reservation_date=day) == []
+
+    def test_changing_a_reservation_does_not_clash_with_itself(self, fixture_table: Table, reserve: Callable[..., Reservation]):
+        reservation = reserve(day=date(2023, 12, 25), start=time(10))
+        reservation.end_time = time(11, 30)
+
+        reservation.save()
+
+        assert reservation.table == fixture_table
+
+
+class TestAvailabilityView:
+    def test_returns_each_day(self, fixture_rest_client: APIClient, fixture_venue: Venue, fixture_table: Table):
+        start = timezone.now().date() + timedelta(days=1)
+        url = reverse(routes.samfundet__reservation_availability)
+
+        response = fixture_rest_client.get(url, {'venue': fixture_venue.slug, 'guest_count': 2, 'start_date': start.isoformat(), 'days': 3})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.data) == [(start + timedelta(days=offset)).isoformat() for offset in range(3)]
+        assert all('08:00' in times for times in response.data.values())
+
+    def test_rejects_today(self, fixture_rest_client: APIClient, fixture_venue: Venue):
+        url = reverse(routes.samfundet__reservation_availability)
+
+        response = fixture_rest_client.get(url, {'venue': fixture_venue.slug, 'guest_count': 2, 'start_date': timezone.now().date().isoformat()})
+
+        assert response.status_code == status.HTTP_406_NOT_ACCEPTABLE
+
+    def test_rejects_long_ranges(self, fixture_rest_client: APIClient, fixture_venue: Venue):
+        start = timezone.now().date() + timedelta(days=1)
+        url = reverse(routes.samfundet__reservation_availability)
+
+        response = fixture_rest_client.get(url, {'venue': fixture_venue.slug, 'guest_count': 2, 'start_date': start.isoformat(), 'days': 100})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
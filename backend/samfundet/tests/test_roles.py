@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import pytest
+from guardian.shortcuts import assign_perm
 
 from django.contrib.auth.models import Permission, AnonymousUser
 
-from samfundet.roles import get_owner_permission_map
+from root.utils import permissions
+from root.custom_classes.permission_classes import filter_queryset_by_permissions
+
+from samfundet.roles import get_role_permission_map, get_owner_permission_map
 from samfundet.models import Gang, User, GangSection, Organization
 from samfundet.backend import RoleAuthBackend
 from samfundet.models.role import Role, UserOrgRole, UserGangRole, UserGangSectionRole
+from samfundet.models.recruitment import Recruitment, RecruitmentPosition
+
+if TYPE_CHECKING:
+    from django.db.models import QuerySet
 
 
 def test_has_perm_superuser(fixture_superuser: User, fixture_organization: Organization, fixture_org_permission: Permission):
@@ -440,3 +450,134 @@ class TestOwnerPermissionMap:
 
         assert capabilities.gangs == {}
         assert capabilities.sections == {}
+
+
+class TestRolePermissionCache:
+    """RoleAuthBackend loads the user's roles once, and answers every later check from memory."""
+
+    def test_later_checks_do_not_query(
+        self,
+        fixture_user: User,
+        fixture_gang: Gang,
+        gang_in_same_org: Gang,
+        fixture_permissions: tuple[str, ...],
+        django_assert_num_queries,
+    ):
+        grant(fixture_user, Role.objects.create(name='Gang role'), fixture_gang, PERM_B)
+        backend = RoleAuthBackend()
+        assert backend.has_perm(fixture_user, PERM_B, fixture_gang)
+
+        with django_assert_num_queries(0):
+            assert backend.has_perm(fixture_user, PERM_B, fixture_gang)
+            assert not backend.has_perm(fixture_user, PERM_B, gang_in_same_org)
+            assert not backend.has_perm(fixture_user, PERM_C, fixture_gang)
+
+    def test_user_without_roles_does_not_resolve_owners(self, fixture_user: User, fixture_gang: Gang, fixture_permissions: tuple[str, ...]):
+        backend = RoleAuthBackend()
+        assert not backend.has_perm(fixture_user, PERM_B, fixture_gang)
+        assert not get_role_permission_map(user=fixture_user)
+
+    def test_role_changes_invalidate_the_cache(
+        self,
+        fixture_user: User,
+        fixture_gang: Gang,
+        fixture_permissions: tuple[str, ...],
+    ):
+        backend = RoleAuthBackend()
+        role = Role.objects.create(name='Gang role')
+        assert not backend.has_perm(fixture_user, PERM_B, fixture_gang)
+
+        grant(fixture_user, role, fixture_gang, PERM_B)
+        assert backend.has_perm(fixture_user, PERM_B, fixture_gang)
+
+        role.permissions.remove(perm(PERM_B))
+        assert not backend.has_perm(fixture_user, PERM_B, fixture_gang)
+
+        role.permissions.add(perm(PERM_B))
+        assert backend.has_perm(fixture_user, PERM_B, fixture_gang)
+
+        UserGangRole.objects.filter(user=fixture_user).delete()
+        assert not backend.has_perm(fixture_user, PERM_B, fixture_gang)
+
+
+def copy_recruitment(recruitment: Recruitment, **kwargs: object) -> Recruitment:
+    recruitment.pk = None
+    recruitment.id = None
+    recruitment._state.adding = True
+    for name, value in kwargs.items():
+        setattr(recruitment, name, value)
+    recruitment.save()
+    return recruitment
+
+
+class TestPermissionFilter:
+    """filter_queryset_by_permissions must agree with checking has_perm on every object, without loading them."""
+
+    def permitted(self, user: User, queryset: QuerySet, permission: str) -> set[int]:
+        expected = {obj.id for obj in queryset if user.has_perm(permission, obj)}
+        filtered = set(filter_queryset_by_permissions(queryset, user, permission).values_list('id', flat=True))
+        assert filtered == expected
+        return filtered
+
+    def test_org_role(
+        self,
+        fixture_user: User,
+        fixture_recruitment: Recruitment,
+        fixture_organization: Organization,
+        fixture_organization2: Organization,
+    ):
+        other = copy_recruitment(Recruitment.objects.get(pk=fixture_recruitment.pk), organization=fixture_organization2)
+        grant(fixture_user, Role.objects.create(name='Org role'), fixture_organization, permissions.SAMFUNDET_VIEW_RECRUITMENT)
+
+        permitted = self.permitted(fixture_user, Recruitment.objects.all(), permissions.SAMFUNDET_VIEW_RECRUITMENT)
+
+        assert permitted == {fixture_recruitment.id}
+        assert other.id not in permitted
+
+    def test_gang_role(
+        self,
+        fixture_user: User,
+        fixture_recruitment_position: RecruitmentPosition,
+        fixture_recruitment_position2: RecruitmentPosition,
+        gang_in_same_org: Gang,
+    ):
+        fixture_recruitment_position2.gang = gang_in_same_org
+        fixture_recruitment_position2.save()
+        grant(fixture_user, Role.objects.create(name='Gang role'), fixture_recruitment_position.gang, permissions.SAMFUNDET_VIEW_RECRUITMENTPOSITION)
+
+        permitted = self.permitted(fixture_user, RecruitmentPosition.objects.all(), permissions.SAMFUNDET_VIEW_RECRUITMENTPOSITION)
+
+        assert permitted == {fixture_recruitment_position.id}
+
+    def test_object_permission(self, fixture_user: User, fixture_recruitment: Recruitment, fixture_organization2: Organization):
+        copy_recruitment(Recruitment.objects.get(pk=fixture_recruitment.pk), organization=fixture_organization2)
+        assign_perm(permissions.SAMFUNDET_VIEW_RECRUITMENT, fixture_user, fixture_recruitment)
+
+        permitted = self.permitted(fixture_user, Recruitment.objects.all(), permissions.SAMFUNDET_VIEW_RECRUITMENT)
+
+        assert permitted == {fixture_recruitment.id}
+
+    def test_inactive_user(self, fixture_user: User, fixture_recruitment: Recruitment, fixture_organization: Organization):
+        grant(fixture_user, Role.objects.create(name='Org role'), fixture_organization, permissions.SAMFUNDET_VIEW_RECRUITMENT)
+        fixture_user.is_active = False
+        fixture_user.save()
+
+        assert self.permitted(fixture_user, Recruitment.objects.all(), permissions.SAMFUNDET_VIEW_RECRUITMENT) == set()
+
+    def test_queries_do_not_grow_with_rows(
+        self,
+        fixture_user: User,
+        fixture_recruitment: Recruitment,
+        fixture_organization: Organization,
+        django_assert_num_queries,
+    ):
+        grant(fixture_user, Role.objects.create(name='Org role'), fixture_organization, permissions.SAMFUNDET_VIEW_RECRUITMENT)
+        fixture_user = User.objects.get(pk=fixture_user.pk)
+        for _ in range(5):
+            copy_recruitment(Recruitment.objects.get(pk=fixture_recruitment.pk))
+
+        # User and group permissions, one query per role model, and the filtered list itself
+        with django_assert_num_queries(6):
+            permitted = list(filter_queryset_by_permissions(Recruitment.objects.all(), fixture_user, permissions.SAMFUNDET_VIEW_RECRUITMENT))
+
+        assert len(permitted) == 6
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+from rest_framework import status
+
+from django.test import Client
+
+from samfundet.models import Event
+from samfundet.caching import HIT, MISS, EVENT_PAGES
+from samfundet.routing import template
+from samfundet.infopages.models import InformationPage
+from samfundet.routing.metadata import Metadata, inject_metadata
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+INDEX = '<html><head><meta charset="utf-8"><title>Samfundet</title><script src="/app.js"></script></head><body></body></html>'
+
+
+@pytest.fixture
+def index(tmp_path: Path, settings) -> Path:
+    settings.REACT_BUILD_DIR = str(tmp_path)
+    path = tmp_path / 'index.html'
+    path.write_text(INDEX)
+    return path
+
+
+def rewrite(path: Path, html: str) -> None:
+    # Bump the mtime explicitly, writes within the same tick may not change it
+    stat = path.stat()
+    path.write_text(html)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestFrontendTemplate:
+    def test_read_again_only_when_modified(self, index: Path):
+        first = template.frontend_template()
+        assert template.frontend_template() is first
+
+        rewrite(index, '<html><head></head><body>new</body></html>')
+
+        assert template.frontend_template().html == '<html><head></head><body>new</body></html>'
+
+    def test_inject_metadata(self, index: Path):
+        html = inject_metadata(template.frontend_template(), Metadata(title='Event & more', description='Fun'))
+
+        assert html.startswith('<html><head><meta charset="utf-8"><title>Event &amp; more</title><script src="/app.js"></script><meta name="description"')
+        assert html.endswith('<meta name="twitter:description" content="Fun">\n</head><body></body></html>')
+
+    def test_inject_metadata_without_title(self, index: Path):
+        rewrite(index, '<html><head></head><body></body></html>')
+
+        html = inject_metadata(template.frontend_template(), Metadata(title='Event'))
+
+        assert html.startswith('<html><head><title>Event</title><meta property="og:title" content="Event">')
+
+
+class TestReactView:
+    def test_conditional_get(self, index: Path):
+        client = Client()
+        response = client.get('/events/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content.decode() == INDEX
+
+        assert client.get('/events/', HTTP_IF_NONE_MATCH=response['ETag']).status_code == status.HTTP_304_NOT_MODIFIED
+        assert client.get('/events/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code == status.HTTP_304_NOT_MODIFIED
+
+        rewrite(index, INDEX.replace('app.js', 'app2.js'))
+
+        assert client.get('/events/', HTTP_IF_NONE_MATCH=response['ETag']).status_code == status.HTTP_200_OK
+
+    def test_unknown_path_is_404(self, index: Path):
+        response = Client().get('/does/not/exist/')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.content.decode() == INDEX
+
+
+BOT = 'facebookexternalhit/1.1'
+
+
+class TestMetadataViews:
+    def test_bots_get_event_metadata(self, index: Path, fixture_event: Event):
+        response = Client().get(f'/events/{fixture_event.id}/', HTTP_USER_AGENT=BOT)
+        html = response.content.decode()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert '<title>Test Event - Samfundet</title>' in html
+        assert f'<meta property="og:image" content="http://testserver{fixture_event.image.urls["medium"]}">' in html
+        assert f'<meta property="og:url" content="http://testserver/events/{fixture_event.id}/">' in html
+
+    def test_people_get_the_app_without_queries(self, index: Path, fixture_event: Event, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            response = Client().get(f'/events/{fixture_event.id}/', HTTP_USER_AGENT='Mozilla/5.0')
+
+        assert response.content.decode() == INDEX
+
+    def test_cached_until_the_event_changes(self, index: Path, fixture_event: Event, django_assert_num_queries):
+        client = Client()
+        client.get(f'/events/{fixture_event.id}/', HTTP_USER_AGENT=BOT)
+        with django_assert_num_queries(0):
+            client.get(f'/events/{fixture_event.id}/', HTTP_USER_AGENT=BOT)
+
+        fixture_event.title_nb = 'Renamed'
+        fixture_event.save()
+
+        assert '<title>Renamed - Samfundet</title>' in client.get(f'/events/{fixture_event.id}/', HTTP_USER_AGENT=BOT).content.decode()
+
+    def test_missing_event(self, index: Path):
+        client = Client()
+        EVENT_PAGES.reset_stats()
+
+        assert client.get('/events/123456/', HTTP_USER_AGENT=BOT).status_code == status.HTTP_404_NOT_FOUND
+        assert client.get('/events/123456/', HTTP_USER_AGENT=BOT).status_code == status.HTTP_404_NOT_FOUND
+        assert client.get('/events/not-an-id/', HTTP_USER_AGENT=BOT).status_code == status.HTTP_404_NOT_FOUND
+        # Not cached, so every request misses
+        assert EVENT_PAGES.stats() == {HIT: 0, MISS: 3}
+
+    def test_information_page(self, index: Path, fixture_informationpage: InformationPage):
+        page = InformationPage.objects.select_related('current_revision').get(pk=fixture_informationpage.pk)
+
+        response = Client().get(f'/information/{page.slug_field}/', HTTP_USER_AGENT=BOT)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert f'<title>{page.current_revision.title_nb} - Samfundet</title>' in response.content.decode()
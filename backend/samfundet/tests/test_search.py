@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from rest_framework import status
+
+from django.urls import reverse
+from django.core.files.images import ImageFile
+
+from root.utils import routes
+from root.constants import WebFeatures
+
+from samfundet.search import search_query, full_text_search, rebuild_search_vectors
+from samfundet.models.event import Event, EventGroup
+from samfundet.models.general import Tag, User, Image
+from samfundet.infopages.models import InformationPage
+from samfundet.infopages.services import update_information_page
+
+if TYPE_CHECKING:
+    from rest_framework.test import APIClient
+
+    from samfundet.models.general import Gang
+
+
+def titles(text: str) -> list[str]:
+    return [event.title_nb for event in full_text_search(Event.objects.all(), text)]
+
+
+def retitle(event: Event, title_nb: str, title_en: str = 'Event') -> Event:
+    event.title_nb = title_nb
+    event.title_en = title_en
+    event.save()
+    return event
+
+
+class TestSearchQuery:
+    def test_no_words(self):
+        assert search_query(" & | !() ' ") is None
+        assert not full_text_search(Event.objects.all(), '!!')
+
+    def test_operators_are_stripped(self, fixture_event: Event):
+        retitle(fixture_event, 'Jazzkonsert')
+
+        assert titles("jazz:* & | ('") == ['Jazzkonsert']
+
+
+class TestEventSearch:
+    def test_inflected_norwegian(self, fixture_event: Event):
+        retitle(fixture_event, 'Fest i Storsalen')
+
+        assert titles('festene') == ['Fest i Storsalen']
+
+    def test_inflected_english(self, fixture_event: Event):
+        retitle(fixture_event, 'Konsert', title_en='Concerts in the Great Hall')
+
+        assert titles('concert hall') == ['Konsert']
+
+    def test_words_are_prefixes(self, fixture_event: Event):
+        retitle(fixture_event, 'Storsalen')
+
+        assert titles('stors') == ['Storsalen']
+        assert titles('stors lillesalen') == []
+
+    def test_title_ranks_above_description(self, fixture_event: Event):
+        other = Event.objects.get(pk=fixture_event.pk)
+        other.pk = None
+        other.title_nb = 'Quiz'
+        other.save()
+        fixture_event.description_long_nb = 'Vi har quiz etterpå'
+        retitle(fixture_event, 'Revy')
+
+        assert titles('quiz') == ['Quiz', 'Revy']
+        other.delete()
+
+    def test_event_group_rename(self, fixture_event: Event):
+        group = EventGroup.objects.create(name='Uka')
+        fixture_event.event_group = group
+        fixture_event.save()
+        assert titles('uka') == [fixture_event.title_nb]
+
+        group.name = 'Isfit'
+        group.save()
+
+        assert titles('uka') == []
+        assert titles('isfit') == [fixture_event.title_nb]
+
+    def test_rebuild(self, fixture_event: Event):
+        Event.objects.update(title_nb='Revy', search_vector=None)
+        assert titles('revy') == []
+
+        rebuild_search_vectors()
+
+        assert titles('revy') == ['Revy']
+
+
+class TestImageSearch:
+    @pytest.fixture(autouse=True)
+    def _enable_images(self, settings) -> None:
+        settings.CP_ENABLED = {WebFeatures.IMAGES}
+
+    def search(self, client: APIClient, text: str) -> list[int]:
+        response = client.get(reverse(routes.samfundet__images_list), {'search': text})
+        assert response.status_code == status.HTTP_200_OK
+        return [image['id'] for image in response.json()['results']]
+
+    def test_title_and_tags(self, fixture_rest_client: APIClient, fixture_image: Image):
+        fixture_image.tags.set([Tag.find_or_create('Storsalen')])
+
+        assert self.search(fixture_rest_client, 'imag') == [fixture_image.id]
+        assert self.search(fixture_rest_client, 'storsal') == [fixture_image.id]
+        assert self.search(fixture_rest_client, 'lillesal') == []
+
+    def test_tag_rename_and_delete(self, fixture_rest_client: APIClient, fixture_image: Image):
+        tag = Tag.find_or_create('Storsalen')
+        fixture_image.tags.set([tag])
+
+        tag.name = 'Klubben'
+        tag.save()
+        assert self.search(fixture_rest_client, 'storsal') == []
+        assert self.search(fixture_rest_client, 'klubb') == [fixture_image.id]
+
+        tag.delete()
+        assert self.search(fixture_rest_client, 'klubb') == []
+
+    def test_tag_clear_rebuilds_only_its_images(self, fixture_rest_client: APIClient, fixture_image: Image):
+        tag = Tag.find_or_create('Storsalen')
+        fixture_image.tags.set([tag])
+        untagged = Image.objects.create(title='Other', image=ImageFile(fixture_image.image.open(), name='Other'))
+        Image.objects.filter(pk=untagged.pk).update(search_vector=None)
+
+        tag.images.clear()
+
+        assert self.search(fixture_rest_client, 'storsal') == []
+        assert Image.objects.get(pk=untagged.pk).search_vector is None
+        untagged.delete()
+
+
+class TestInformationPageSearch:
+    @pytest.fixture(autouse=True)
+    def _enable_information(self, settings) -> None:
+        settings.CP_ENABLED = {WebFeatures.INFORMATION}
+
+    def search(self, client: APIClient, text: str) -> list[str]:
+        response = client.get(reverse(routes.samfundet__admin_information_pages_list), {'search': text})
+        assert response.status_code == status.HTTP_200_OK
+        return [page['slug_field'] for page in response.json()]
+
+    def test_current_revision_is_searched(
+        self, fixture_rest_client: APIClient, fixture_superuser: User, fixture_gang: Gang, fixture_informationpage: InformationPage
+    ):
+        fixture_rest_client.force_authenticate(user=fixture_superuser)
+        assert self.search(fixture_rest_client, 'tittel') == ['foobar']
+
+        update_information_page(
+            page=fixture_informationpage,
+            slug_field='foobar',
+            gang=fixture_gang,
+            section=None,
+            visible=True,
+            content={'title_nb': 'Åpningstider', 'title_en': 'Opening hours', 'text_nb': 'Vi har åpent hver lørdag', 'text_en': None},
+            user=None,
+        )
+
+        assert self.search(fixture_rest_client, 'tittel') == []
+        assert self.search(fixture_rest_client, 'lørdager') == ['foobar']
+        assert self.search(fixture_rest_client, 'hour') == ['foobar']
+
+
+class TestUserSearch:
+    @pytest.fixture(autouse=True)
+    def _enable_users(self, settings) -> None:
+        settings.CP_ENABLED = {WebFeatures.USERS}
+
+    def test_paginated(self, fixture_rest_client: APIClient, fixture_superuser: User, fixture_user: User):
+        fixture_rest_client.force_authenticate(user=fixture_superuser)
+        fixture_user.first_name = 'Kari'
+        fixture_user.last_name = 'Nordmann'
+        fixture_user.save()
+
+        response = fixture_rest_client.get(reverse(routes.samfundet__users_search_paginated), {'search': 'kar nordm'})
+
+        assert [user['id'] for user in response.json()['results']] == [fixture_user.id]
+
+    def test_login_skips_rebuild(self, fixture_user: User, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            fixture_user.save(update_fields=['last_login'])
+
+
+class TestUserAutocomplete:
+    @pytest.fixture(autouse=True)
+    def _enable_users(self, settings) -> None:
+        settings.CP_ENABLED = {WebFeatures.USERS}
+
+    @pytest.fixture
+    def users(self, fixture_user: User, fixture_user2: User) -> tuple[User, User]:
+        fixture_user.first_name, fixture_user.last_name = 'Kari', 'Nordmann'
+        fixture_user.save()
+        fixture_user2.first_name, fixture_user2.last_name = 'Ola', 'Karlsen'
+        fixture_user2.save()
+        return fixture_user, fixture_user2
+
+    def autocomplete(self, client: APIClient, **params: str) -> list[str]:
+        response = client.get(reverse(routes.samfundet__users_autocomplete), params)
+        assert response.status_code == status.HTTP_200_OK
+        return [user['first_name'] for user in response.json()]
+
+    def test_requires_login(self, fixture_rest_client: APIClient):
+        response = fixture_rest_client.get(reverse(routes.samfundet__users_autocomplete), {'search': 'kari'})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_names_starting_with_the_text_first(self, fixture_rest_client: APIClient, fixture_superuser: User, users: tuple[User, User]):
+        fixture_rest_client.force_authenticate(user=fixture_superuser)
+
+        assert self.autocomplete(fixture_rest_client, search='kar') == ['Kari', 'Ola']
+        assert self.autocomplete(fixture_rest_client, search='karl') == ['Ola']
+        assert self.autocomplete(fixture_rest_client, search='Kari Nord') == ['Kari']
+
+    def test_typos(self, fixture_rest_client: APIClient, fixture_superuser: User, users: tuple[User, User]):
+        fixture_rest_client.force_authenticate(user=fixture_superuser)
+
+        assert self.autocomplete(fixture_rest_client, search='nordman') == ['Kari']
+        assert self.autocomplete(fixture_rest_client, search='nordmnan') == ['Kari']
+
+    def test_short_text_matches_username_prefix(self, fixture_rest_client: APIClient, fixture_superuser: User, users: tuple[User, User]):
+        fixture_rest_client.force_authenticate(user=fixture_superuser)
+
+        assert self.autocomplete(fixture_rest_client, search='us') == ['Kari', 'Ola']
+        assert self.autocomplete(fixture_rest_client, search='ka') == []
+
+    def test_limit(self, fixture_rest_client: APIClient, fixture_superuser: User, users: tuple[User, User]):
+        fixture_rest_client.force_authenticate(user=fixture_superuser)
+
+        assert self.autocomplete(fixture_rest_client, search='kar', limit='1') == ['Kari']
+        response = fixture_rest_client.get(reverse(routes.samfundet__users_autocomplete), {'search': 'kar', 'limit': 'many'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_slim(self, fixture_rest_client: APIClient, fixture_superuser: User, users: tuple[User, User]):
+        fixture_rest_client.force_authenticate(user=fixture_superuser)
+
+        response = fixture_rest_client.get(reverse(routes.samfundet__users_autocomplete), {'search': 'kari'})
+
+        assert set(response.json()[0]) == {'id', 'username', 'first_name', 'last_name'}
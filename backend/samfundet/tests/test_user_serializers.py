@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from rest_framework import status
+
+from django.urls import reverse
+
+from root.utils import routes
+from root.constants import WebFeatures
+
+from samfundet.serializers import UserListSerializer
+
+if TYPE_CHECKING:
+    from rest_framework.test import APIClient
+
+    from samfundet.models import User
+
+
+class TestUserList:
+    @pytest.fixture(autouse=True)
+    def _enable_users(self, settings) -> None:
+        settings.CP_ENABLED = {WebFeatures.USERS}
+
+    def test_paginated_is_slim(self, fixture_rest_client: APIClient, fixture_superuser: User, fixture_user: User):
+        fixture_rest_client.force_authenticate(user=fixture_superuser)
+
+        response = fixture_rest_client.get(reverse(routes.samfundet__users_search_paginated))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert all(set(user) == set(UserListSerializer.Meta.fields) for user in response.json()['results'])
+
+    def test_anonymous_gets_no_contact_details(self, fixture_rest_client: APIClient, fixture_user: User):
+        response = fixture_rest_client.get(reverse(routes.samfundet__users))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert fixture_user.id in [user['id'] for user in response.json()]
+        assert all({'email', 'phone_number', 'is_staff', 'is_superuser'}.isdisjoint(user) for user in response.json())
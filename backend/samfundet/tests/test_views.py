@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import io
+import csv
 import time
 from typing import TYPE_CHECKING, Any
 from datetime import date
@@ -11,12 +13,15 @@ from guardian.shortcuts import assign_perm
 
 from rest_framework import status
 
+from django.db import connection
 from django.urls import reverse
 from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import Group, Permission
 
 from root.utils import routes, permissions
 
+from samfundet.conftest import apply_to_position
 from samfundet.serializers import UserSerializer, RegisterSerializer
 from samfundet.models.general import (
     Gang,
@@ -34,6 +39,7 @@ from samfundet.models.general import (
 from samfundet.models.recruitment import (
     Interview,
     Recruitment,
+    OccupiedTimeslot,
     RecruitmentPosition,
     RecruitmentApplication,
 )
@@ -956,6 +962,152 @@ def test_recruitment_positions_per_recruitment(
     assert response.data[0]['name_nb'] == fixture_recruitment_position.name_nb
 
 
+def test_recruitment_positions_per_recruitment_counts_in_constant_queries(
+    fixture_rest_client: APIClient,
+    fixture_superuser: User,
+    fixture_recruitment: Recruitment,
+    fixture_recruitment_position: RecruitmentPosition,
+    fixture_user: User,
+    fixture_user2: User,
+    django_assert_num_queries: Any,
+):
+    ### Arrange ###
+    fixture_rest_client.force_authenticate(user=fixture_superuser)
+    url = reverse(routes.samfundet__recruitment_positions)
+    RecruitmentApplication.objects.create(
+        user=fixture_user,
+        recruitment_position=fixture_recruitment_position,
+        recruitment=fixture_recruitment,
+        application_text='I have applied',
+        recruiter_status=RecruitmentStatusChoices.CALLED_AND_ACCEPTED,
+    )
+    RecruitmentApplication.objects.create(
+        user=fixture_user2,
+        recruitment_position=fixture_recruitment_position,
+        recruitment=fixture_recruitment,
+        application_text='I have applied',
+    )
+    fixture_recruitment_position.interviewers.add(fixture_user)
+    with CaptureQueriesContext(connection) as single_position:
+        fixture_rest_client.get(path=url, data={'recruitment': fixture_recruitment.id})
+
+    for i in range(5):
+        position = RecruitmentPosition.objects.create(
+            name_nb=f'Position {i}',
+            name_en=f'Position {i}',
+            short_description_nb='Short',
+            long_description_nb='Long',
+            is_funksjonaer_position=False,
+            default_application_letter_nb='Letter',
+            tags='tag',
+            gang=fixture_recruitment_position.gang,
+            recruitment=fixture_recruitment,
+        )
+        position.interviewers.add(fixture_user2)
+
+    ### Act ###
+    with django_assert_num_queries(len(single_position.captured_queries)):
+        response: Response = fixture_rest_client.get(path=url, data={'recruitment': fixture_recruitment.id})
+
+    ### Assert ###
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data) == 6
+    counted = next(position for position in response.data if position['id'] == fixture_recruitment_position.id)
+    assert counted['total_applicants'] == 2
+    assert counted['processed_applicants'] == 1
+    assert counted['accepted_applicants'] == 1
+
+
+def download_csv(client: APIClient, url: str) -> list[dict[str, str]]:
+    response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    return list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+
+def test_download_applications_csv(
+    fixture_rest_client: APIClient,
+    fixture_superuser: User,
+    fixture_user: User,
+    fixture_user2: User,
+    fixture_recruitment: Recruitment,
+    fixture_recruitment_position: RecruitmentPosition,
+    fixture_recruitment_position2: RecruitmentPosition,
+    fixture_recruitment_application: RecruitmentApplication,
+):
+    ### Arrange ###
+    fixture_rest_client.force_authenticate(user=fixture_superuser)
+    url = reverse(routes.samfundet__recruitment_download_applications_csv, kwargs={'recruitment_id': fixture_recruitment.id})
+    RecruitmentApplication.objects.create(
+        user=fixture_user,
+        recruitment_position=fixture_recruitment_position2,
+        recruitment=fixture_recruitment,
+        application_text='I have applied',
+        applicant_priority=2,
+        interview=Interview.objects.create(interview_location='Lyche'),
+    )
+    with CaptureQueriesContext(connection) as first_export:
+        download_csv(fixture_rest_client, url)
+    RecruitmentApplication.objects.create(
+        user=fixture_user2,
+        recruitment_position=fixture_recruitment_position,
+        recruitment=fixture_recruitment,
+        application_text='I have applied',
+        applicant_priority=1,
+    )
+
+    ### Act ###
+    with CaptureQueriesContext(connection) as second_export:
+        rows = download_csv(fixture_rest_client, url)
+
+    ### Assert ###
+    assert len(second_export.captured_queries) == len(first_export.captured_queries)
+    assert len(rows) == 3
+    by_position = {(row['Epost'], row['Stilling']): row for row in rows}
+    second_choice = by_position[(fixture_user.email, fixture_recruitment_position2.name_nb)]
+    assert second_choice['Sokers rangering'] == '2/2'
+    assert second_choice['Intervjuer satt'] == '1/2'
+    assert second_choice['Intervjusted'] == 'Lyche'
+    assert second_choice['Gjeng'] == fixture_recruitment_position2.gang.name_nb
+    assert by_position[(fixture_user2.email, fixture_recruitment_position.name_nb)]['Sokers rangering'] == '1/1'
+
+
+def test_download_gang_applications_csv(
+    fixture_rest_client: APIClient,
+    fixture_superuser: User,
+    fixture_user: User,
+    fixture_gang2: Gang,
+    fixture_recruitment: Recruitment,
+    fixture_recruitment_position: RecruitmentPosition,
+    fixture_recruitment_position2: RecruitmentPosition,
+    fixture_recruitment_application: RecruitmentApplication,
+):
+    ### Arrange ###
+    fixture_rest_client.force_authenticate(user=fixture_superuser)
+    fixture_recruitment_position2.gang = fixture_gang2
+    fixture_recruitment_position2.save()
+    RecruitmentApplication.objects.create(
+        user=fixture_user,
+        recruitment_position=fixture_recruitment_position2,
+        recruitment=fixture_recruitment,
+        application_text='I have applied',
+        applicant_priority=2,
+        interview=Interview.objects.create(interview_location='Lyche'),
+    )
+    url = reverse(
+        routes.samfundet__recruitment_download_gang_application_csv,
+        kwargs={'recruitment_id': fixture_recruitment.id, 'gang_id': fixture_gang2.id},
+    )
+
+    ### Act ###
+    rows = download_csv(fixture_rest_client, url)
+
+    ### Assert ###
+    assert len(rows) == 1
+    assert rows[0]['Stilling'] == fixture_recruitment_position2.name_nb
+    assert rows[0]['Sokers rangering (Hele Opptak)'] == '2/2'
+    assert rows[0]['Intervjuer satt (For Gjeng)'] == '1/1'
+
+
 def test_get_applicants_without_interviews(
     fixture_rest_client: APIClient,
     fixture_superuser: User,
@@ -1270,6 +1422,93 @@ def test_update_application_recruiter_status_position(
     assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
+def apply_as_new_user(position: RecruitmentPosition, applicant: str, **fields: Any) -> RecruitmentApplication:
+    """An application from a new user `applicant`, who also has an interview and an occupied timeslot."""
+    user = User.objects.create_user(username=applicant, email=f'{applicant}@test.com', password='password')
+    interview = Interview.objects.create(interview_time=timezone.now(), interview_location='Lyche')
+    interview.interviewers.add(user)
+    start = timezone.now()
+    OccupiedTimeslot.objects.create(user=user, recruitment=position.recruitment, start_dt=start, end_dt=start + timezone.timedelta(hours=1))
+    (application,) = apply_to_position(user=user, position=position)
+    # Bypasses the signals a recruiter decision would trigger
+    RecruitmentApplication.objects.filter(id=application.id).update(**{'interview': interview, **fields})
+    return application
+
+
+def test_recruitment_position_organized_applications_in_constant_queries(
+    fixture_rest_client: APIClient,
+    fixture_superuser: User,
+    fixture_recruitment_position: RecruitmentPosition,
+    django_assert_num_queries: Any,
+):
+    ### Arrange ###
+    fixture_rest_client.force_authenticate(user=fixture_superuser)
+    url = reverse(routes.samfundet__recruitment_position_organized_applications, kwargs={'pk': fixture_recruitment_position.id})
+    apply_as_new_user(fixture_recruitment_position, 'first')
+    with CaptureQueriesContext(connection) as single_application:
+        fixture_rest_client.get(path=url)
+
+    groups = {
+        'unprocessed': {'recruiter_status': RecruitmentStatusChoices.NOT_SET},
+        'withdrawn': {'withdrawn': True, 'recruiter_status': RecruitmentStatusChoices.CALLED_AND_ACCEPTED},
+        'accepted': {'recruiter_status': RecruitmentStatusChoices.CALLED_AND_ACCEPTED},
+        'rejected': {'recruiter_status': RecruitmentStatusChoices.AUTOMATIC_REJECTION},
+        'hardtoget': {'recruiter_status': RecruitmentStatusChoices.CALLED_AND_REJECTED},
+    }
+    applications = {group: apply_as_new_user(fixture_recruitment_position, group, **fields) for group, fields in groups.items()}
+    apply_as_new_user(fixture_recruitment_position, 'rejected_by_recruiter', recruiter_status=RecruitmentStatusChoices.REJECTION)
+
+    ### Act ###
+    with django_assert_num_queries(len(single_application.captured_queries)):
+        response: Response = fixture_rest_client.get(path=url)
+
+    ### Assert ###
+    assert response.status_code == status.HTTP_200_OK
+    assert {group: len(rows) for group, rows in response.data.items()} == {'unprocessed': 2, 'withdrawn': 1, 'accepted': 1, 'rejected': 2, 'hardtoget': 1}
+    for group, application in applications.items():
+        assert str(application.id) in {row['id'] for row in response.data[group]}
+    assert all(row['application_count'] == 1 for rows in response.data.values() for row in rows)
+
+
+def test_applicants_without_interviews_in_constant_queries(
+    fixture_rest_client: APIClient,
+    fixture_superuser: User,
+    fixture_recruitment_position: RecruitmentPosition,
+    django_assert_num_queries: Any,
+):
+    ### Arrange ###
+    fixture_rest_client.force_authenticate(user=fixture_superuser)
+    url = reverse(routes.samfundet__applicants_without_interviews, kwargs={'pk': fixture_recruitment_position.recruitment_id})
+    first = apply_as_new_user(fixture_recruitment_position, 'first', interview=None)
+    with CaptureQueriesContext(connection) as single_applicant:
+        fixture_rest_client.get(path=url)
+
+    other_position = RecruitmentPosition.objects.get(pk=fixture_recruitment_position.pk)
+    other_position.pk = None
+    other_position.name_nb = 'Other position'
+    other_position.save()
+    top = RecruitmentApplication.objects.create(
+        user=first.user, recruitment_position=other_position, recruitment=other_position.recruitment, application_text='I have applied'
+    )
+    RecruitmentApplication.objects.filter(id=first.id).update(applicant_priority=2)
+    RecruitmentApplication.objects.filter(id=top.id).update(applicant_priority=1)
+    for i in range(3):
+        apply_as_new_user(fixture_recruitment_position, f'applicant{i}', interview=None)
+    apply_as_new_user(fixture_recruitment_position, 'interviewed')
+
+    ### Act ###
+    with django_assert_num_queries(len(single_applicant.captured_queries)):
+        response: Response = fixture_rest_client.get(path=url)
+
+    ### Assert ###
+    assert response.status_code == status.HTTP_200_OK
+    assert {row['username'] for row in response.data} == {'first', 'applicant0', 'applicant1', 'applicant2'}
+    applicant = next(row for row in response.data if row['id'] == first.user_id)
+    assert {application['id'] for application in applicant['applications']} == {str(first.id), str(top.id)}
+    assert len(applicant['applications_without_interview']) == 2
+    assert applicant['top_application']['id'] == str(top.id)
+
+
 def test_withdraw_application(fixture_rest_client: APIClient, fixture_user: User, fixture_recruitment_position: RecruitmentPosition):
     ### Arrange ###
     fixture_rest_client.force_authenticate(user=fixture_user)
@@ -87,17 +87,19 @@ urlpatterns = [
     path('groups/', samfundet.view.user_views.AllGroupsView.as_view(), name='groups'),
     path('users/', samfundet.view.user_views.AllUsersView.as_view(), name='users'),
     path('users-search-paginated/', samfundet.view.user_views.PaginatedSearchUsersView.as_view(), name='users_search_paginated'),
+    path('users/autocomplete/', samfundet.view.user_views.UserAutocompleteView.as_view(), name='users_autocomplete'),
     path('impersonate/', samfundet.view.user_views.ImpersonateView.as_view(), name='impersonate'),
     path('events-per-day/', samfundet.view.event_views.EventPerDayView.as_view(), name='eventsperday'),
     path('events-upcomming/', samfundet.view.event_views.EventsUpcomingView.as_view(), name='eventsupcomming'),
     path('isclosed/', samfundet.view.general_views.IsClosedView().as_view(), name='isclosed'),
-    path('home/', samfundet.view.general_views.HomePageView().as_view(), name='home'),
+    path('home/', samfundet.view.general_views.HomePageView.as_view(), name='home'),
     path('assign_group/', samfundet.view.user_views.AssignGroupView.as_view(), name='assign_group'),
     path('webhook/', views.WebhookView.as_view(), name='webhook'),
     path('gangtypes/<int:organization>/', samfundet.view.general_views.GangTypeOrganizationView.as_view(), name='gangsorganized'),
     ########## Lyche ##########
     path('check-reservation/', samfundet.view.sulten_views.ReservationCheckAvailabilityView.as_view(), name='check_reservation'),
     path('reservations/', samfundet.view.sulten_views.ReservationCreateView.as_view(), name='reservation-create'),
+    path('reservation-availability/', samfundet.view.sulten_views.ReservationAvailabilityView.as_view(), name='reservation_availability'),
     ######## MDB ########
     path('mdb/connect', samfundet.view.mdb_views.ConnectToMDBView.as_view(), name='mdb_connect'),
     ########## Recruitment ##########
@@ -140,6 +142,11 @@ urlpatterns = [
         views.RecruitmentApplicationForPositionUpdateStateView.as_view(),
         name='recruitment_application_update_state_position',
     ),
+    path(
+        'recruitment-application-bulk-update-state/',
+        views.RecruitmentApplicationBulkUpdateStateView.as_view(),
+        name='recruitment_application_bulk_update_state',
+    ),
     path(
         'recruitment-application-recruiter/<str:application_id>/',
         views.RecruitmentApplicationForRecruitersView.as_view(),
@@ -1,14 +1,12 @@
 from __future__ import annotations
 
 import datetime
-from operator import or_
-from functools import reduce
 from collections.abc import Callable
 
 from django.conf import settings
 from django.http import QueryDict
 from django.contrib import admin
-from django.db.models import Q, Model
+from django.db.models import Model
 from django.contrib.admin import ModelAdmin
 from django.utils.timezone import make_aware
 from django.core.exceptions import ValidationError
@@ -17,20 +15,10 @@ from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
 
 from .models import User
+from .search import full_text_search
 from .models.event import Event
 from .models.recruitment import Recruitment, OccupiedTimeslot, RecruitmentInterviewAvailability
 
-SEARCH_FIELDS = (
-    'title_nb__icontains',
-    'title_en__icontains',
-    'description_long_nb__icontains',
-    'description_long_en__icontains',
-    'description_short_en__icontains',
-    'description_short_nb__icontains',
-    'location__icontains',
-    'event_group__name__icontains',
-)
-
 SIMPLE_FILTERS = {
     'event_group': 'event_group__id',
     'category': 'category__icontains',
@@ -44,8 +32,7 @@ def event_query(*, query: QueryDict, events: QuerySet[Event] | None = None) -> Q
 
     search = query.get('search')
     if search:
-        q_parts = (Q(**{f: search}) for f in SEARCH_FIELDS)
-        qs = qs.filter(reduce(or_, q_parts, Q()))
+        qs = full_text_search(qs, search)
 
     for param, lookup in SIMPLE_FILTERS.items():
         value = query.get(param)
@@ -55,14 +42,12 @@ def event_query(*, query: QueryDict, events: QuerySet[Event] | None = None) -> Q
     return qs
 
 
-def get_user_by_search(*, query: QueryDict, users: QuerySet[User] = None) -> QuerySet[User]:
-    if not users:
+def get_user_by_search(*, query: QueryDict, users: QuerySet[User] | None = None) -> QuerySet[User]:
+    if users is None:
         users = User.objects.all()
     search = query.get('search', None)
     if search:
-        for name in search.split():
-            users = users.filter(Q(username__icontains=name) | Q(first_name__icontains=name) | Q(last_name__icontains=name))
-        return users
+        return full_text_search(users, search)
     return users
 
 
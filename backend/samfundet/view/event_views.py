@@ -5,18 +5,20 @@ from __future__ import annotations
 
 from typing import Any
 
+from asgiref.sync import sync_to_async
+
 from rest_framework import status
-from rest_framework.views import APIView
-from rest_framework.filters import SearchFilter
 from rest_framework.request import Request
-from rest_framework.generics import ListAPIView, CreateAPIView
+from rest_framework.generics import CreateAPIView
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import IsAuthenticated
 
+from django.http import HttpRequest
 from django.utils import timezone
 
 from root.constants import WebFeatures
+from root.custom_classes.async_views import AsyncReadOnlyView
 from root.custom_classes.permission_classes import FeatureEnabled, RoleProtectedOrAnonReadOnlyObjectPermissions
 
 from samfundet.utils import event_query
@@ -46,10 +48,8 @@ class EventView(ModelViewSet):
     queryset = Event.objects.all()
 
 
-class EventPerDayView(APIView):
-    permission_classes = [AllowAny]
-
-    def get(self, request: Request) -> Response:
+class EventPerDayView(AsyncReadOnlyView):
+    async def data(self, request: HttpRequest, **kwargs: Any) -> dict[str, list]:
         # Fetch and serialize events.
         now = timezone.now()
         # Only events:
@@ -57,8 +57,14 @@ class EventPerDayView(APIView):
         # - where the event's visibility period has already begun
         # - where  visibility period hasn't ended yet
         # - where status is "PUBLIC"
-        events = Event.objects.filter(start_dt__gt=now, visibility_from_dt__lte=now, visibility_to_dt__gte=now, status=EventStatus.PUBLIC).order_by('start_dt')
-        serialized = EventSerializer(events, many=True).data
+        events = [
+            event
+            async for event in Event.objects.filter(start_dt__gt=now, visibility_from_dt__lte=now, visibility_to_dt__gte=now, status=EventStatus.PUBLIC)
+            .order_by('start_dt')
+            .select_related('image')
+            .prefetch_related('custom_tickets', 'editors', 'image__tags')
+        ]
+        serialized = await sync_to_async(lambda: EventSerializer(events, many=True).data)()
 
         # Organize in date dictionary.
         events_per_day: dict = {}
@@ -67,36 +73,28 @@ class EventPerDayView(APIView):
             events_per_day.setdefault(date, [])
             events_per_day[date].append(serial)
 
-        return Response(data=events_per_day)
+        return events_per_day
 
 
-class EventsUpcomingView(ListAPIView):
-    permission_classes = [AllowAny]
-    serializer_class = EventSerializer
-    pagination_class = CustomPageNumberPagination
-    filter_backends = [SearchFilter]
-    search_fields = ['title_en', 'title_nb']
+class EventsUpcomingView(AsyncReadOnlyView):
+    async def data(self, request: HttpRequest, **kwargs: Any) -> dict[str, Any]:
+        drf_request = Request(request)
+        # Soonest first, or with ?search= best match first
+        queryset = event_query(query=request.GET, events=Event.objects.filter(start_dt__gt=timezone.now()).order_by('start_dt'))
+        queryset = queryset.select_related('image').prefetch_related('custom_tickets', 'editors', 'image__tags')
 
-    def get_queryset(self) -> Response:
-        queryset = event_query(query=self.request.query_params)
-        queryset = queryset.filter(start_dt__gt=timezone.now()).order_by('start_dt')
-        return queryset
+        def page() -> dict[str, Any]:
+            pagination = CustomPageNumberPagination()
+            events = pagination.paginate_queryset(queryset, drf_request, view=self)
+            return pagination.get_paginated_response(EventSerializer(events, many=True).data).data
 
-    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
-        # Get the paginated response from parent
-        response = super().list(request, *args, **kwargs)
+        data = await sync_to_async(page)()
 
         # Add categories, locations, organizers, and ticket types to the response
-        if isinstance(response.data, dict):
-            venue_names = list(Venue.objects.values_list('name', flat=True))
-            categories = Event._meta.get_field('category').choices if Event._meta.get_field('category').choices else []
-            ticket_types = Event._meta.get_field('ticket_type').choices if Event._meta.get_field('ticket_type').choices else []
-
-            response.data['categories'] = categories
-            response.data['locations'] = venue_names if venue_names else []
-            response.data['ticket_types'] = ticket_types
-
-        return response
+        data['categories'] = Event._meta.get_field('category').choices or []
+        data['locations'] = [name async for name in Venue.objects.values_list('name', flat=True)]
+        data['ticket_types'] = Event._meta.get_field('ticket_type').choices or []
+        return data
 
 
 class EventGroupView(ModelViewSet):
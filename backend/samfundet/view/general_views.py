@@ -9,21 +9,24 @@ from itertools import chain
 
 from rest_framework import status
 from rest_framework.views import APIView
-from rest_framework.filters import SearchFilter
 from rest_framework.request import Request
 from rest_framework.generics import ListAPIView, CreateAPIView
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
+from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
 
+from django.http import HttpRequest
 from django.utils import timezone
 from django.db.models import Q, Count, QuerySet, ProtectedError
 from django.shortcuts import get_object_or_404
 
 from root.constants import WebFeatures
+from root.custom_classes.async_views import AsyncReadOnlyView
 from root.custom_classes.permission_classes import FeatureEnabled, RoleProtectedOrAnonReadOnlyObjectPermissions
 
+from samfundet.search import full_text_search
+from samfundet.caching import IS_CLOSED, KEY_VALUES, TEXT_ITEMS, OPEN_VENUES, CachedReadOnlyModelViewSet
 from samfundet.homepage import homepage
 from samfundet.pagination import CustomPageNumberPagination
 from samfundet.models.role import Role, UserOrgRole, UserGangRole, UserGangSectionRole
@@ -66,11 +69,9 @@ from samfundet.models.general import (
 from samfundet.models.model_choices import SaksdokumentCategory
 
 
-class HomePageView(APIView):
-    permission_classes = [AllowAny]
-
-    def get(self, request: Request) -> Response:
-        return Response(data=homepage.generate())
+class HomePageView(AsyncReadOnlyView):
+    async def data(self, request: HttpRequest, **kwargs: Any) -> dict[str, Any]:
+        return await homepage.acached()
 
 
 # =============================== #
@@ -79,17 +80,19 @@ class HomePageView(APIView):
 
 
 # Localized text storage
-class TextItemView(ReadOnlyModelViewSet):
+class TextItemView(CachedReadOnlyModelViewSet):
     """All CRUD operations can be performed in the admin panel instead."""
 
+    cache_region = TEXT_ITEMS
     permission_classes = [AllowAny]
     serializer_class = TextItemSerializer
     queryset = TextItem.objects.all()
 
 
-class KeyValueView(ReadOnlyModelViewSet):
+class KeyValueView(CachedReadOnlyModelViewSet):
     """All CRUD operations can be performed in the admin panel instead."""
 
+    cache_region = KEY_VALUES
     permission_classes = [AllowAny]
     serializer_class = KeyValueSerializer
     queryset = KeyValue.objects.all()
@@ -106,15 +109,19 @@ class ImageView(ModelViewSet):
     serializer_class = ImageSerializer
     queryset = Image.objects.all().order_by('-pk')
     pagination_class = CustomPageNumberPagination
-    filter_backends = [SearchFilter]
-    search_fields = ['title', 'tags__name']
 
     def get_queryset(self) -> QuerySet[Image]:
-        """With ?tag=<name>, returns only images carrying that exact tag."""
+        """
+        With ?tag=<name>, returns only images carrying that exact tag.
+        With ?search=<text>, returns images matching on title or tags, best match first.
+        """
         queryset = super().get_queryset()
         tag_name = self.request.query_params.get('tag')
         if tag_name:
             queryset = queryset.filter(tags__name__iexact=tag_name)
+        search = self.request.query_params.get('search')
+        if search:
+            queryset = full_text_search(queryset, search)
         return queryset
 
     def destroy(self, request: Request, *args: Any, **kwargs: Any) -> Response:
@@ -168,9 +175,8 @@ class VenueView(ModelViewSet):
             }
         )
 
-        open_venues = Venue.objects.filter(q)
-        serializer = self.get_serializer(open_venues, many=True)
-        return Response(serializer.data)
+        data = OPEN_VENUES.get_or_set(day_name, default=lambda: self.get_serializer(Venue.objects.filter(q), many=True).data)
+        return Response(data)
 
 
 class ClosedPeriodView(ModelViewSet):
@@ -187,6 +193,9 @@ class IsClosedView(ListAPIView):
     permission_classes = [AllowAny]
     serializer_class = ClosedPeriodSerializer
 
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return Response(IS_CLOSED.get_or_set(default=lambda: super(IsClosedView, self).list(request, *args, **kwargs).data))
+
     def get_queryset(self) -> QuerySet:
         return ClosedPeriod.objects.filter(
             start_dt__lte=timezone.now(),
@@ -284,9 +293,9 @@ class RoleView(ModelViewSet):
     def users(self, request: Request, pk: int) -> Response:
         role = get_object_or_404(Role, id=pk)
 
-        org_roles = UserOrgRole.objects.filter(role=role).select_related('user', 'obj')
-        gang_roles = UserGangRole.objects.filter(role=role).select_related('user', 'obj')
-        section_roles = UserGangSectionRole.objects.filter(role=role).select_related('user', 'obj')
+        org_roles = UserOrgRole.objects.filter(role=role).select_related('user', 'obj', 'created_by')
+        gang_roles = UserGangRole.objects.filter(role=role).select_related('user', 'obj', 'created_by')
+        section_roles = UserGangSectionRole.objects.filter(role=role).select_related('user', 'obj', 'created_by')
 
         org_data = UserOrgRoleSerializer(org_roles, many=True).data
         gang_data = UserGangRoleSerializer(gang_roles, many=True).data
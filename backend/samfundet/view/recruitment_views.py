@@ -67,18 +67,6 @@ class RecruitmentForRecruiterView(ModelViewSet):
     def get_queryset(self) -> QuerySet[Recruitment]:
         return filter_queryset_by_permissions(Recruitment.objects.all(), self.request.user, SAMFUNDET_VIEW_RECRUITMENT)
 
-    def retrieve(self, request: Request, pk: int) -> Response:
-        # This will check permissions
-        recruitment = self.get_object()
-        recruitment.statistics.save()
-
-        # Re-fetch the object after statistics update
-        self.kwargs['pk'] = pk  # Make sure pk is in kwargs for get_object
-        stats = self.get_object()
-
-        serializer = self.serializer_class(stats)
-        return Response(serializer.data)
-
 
 class RecruitmentApplicationForGangView(ModelViewSet):
     permission_classes = [IsAuthenticated]
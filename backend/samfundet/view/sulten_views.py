@@ -9,11 +9,13 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import AllowAny, DjangoModelPermissionsOrAnonReadOnly
 
 from django.utils import timezone
+from django.shortcuts import get_object_or_404
 
 from root.constants import WebFeatures
 from root.custom_classes.permission_classes import FeatureEnabled
 
-from samfundet.models.general import Menu, Table, MenuItem, Reservation, FoodCategory, FoodPreference
+from samfundet.models.general import Menu, Table, Venue, MenuItem, Reservation, FoodCategory, FoodPreference
+from samfundet.reservations.availability import Availability
 from samfundet.serializer.sulten_serializers import (
     MenuSerializer,
     TableSerializer,
@@ -22,8 +24,14 @@ from samfundet.serializer.sulten_serializers import (
     FoodCategorySerializer,
     FoodPreferenceSerializer,
     ReservationCheckSerializer,
+    ReservationAvailabilitySerializer,
 )
 
+TOO_LATE_ERROR = {
+    'error_nb': 'Reservasjoner må dessverre opprettes minst én dag i forveien.',
+    'error_en': 'Unfortunately, reservations must be made at least one day in advance.',
+}
+
 
 class MenuView(ModelViewSet):
     feature_key = WebFeatures.SULTEN
@@ -89,13 +97,7 @@ class ReservationCheckAvailabilityView(APIView):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
             if serializer.validated_data['reservation_date'] <= timezone.now().date():
-                return Response(
-                    {
-                        'error_nb': 'Reservasjoner må dessverre opprettes minst én dag i forveien.',
-                        'error_en': 'Unfortunately, reservations must be made at least one day in advance.',
-                    },
-                    status=status.HTTP_406_NOT_ACCEPTABLE,
-                )
+                return Response(TOO_LATE_ERROR, status=status.HTTP_406_NOT_ACCEPTABLE)
             available_tables = Reservation.fetch_available_times_for_date(
                 slug='lyche',
                 seating=serializer.validated_data['guest_count'],
@@ -103,3 +105,24 @@ class ReservationCheckAvailabilityView(APIView):
             )
             return Response(available_tables, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ReservationAvailabilityView(APIView):
+    """Available times for each of `days` days from `start_date`, so the booking page can show a week at once."""
+
+    permission_classes = [AllowAny]
+    serializer_class = ReservationAvailabilitySerializer
+
+    def get(self, request: Request) -> Response:
+        serializer = self.serializer_class(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        if serializer.validated_data['start_date'] <= timezone.now().date():
+            return Response(TOO_LATE_ERROR, status=status.HTTP_406_NOT_ACCEPTABLE)
+
+        availability = Availability.load(
+            venue=get_object_or_404(Venue, slug=serializer.validated_data['venue']),
+            start=serializer.validated_data['start_date'],
+            days=serializer.validated_data['days'],
+        )
+        times = availability.available_times_by_day(guest_count=serializer.validated_data['guest_count'])
+        return Response({day.isoformat(): day_times for day, day_times in times.items()}, status=status.HTTP_200_OK)
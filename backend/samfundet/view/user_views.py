@@ -9,6 +9,7 @@ from rest_framework.request import Request
 from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, BasePermission, IsAuthenticated, DjangoModelPermissionsOrAnonReadOnly
 
 from django.db.models import QuerySet
@@ -22,14 +23,17 @@ from root.constants import XCSRFTOKEN, AUTH_BACKEND, REQUESTED_IMPERSONATE_USER,
 from root.custom_classes.permission_classes import FeatureEnabled
 
 from samfundet.utils import get_user_by_search
+from samfundet.search import autocomplete_users
 from samfundet.pagination import CustomPageNumberPagination
 from samfundet.serializers import (
     UserSerializer,
     GroupSerializer,
     LoginSerializer,
     RegisterSerializer,
+    UserListSerializer,
     PermissionSerializer,
     UpdateUserSerializer,
+    UserOptionSerializer,
     ChangePasswordSerializer,
     UserPreferenceSerializer,
 )
@@ -136,12 +140,12 @@ class AllUsersView(ListAPIView):
         DjangoModelPermissionsOrAnonReadOnly,
         FeatureEnabled,
     )
-    serializer_class = UserSerializer
+    serializer_class = UserListSerializer
     queryset = User.objects.all()
 
     def get(self, request: Request) -> Response:
         users = get_user_by_search(query=request.query_params)
-        return Response(data=UserSerializer(users, many=True).data)
+        return Response(data=UserListSerializer(users, many=True).data)
 
 
 class PaginatedSearchUsersView(ListAPIView):
@@ -150,16 +154,41 @@ class PaginatedSearchUsersView(ListAPIView):
         DjangoModelPermissionsOrAnonReadOnly,
         FeatureEnabled,
     )
-    serializer_class = UserSerializer
+    serializer_class = UserListSerializer
     pagination_class = CustomPageNumberPagination
 
     def get_queryset(self) -> QuerySet[User]:
         """
         Get queryset of users with search functionality using the user_query helper.
-        Returns ordered queryset of users filtered by search parameters if provided.
+        Returns users ordered by username, or by best match if searching.
         """
         # Pass the query parameters directly to user_query
-        return get_user_by_search(query=self.request.query_params).order_by('username')
+        return get_user_by_search(query=self.request.query_params, users=User.objects.order_by('username'))
+
+
+class UserAutocompleteView(ListAPIView):
+    """
+    The users best matching ?search=, for user pickers. Returns the top ?limit= users (default 10, at most 50),
+    without pagination. See samfundet.search.autocomplete_users.
+    """
+
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 50
+
+    feature_key = WebFeatures.USERS
+    permission_classes = (
+        IsAuthenticated,
+        FeatureEnabled,
+    )
+    serializer_class = UserOptionSerializer
+
+    def get_queryset(self) -> QuerySet[User]:
+        try:
+            limit = int(self.request.query_params.get('limit', self.DEFAULT_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'}) from None
+        limit = min(max(limit, 1), self.MAX_LIMIT)
+        return autocomplete_users(User.objects.only(*UserOptionSerializer.Meta.fields), self.request.query_params.get('search', ''), limit=limit)
 
 
 class ImpersonateView(APIView):
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import os
-import csv
 import hmac
 import hashlib
 import operator
@@ -9,6 +8,7 @@ from typing import Any
 from datetime import datetime
 from functools import reduce
 
+from asgiref.sync import sync_to_async
 from guardian.shortcuts import get_objects_for_user
 
 from rest_framework import status
@@ -19,10 +19,10 @@ from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
-from rest_framework.permissions import AllowAny, IsAuthenticated, DjangoModelPermissions, DjangoModelPermissionsOrAnonReadOnly
+from rest_framework.permissions import AllowAny, IsAuthenticated, DjangoModelPermissions
 
 from django.conf import settings
-from django.http import QueryDict, HttpResponse
+from django.http import QueryDict, HttpRequest, HttpResponse, StreamingHttpResponse
 from django.utils import timezone
 from django.core.mail import EmailMessage
 from django.db.models import Q, Count, QuerySet
@@ -36,8 +36,9 @@ from root.constants import (
     GITHUB_SIGNATURE_HEADER,
     WebFeatures,
 )
-from root.utils.permissions import SAMFUNDET_VIEW_INTERVIEW, SAMFUNDET_VIEW_INTERVIEWROOM
-from root.custom_classes.permission_classes import FeatureEnabled
+from root.utils.permissions import SAMFUNDET_VIEW_INTERVIEW, SAMFUNDET_VIEW_INTERVIEWROOM, SAMFUNDET_CHANGE_RECRUITMENTAPPLICATION
+from root.custom_classes.async_views import AsyncReadOnlyView
+from root.custom_classes.permission_classes import FeatureEnabled, filter_queryset_by_permissions
 
 from .utils import generate_timeslots, get_occupied_timeslots_from_request
 from .serializers import (
@@ -49,12 +50,14 @@ from .serializers import (
     RecruitmentPositionSerializer,
     UserWithApplicationsSerializer,
     RecruitmentStatisticsSerializer,
+    RecruitmentApplicationStateSerializer,
     RecruitmentSeparatePositionSerializer,
     RecruitmentApplicationForGangSerializer,
     RecruitmentUpdateUserPrioritySerializer,
     RecruitmentPositionOrganizedApplications,
     RecruitmentPositionForApplicantSerializer,
     RecruitmentInterviewAvailabilitySerializer,
+    RecruitmentApplicationStateChangeSerializer,
     RecruitmentApplicationForApplicantSerializer,
     RecruitmentApplicationForRecruiterSerializer,
     RecruitmentApplicationUpdateForGangSerializer,
@@ -78,7 +81,9 @@ from .models.recruitment import (
     RecruitmentInterviewAvailability,
     RecruitmentPositionSharedInterviewGroup,
 )
+from .recruitment.export import APPLICATION_COLUMNS, GANG_APPLICATION_COLUMNS, csv_response, application_rows, gang_application_rows
 from .models.model_choices import RecruitmentStatusChoices, RecruitmentPriorityChoices
+from .recruitment.transitions import RecruiterChange, apply_recruiter_changes
 
 
 class WebhookView(APIView):
@@ -131,21 +136,15 @@ class RecruitmentStatisticsView(ModelViewSet):
         FeatureEnabled,
     )  # Allow read only to permissions on perms
     serializer_class = RecruitmentStatisticsSerializer
-    queryset = RecruitmentStatistics.objects.all()
-
-    def retrieve(self, request: Request, pk: int) -> Response:
-        stats = get_object_or_404(self.queryset, pk=pk)
-        stats.save()
-        stats = get_object_or_404(self.queryset, pk=pk)
-        serializer = self.serializer_class(stats)
-        return Response(serializer.data)
+    # Serves the statistics as last recounted by the refresh_recruitment_stats worker, see refreshed_at
+    queryset = RecruitmentStatistics.objects.prefetch_related('time_stats', 'date_stats', 'campus_stats__campus', 'gang_stats__gang')
 
 
 @method_decorator(ensure_csrf_cookie, 'dispatch')
 class RecruitmentPositionView(ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = RecruitmentPositionSerializer
-    queryset = RecruitmentPosition.objects.all()
+    queryset = RecruitmentPosition.objects.for_listing()
 
 
 @method_decorator(ensure_csrf_cookie, 'dispatch')
@@ -213,7 +212,7 @@ class RecruitmentPositionsPerRecruitmentView(ListAPIView):
         """
         recruitment = self.request.query_params.get('recruitment', None)
         if recruitment is not None:
-            return RecruitmentPosition.objects.filter(recruitment=recruitment)
+            return RecruitmentPosition.objects.for_listing().filter(recruitment=recruitment)
         return None
 
 
@@ -247,7 +246,7 @@ class RecruitmentPositionsPerGangForGangView(ListAPIView):
         recruitment = self.request.query_params.get('recruitment', None)
         gang = self.request.query_params.get('gang', None)
         if recruitment is not None and gang is not None:
-            return RecruitmentPosition.objects.filter(gang=gang, recruitment=recruitment)
+            return RecruitmentPosition.objects.for_listing().filter(gang=gang, recruitment=recruitment)
         return None
 
 
@@ -558,16 +557,11 @@ class RecruitmentApplicationForGangUpdateStateView(APIView):
         update_serializer = self.serializer_class(data=request.data)
         if update_serializer.is_valid():
             # Should return update list of applications on correct
-            if 'recruiter_priority' in update_serializer.data:
-                application.recruiter_priority = update_serializer.data['recruiter_priority']
-            if 'recruiter_status' in update_serializer.data:
-                application.recruiter_status = update_serializer.data['recruiter_status']
-            application.save()
+            apply_recruiter_changes([RecruiterChange(application_id=application.id, **update_serializer.validated_data)])
             applications = RecruitmentApplication.objects.filter(
                 recruitment_position__gang=application.recruitment_position.gang,
                 recruitment=application.recruitment,
             )
-            application.update_applicant_state()
             serializer = RecruitmentApplicationForGangSerializer(applications, many=True)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(update_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -578,7 +572,7 @@ class RecruitmentPositionOrganizedApplicationsView(APIView):
     serializer_class = RecruitmentPositionOrganizedApplications
 
     def get(self, request: Request, pk: int) -> Response:
-        position = get_object_or_404(RecruitmentPosition, pk=pk)
+        position = get_object_or_404(RecruitmentPosition.objects.for_listing(), pk=pk)
         serializer = self.serializer_class(position)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -593,18 +587,50 @@ class RecruitmentApplicationForPositionUpdateStateView(APIView):
         update_serializer = self.serializer_class(data=request.data)
         if update_serializer.is_valid():
             # Should return update list of applications on correct
-            if 'recruiter_priority' in update_serializer.data:
-                application.recruiter_priority = update_serializer.data['recruiter_priority']
-            if 'recruiter_status' in update_serializer.data:
-                application.recruiter_status = update_serializer.data['recruiter_status']
-            application.save()
-            application.update_applicant_state()
-            position = get_object_or_404(RecruitmentPosition, pk=application.recruitment_position.id)
+            apply_recruiter_changes([RecruiterChange(application_id=application.id, **update_serializer.validated_data)])
+            position = get_object_or_404(RecruitmentPosition.objects.for_listing(), pk=application.recruitment_position_id)
             organized_serializer = RecruitmentPositionOrganizedApplications(position)
             return Response(organized_serializer.data, status=status.HTTP_200_OK)
         return Response(update_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class RecruitmentApplicationBulkUpdateStateView(APIView):
+    """
+    Applies a list of recruiter decisions in one transaction, all or none. Responds with only the applications that
+    changed, including those of the same applicants changed as a consequence, and their new versions. Of the latter,
+    only those the user may change are included.
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = RecruitmentApplicationStateChangeSerializer
+
+    def put(self, request: Request) -> Response:
+        update_serializer = self.serializer_class(data=request.data, many=True, allow_empty=False)
+        update_serializer.is_valid(raise_exception=True)
+        changes = [RecruiterChange(**change) for change in update_serializer.validated_data]
+
+        ids = {change.application_id for change in changes}
+        applications = RecruitmentApplication.objects.filter(id__in=ids)
+        permitted = set(filter_queryset_by_permissions(applications, request.user, SAMFUNDET_CHANGE_RECRUITMENTAPPLICATION).values_list('id', flat=True))
+        if permitted != ids:
+            if applications.count() != len(ids):
+                return Response({'error': 'Application not found'}, status=status.HTTP_404_NOT_FOUND)
+            raise PermissionDenied('You are not allowed to change all of these applications')
+
+        try:
+            changed = apply_recruiter_changes(changes)
+        except RecruitmentApplication.DoesNotExist:
+            # Deleted since the permission check
+            return Response({'error': 'Application not found'}, status=status.HTTP_404_NOT_FOUND)
+        # Applications of the same applicants in other gangs may have changed too, which the user is not shown
+        changed_applications = RecruitmentApplication.objects.filter(id__in=[application.id for application in changed])
+        shown = set(filter_queryset_by_permissions(changed_applications, request.user, SAMFUNDET_CHANGE_RECRUITMENTAPPLICATION).values_list('id', flat=True))
+        return Response(
+            RecruitmentApplicationStateSerializer([application for application in changed if application.id in shown], many=True).data,
+            status=status.HTTP_200_OK,
+        )
+
+
 class RecruitmentApplicationForRecruitmentPositionView(ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = RecruitmentApplicationForGangSerializer
@@ -637,18 +663,19 @@ class ActiveRecruitmentPositionsView(ListAPIView):
         return RecruitmentPosition.objects.filter(recruitment__visible_from__lte=timezone.now(), recruitment__actual_application_deadline__gte=timezone.now())
 
 
-class ActiveRecruitmentsView(ListAPIView):
+class ActiveRecruitmentsView(AsyncReadOnlyView):
     feature_key = WebFeatures.RECRUITMENT
-    permission_classes = [
-        DjangoModelPermissionsOrAnonReadOnly,
-        FeatureEnabled,
-    ]
-    serializer_class = RecruitmentSerializer
 
-    def get_queryset(self) -> Response:
+    async def data(self, request: HttpRequest, **kwargs: Any) -> list[dict]:
         """Returns all active recruitments"""
         # TODO Use is not completed instead of actual_application_deadline__gte
-        return Recruitment.objects.filter(visible_from__lte=timezone.now(), actual_application_deadline__gte=timezone.now())
+        recruitments = [
+            recruitment
+            async for recruitment in Recruitment.objects.filter(visible_from__lte=timezone.now(), actual_application_deadline__gte=timezone.now())
+            .select_related('organization', 'created_by', 'updated_by')
+            .prefetch_related('separate_positions')
+        ]
+        return await sync_to_async(lambda: RecruitmentSerializer(recruitments, many=True).data)()
 
 
 class RecruitmentInterviewGroupView(APIView):
@@ -672,54 +699,11 @@ class DownloadAllRecruitmentApplicationCSV(APIView):
         self,
         request: Request,
         recruitment_id: int,
-    ) -> HttpResponse:
-        recruitment = get_object_or_404(Recruitment, id=recruitment_id)
-        applications = RecruitmentApplication.objects.filter(recruitment=recruitment)
+    ) -> StreamingHttpResponse:
+        recruitment = get_object_or_404(Recruitment.objects.select_related('organization'), id=recruitment_id)
 
         filename = f'opptak_{recruitment.name_nb}_{recruitment.organization.name}_{timezone.now().strftime("%Y-%m-%d %H.%M")}.csv'
-        response = HttpResponse(
-            content_type='text/csv',
-            headers={'Content-Disposition': f'Attachment; filename="{filename}"'},
-        )
-        writer = csv.DictWriter(
-            response,
-            fieldnames=[
-                'Navn',
-                'Telefon',
-                'Epost',
-                'Campus',
-                'Stilling',
-                'Gjeng',
-                'Seksjon',
-                'Intervjutid',
-                'Intervjusted',
-                'Prioritet',
-                'Status',
-                'Sokers rangering',
-                'Intervjuer satt',
-            ],
-        )
-        writer.writeheader()
-        for application in applications:
-            writer.writerow(
-                {
-                    'Navn': application.user.get_full_name(),
-                    'Telefon': application.user.phone_number,
-                    'Epost': application.user.email,
-                    'Campus': application.user.campus.name_en if application.user.campus else '',
-                    'Stilling': application.recruitment_position.name_nb,
-                    'Gjeng': application.recruitment_position.gang.name_nb,
-                    'Seksjon': application.recruitment_position.get_section_name('nb'),
-                    'Intervjutid': application.interview.interview_time if application.interview else '',
-                    'Intervjusted': application.interview.interview_location if application.interview else '',
-                    'Prioritet': application.get_recruiter_priority_display(),
-                    'Status': application.get_recruiter_status_display(),
-                    'Sokers rangering': f'{application.applicant_priority}/{application.get_total_applications()}',
-                    'Intervjuer satt': f'{application.get_total_interviews()}/{application.get_total_applications()}',
-                }
-            )
-
-        return response
+        return csv_response(rows=application_rows(recruitment=recruitment), columns=APPLICATION_COLUMNS, filename=filename)
 
 
 class DownloadRecruitmentApplicationGangCSV(APIView):
@@ -730,51 +714,12 @@ class DownloadRecruitmentApplicationGangCSV(APIView):
         request: Request,
         recruitment_id: int,
         gang_id: int,
-    ) -> HttpResponse:
-        recruitment = get_object_or_404(Recruitment, id=recruitment_id)
+    ) -> StreamingHttpResponse:
+        recruitment = get_object_or_404(Recruitment.objects.select_related('organization'), id=recruitment_id)
         gang = get_object_or_404(Gang, id=gang_id)
-        applications = RecruitmentApplication.objects.filter(recruitment_position__gang=gang, recruitment=recruitment)
 
         filename = f'opptak_{gang.name_nb}_{recruitment.name_nb}_{recruitment.organization.name}_{timezone.now().strftime("%Y-%m-%d %H.%M")}.csv'
-        response = HttpResponse(
-            content_type='text/csv',
-            headers={'Content-Disposition': f'Attachment; filename="{filename}"'},
-        )
-        writer = csv.DictWriter(
-            response,
-            fieldnames=[
-                'Navn',
-                'Telefon',
-                'Epost',
-                'Campus',
-                'Stilling',
-                'Intervjutid',
-                'Intervjusted',
-                'Prioritet',
-                'Status',
-                'Sokers rangering (Hele Opptak)',
-                'Intervjuer satt (For Gjeng)',
-            ],
-        )
-        writer.writeheader()
-        for application in applications:
-            writer.writerow(
-                {
-                    'Navn': application.user.get_full_name(),
-                    'Telefon': application.user.phone_number,
-                    'Epost': application.user.email,
-                    'Campus': application.user.campus.name_en if application.user.campus else '',
-                    'Stilling': application.recruitment_position.name_nb,
-                    'Intervjutid': application.interview.interview_time if application.interview else '',
-                    'Intervjusted': application.interview.interview_location if application.interview else '',
-                    'Prioritet': application.get_recruiter_priority_display(),
-                    'Status': application.get_recruiter_status_display(),
-                    'Sokers rangering (Hele Opptak)': f'{application.applicant_priority}/{application.get_total_applications()}',
-                    'Intervjuer satt (For Gjeng)': f'{application.get_total_interviews_for_gang()}/{application.get_total_applications_for_gang()}',
-                }
-            )
-
-        return response
+        return csv_response(rows=gang_application_rows(recruitment=recruitment, gang=gang), columns=GANG_APPLICATION_COLUMNS, filename=filename)
 
 
 class InterviewRoomView(ModelViewSet):
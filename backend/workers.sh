@@ -0,0 +1,26 @@
+#!/usr/bin/env bash
+
+# (Re)starts the background workers in production. Run on every deploy, after migrations.
+# Each worker runs in a loop which starts it again if it exits. The loop and its worker are stopped through
+# logs/<worker>.pid when this script runs again, so the workers always run the deployed code.
+# Output is appended to logs/<worker>.log.
+
+set -e
+cd "$(dirname "$0")"
+
+workers=(
+  sync_billig
+  refresh_recruitment_stats
+  generate_image_variants
+)
+
+for worker in "${workers[@]}"; do
+  pidfile="logs/$worker.pid"
+  if [ -f "$pidfile" ]; then
+    # The loop leads its own process group, so this stops the running worker too.
+    kill -- "-$(cat "$pidfile")" 2>/dev/null || true
+  fi
+  setsid bash -c "while true; do uv run python manage.py $worker; echo \"$worker exited with status \$?, restarting\"; sleep 5; done" \
+    >> "logs/$worker.log" 2>&1 < /dev/null &
+  echo $! > "$pidfile"
+done
@@ -43,6 +43,9 @@ cd backend || exit
 source aliases.sh
 uv-sync-prod
 uv-run-migrations-apply
+# Events are served with the ticket data last copied from billig. Deploy anyway if billig is down, the worker retries.
+uv-run-sync-billig-once || echo "Could not sync billig, the sync_billig worker will retry."
 uv-run-collectstatic
 touch reload # Trigger restart of uwsgi server.
+uv-run-workers-restart
 cd ..
@@ -19,7 +19,7 @@ import {
 } from '~/Components';
 import { MultiSelect } from '~/Components/MultiSelect';
 import { postRecruitmentPosition, putRecruitmentPosition } from '~/api';
-import type { RecruitmentPositionDto, UserDto } from '~/dto';
+import type { RecruitmentPositionDto, UserOptionDto } from '~/dto';
 import { KEY } from '~/i18n/constants';
 import { reverse } from '~/named-urls';
 import { ROUTES } from '~/routes';
@@ -48,7 +48,7 @@ interface FormProps {
   positionId?: string;
   recruitmentId?: string;
   gangId?: string;
-  users?: UserDto[];
+  users?: UserOptionDto[];
   onUserSearch?: (term: string) => void;
   isSearchingUsers?: boolean;
 }
@@ -2,8 +2,8 @@ import { useCallback, useEffect, useRef, useState } from 'react';
 import { useTranslation } from 'react-i18next';
 import { useNavigate, useParams } from 'react-router';
 import { toast } from 'react-toastify';
-import { getRecruitmentPosition, getUsers } from '~/api';
-import type { RecruitmentPositionDto, UserDto } from '~/dto';
+import { getRecruitmentPosition, getUserOptions, getUsers } from '~/api';
+import type { RecruitmentPositionDto, UserListDto, UserOptionDto } from '~/dto';
 import { useTitle } from '~/hooks';
 import { KEY } from '~/i18n/constants';
 import { reverse } from '~/named-urls';
@@ -16,7 +16,7 @@ export function RecruitmentPositionFormAdminPage() {
   const navigate = useNavigate();
   const { recruitmentId, gangId, positionId } = useParams();
   const [position, setPosition] = useState<Partial<RecruitmentPositionDto>>();
-  const [users, setUsers] = useState<UserDto[]>([]);
+  const [users, setUsers] = useState<UserOptionDto[]>([]);
   const [isSearching, setIsSearching] = useState(false);
 
   // Reference to store timeout ID for debouncing
@@ -41,7 +41,7 @@ export function RecruitmentPositionFormAdminPage() {
       // Set a new timeout
       searchTimeoutRef.current = setTimeout(async () => {
         try {
-          const results = await getUsers(term);
+          const results = await getUserOptions(term);
           setUsers(results);
         } catch (error) {
           console.error('Error searching users:', error);
@@ -73,7 +73,7 @@ export function RecruitmentPositionFormAdminPage() {
           if (data.data.interviewers?.length) {
             // We need to make sure we have the interviewer data even without search
             const interviewerIds = data.data.interviewers.map((i) => i.id);
-            getUsers(interviewerIds.join(' ')).then((results: UserDto[]) => setUsers(results));
+            getUsers(interviewerIds.join(' ')).then((results: UserListDto[]) => setUsers(results));
           }
         })
         .catch(() => {
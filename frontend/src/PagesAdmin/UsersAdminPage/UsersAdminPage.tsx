@@ -3,7 +3,7 @@ import { InputField, PagedPagination, Table } from '~/Components';
 import { formatDate } from '~/Components/OccupiedForm/utils';
 import { AdminPageLayout } from '~/PagesAdmin/AdminPageLayout/AdminPageLayout';
 import { getUsersSearchPaginated } from '~/api';
-import type { UserDto } from '~/dto';
+import type { UserListDto } from '~/dto';
 import { useSearchPaginatedQuery, useTitle } from '~/hooks';
 import { KEY } from '~/i18n/constants';
 import { getFullName } from '~/utils';
@@ -25,7 +25,7 @@ export function UsersAdminPage() {
     setCurrentPage,
     searchTerm,
     setSearchTerm,
-  } = useSearchPaginatedQuery<UserDto>({
+  } = useSearchPaginatedQuery<UserListDto>({
     queryKey: ['admin-users'],
     queryFn: getUsersSearchPaginated,
   });
@@ -33,13 +33,12 @@ export function UsersAdminPage() {
   const userColumns = [
     { content: t(KEY.common_username), sortable: true },
     { content: t(KEY.common_name), sortable: true },
-    { content: t(KEY.common_email), sortable: true },
     { content: t(KEY.common_active), sortable: true },
     { content: t(KEY.admin_users_last_active), sortable: true },
     { content: '' },
   ];
 
-  function userTableRow(user: UserDto) {
+  function userTableRow(user: UserListDto) {
     return [
       {
         content: user.username,
@@ -49,10 +48,6 @@ export function UsersAdminPage() {
         content: getFullName(user),
         value: getFullName(user),
       },
-      {
-        content: user.email,
-        value: user.email,
-      },
       {
         content: user.is_active ? t(KEY.common_yes) : '',
         value: user.is_active,
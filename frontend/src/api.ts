@@ -32,8 +32,10 @@ import type {
   PermissionDto,
   PositionsByTagResponse,
   PurchaseFeedbackDto,
+  RecruitmentApplicationChangedStateDto,
   RecruitmentApplicationDto,
   RecruitmentApplicationRecruiterDto,
+  RecruitmentApplicationStateChangeDto,
   RecruitmentApplicationStateChoicesDto,
   RecruitmentApplicationStateDto,
   RecruitmentAvailabilityDto,
@@ -58,6 +60,8 @@ import type {
   TagDto,
   TextItemDto,
   UserDto,
+  UserListDto,
+  UserOptionDto,
   UserPreferenceDto,
   UserPriorityDto,
   VenueDto,
@@ -142,19 +146,25 @@ export async function impersonateUser(userId: number): Promise<boolean> {
   return response.status === 200;
 }
 
-export async function getUsers(search?: string): Promise<UserDto[]> {
+export async function getUsers(search?: string): Promise<UserListDto[]> {
   const url = BACKEND_DOMAIN + ROUTES.backend.samfundet__users + (search ? `?search=${search}` : '');
-  const response = await axios.get<UserDto[]>(url, { withCredentials: true });
+  const response = await axios.get<UserListDto[]>(url, { withCredentials: true });
+  return response.data;
+}
+
+export async function getUserOptions(search: string): Promise<UserOptionDto[]> {
+  const url = `${BACKEND_DOMAIN}${ROUTES.backend.samfundet__users_autocomplete}?search=${encodeURIComponent(search)}`;
+  const response = await axios.get<UserOptionDto[]>(url, { withCredentials: true });
   return response.data;
 }
 
 export async function getUsersSearchPaginated(
   page: number,
   search?: string,
-): Promise<PageNumberPaginationType<UserDto>> {
+): Promise<PageNumberPaginationType<UserListDto>> {
   const searchParam = search ? `&search=${encodeURIComponent(search)}` : '';
   const url = `${BACKEND_DOMAIN}${ROUTES.backend.samfundet__users_search_paginated}?page=${page}${searchParam}`;
-  const response = await axios.get<PageNumberPaginationType<UserDto>>(url, {
+  const response = await axios.get<PageNumberPaginationType<UserListDto>>(url, {
     withCredentials: true,
   });
   return response.data;
@@ -1166,6 +1176,13 @@ export async function updateRecruitmentApplicationStateForPosition(
   return await axios.put(url, application, { withCredentials: true });
 }
 
+export async function updateRecruitmentApplicationStates(
+  changes: RecruitmentApplicationStateChangeDto[],
+): Promise<AxiosResponse<RecruitmentApplicationChangedStateDto[]>> {
+  const url = BACKEND_DOMAIN + ROUTES.backend.samfundet__recruitment_application_bulk_update_state;
+  return await axios.put(url, changes, { withCredentials: true });
+}
+
 export async function getRecruitmentApplicationStateChoices(): Promise<
   AxiosResponse<RecruitmentApplicationStateChoicesDto>
 > {
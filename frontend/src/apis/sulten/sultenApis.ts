@@ -4,7 +4,12 @@ import type { ReservationFormData } from '~/Pages/LycheReservationPage/Component
 import { BACKEND_DOMAIN } from '~/constants';
 import { KEY } from '~/i18n/constants';
 import { ROUTES } from '~/routes';
-import type { AvailableTimes, ReservationCheckAvailabilityDto } from './sultenDtos';
+import type {
+  AvailableTimes,
+  AvailableTimesByDate,
+  ReservationAvailabilityQuery,
+  ReservationCheckAvailabilityDto,
+} from './sultenDtos';
 
 export type ReservationCheckError = {
   error_nb: string;
@@ -45,6 +50,20 @@ export async function checkReservationAvailability(
   }
 }
 
+export async function getReservationAvailability(query: ReservationAvailabilityQuery): Promise<AvailableTimesByDate> {
+  const url = BACKEND_DOMAIN + ROUTES.backend.samfundet__reservation_availability;
+  try {
+    const response = await axios.get<AvailableTimesByDate>(url, { withCredentials: true, params: query });
+    return response.data;
+  } catch (error) {
+    if (axios.isAxiosError(error) && error.response?.status === 406) {
+      const errorData = error.response.data as ReservationCheckError;
+      throw new Error(errorData.error_en);
+    }
+    throw error;
+  }
+}
+
 export interface ReservationPostData extends Omit<ReservationFormData, 'reservation_date'> {
   reservation_date: string;
 }
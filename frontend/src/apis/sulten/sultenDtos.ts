@@ -4,3 +4,13 @@ export type ReservationCheckAvailabilityDto = {
 };
 
 export type AvailableTimes = string[];
+
+export type ReservationAvailabilityQuery = {
+  start_date: string; // Required
+  guest_count: number; // Required
+  days?: number;
+  venue?: string;
+};
+
+// Available times keyed by date (YYYY-MM-DD)
+export type AvailableTimesByDate = Record<string, AvailableTimes>;
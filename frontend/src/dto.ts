@@ -52,6 +52,13 @@ export type UserDto = {
 
 export type BasicUserDto = Pick<UserDto, 'username' | 'first_name' | 'last_name'>;
 
+export type UserOptionDto = Pick<UserDto, 'id' | 'username' | 'first_name' | 'last_name'>;
+
+export type UserListDto = Pick<
+  UserDto,
+  'id' | 'username' | 'first_name' | 'last_name' | 'is_active' | 'date_joined' | 'last_login'
+>;
+
 export type CampusDto = {
   id: number;
   name_nb: string;
@@ -541,7 +548,7 @@ export type UserOrganizationRoleDto = Omit<UserRole, 'obj'> & {
 };
 
 export type RoleUsersDto = {
-  user: UserDto;
+  user: UserListDto;
   org_role?: UserOrganizationRoleDto;
   gang_role?: UserGangRoleDto;
   section_role?: UserGangSectionRoleDto;
@@ -733,6 +740,18 @@ export type RecruitmentApplicationStateDto = {
   recruiter_status?: number;
 };
 
+export type RecruitmentApplicationStateChangeDto = RecruitmentApplicationStateDto & {
+  application_id: string;
+};
+
+export type RecruitmentApplicationChangedStateDto = {
+  id: string;
+  recruiter_priority: number;
+  recruiter_status: number;
+  applicant_state: number;
+  version: number;
+};
+
 export type RecruitmentApplicationStateChoicesDto = {
   recruiter_priority: [number, string][];
   recruiter_status: [number, string][];
@@ -338,6 +338,7 @@ export const ROUTES_BACKEND = {
   samfundet__groups: '/api/groups/',
   samfundet__users: '/api/users/',
   samfundet__users_search_paginated: '/api/users-search-paginated/',
+  samfundet__users_autocomplete: '/api/users/autocomplete/',
   samfundet__impersonate: '/api/impersonate/',
   samfundet__eventsperday: '/api/events-per-day/',
   samfundet__eventsupcomming: '/api/events-upcomming/',
@@ -348,6 +349,7 @@ export const ROUTES_BACKEND = {
   samfundet__gangsorganized: '/api/gangtypes/:organization/',
   samfundet__check_reservation: '/api/check-reservation/',
   samfundet__reservation_create: '/api/reservations/',
+  samfundet__reservation_availability: '/api/reservation-availability/',
   samfundet__mdb_connect: '/api/mdb/connect',
   samfundet__active_recruitments: '/api/active-recruitments/',
   samfundet__recruitment_positions: '/api/recruitment-positions/',
@@ -360,6 +362,7 @@ export const ROUTES_BACKEND = {
   samfundet__recruitment_application_update_state_gang: '/api/recruitment-application-update-state-gang/:pk/',
   samfundet__recruitment_position_organized_applications: '/api/recruitment-position-organized-applications/:pk/',
   samfundet__recruitment_application_update_state_position: '/api/recruitment-application-update-state-position/:pk/',
+  samfundet__recruitment_application_bulk_update_state: '/api/recruitment-application-bulk-update-state/',
   samfundet__recruitment_applications_recruiter: '/api/recruitment-application-recruiter/:applicationId/',
   samfundet__recruitment_application_interview_notes: '/api/recruitment-application-interview-notes/:interviewId/',
   samfundet__recruitment_withdraw_application: '/api/recruitment-withdraw-application/:pk/',